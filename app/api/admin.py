@@ -0,0 +1,102 @@
+# app/api/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from app.core.routing import InstrumentedRoute
+from app.core.deps import require_admin
+from app.core.singleflight import singleflight_stats
+from app.core.compression import compressed_body_cache
+from app.core.tasks import task_queue
+from app.core.audit import audit_writer
+from app.core.soft_delete import menu_archiver
+from app.core.slow_queries import slow_query_log
+from app.core.profiler import continuous_profiler, profile_store, render_folded
+from app.models.user import User
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"], route_class=InstrumentedRoute)
+
+# ---- GET: Çalışma zamanı metrikleri (sadece admin) ----
+@router.get("/metrics")
+def get_metrics(current_user: User = Depends(require_admin)):
+    """
+    Önbellek / birleştirme metrikleri:
+    - singleflight: lider ve birleştirilen istek sayıları, zaman aşımları, hatalar
+    - compression_cache: sıkıştırılmış gövde önbelleği isabet / ıska
+    - tasks: arka plan kuyruğu (bekleyen, tamamlanan, yeniden denenen, başarısız)
+    - audit: denetim tamponu (bekleyen, yazılan, düşürülen, başarısız flush)
+    - menu_archive: arşive taşınan silinmiş menü öğeleri
+    """
+    return {
+        "singleflight": singleflight_stats.as_dict(),
+        "compression_cache": {
+            "hits": compressed_body_cache.hits,
+            "misses": compressed_body_cache.misses,
+        },
+        "tasks": task_queue.stats(),
+        "audit": audit_writer.stats(),
+        "menu_archive": menu_archiver.stats(),
+    }
+
+# ---- GET: Yavaş sorgu kaydı (sadece admin) ----
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    route: Optional[str] = Query(None, description='Örn. "GET /api/v1/menu-items/"'),
+    min_duration_ms: float = Query(0, ge=0),
+    current_user: User = Depends(require_admin),
+):
+    """
+    Eşiği aşan SQL ifadeleri (en yeniden eskiye):
+    - süre, parametre şekli (değerler değil), çağıran route
+    - SLOW_QUERY_CAPTURE_PLANS açıksa çalıştırma planı
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "capture_plans": slow_query_log.capture_plans,
+        "recorded": slow_query_log.recorded,
+        "entries": slow_query_log.entries(limit, route, min_duration_ms),
+    }
+
+# ---- DELETE: Yavaş sorgu tamponunu temizle (sadece admin) ----
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(current_user: User = Depends(require_admin)):
+    slow_query_log.clear()
+    return None
+
+# ---- GET: Saklanan istek profilleri (sadece admin) ----
+@router.get("/profiles")
+def list_profiles(current_user: User = Depends(require_admin)):
+    """`X-Profile: store` ile profillenen son isteklerin özeti (en yeniden eskiye)."""
+    return profile_store.list()
+
+# ---- GET: Sürekli örnekleme, tüm worker'lar birleşik (sadece admin) ----
+@router.get("/profiles/continuous", response_class=PlainTextResponse)
+def get_continuous_profile(
+    route: Optional[str] = Query(None, description='Örn. "GET /api/v1/menu-items/"'),
+    current_user: User = Depends(require_admin),
+):
+    """Folded stacks (flamegraph.pl / speedscope); ilk çerçeve route adıdır."""
+    if not continuous_profiler.enabled:
+        raise HTTPException(status_code=404, detail="Sürekli profil kapalı (PROFILER_CONTINUOUS_HZ=0)")
+    return render_folded(continuous_profiler.merged(route))
+
+# ---- GET: Tek profil indirme (sadece admin) ----
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: str, current_user: User = Depends(require_admin)):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profil bulunamadı: {profile_id}")
+    return PlainTextResponse(
+        profile["folded"],
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+    )
+
+# ---- POST: Silinmiş menü öğelerini şimdi arşivle (sadece admin) ----
+@router.post("/menu-archive")
+def run_menu_archive(current_user: User = Depends(require_admin)):
+    """
+    MENU_ARCHIVE_AFTER_DAYS'i dolduran soft delete kayıtlarını arka plan
+    döngüsünü beklemeden arşive taşır (parça parça, kısa transaction'lar).
+    """
+    return {"archived": menu_archiver.archive_once()}
@@ -0,0 +1,82 @@
+# app/api/audit.py
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.core.audit import audit_writer
+from app.core.deps import get_db, require_admin
+from app.core.routing import InstrumentedRoute
+from app.models.audit_log import AuditLog
+from app.models.user import User
+
+router = APIRouter(prefix="/api/v1/audit", tags=["Audit"], route_class=InstrumentedRoute)
+
+# ---- Şemalar (lokal) ----
+class AuditEntryOut(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    actor_email: Optional[str] = None
+    entity: str
+    entity_id: Optional[int] = None
+    action: str
+    changes: Dict[str, List[Any]] = Field(..., description="{alan: [eski, yeni]}")
+
+class AuditPageOut(BaseModel):
+    entries: List[AuditEntryOut]
+    next_cursor: Optional[int] = Field(None, description="Sonraki sayfa için before_id (yoksa son sayfa)")
+
+
+@router.get("", response_model=AuditPageOut)
+def list_audit_entries(
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = Query(None, ge=1, description="Keyset imleci: bu id'den eski kayıtlar"),
+    entity: Optional[str] = Query(None, pattern="^(menu_items|categories)$"),
+    entity_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    action: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """
+    Menü değişiklik kaydı (en yeniden eskiye, sadece admin).
+    - Keyset sayfalama: `id < before_id ORDER BY id DESC`; OFFSET yok, derin
+      sayfalar da tek indeks aralığıdır
+    - Tamponda bekleyen kayıtlar önce yazılır (son değişiklikler hemen görünür)
+    """
+    audit_writer.flush()
+    query = db.query(AuditLog)
+    if before_id is not None:
+        query = query.filter(AuditLog.id < before_id)
+    if entity is not None:
+        query = query.filter(AuditLog.entity == entity)
+    if entity_id is not None:
+        query = query.filter(AuditLog.entity_id == entity_id)
+    if actor_id is not None:
+        query = query.filter(AuditLog.actor_id == actor_id)
+    if action is not None:
+        query = query.filter(AuditLog.action == action)
+
+    rows = query.order_by(AuditLog.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "entries": [
+            {
+                "id": row.id,
+                "occurred_at": row.occurred_at,
+                "actor_id": row.actor_id,
+                "actor_email": row.actor_email,
+                "entity": row.entity,
+                "entity_id": row.entity_id,
+                "action": row.action,
+                "changes": json.loads(row.changes),
+            }
+            for row in rows
+        ],
+        "next_cursor": rows[-1].id if has_more else None,
+    }
@@ -1,18 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from app.core.routing import InstrumentedRoute
+from app.core.deps import get_db
 from app.models.user import User
 from app.schemas.auth import RegisterIn, UserOut, LoginIn, TokenOut
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash, verify_and_update_password, create_access_token
 
-router = APIRouter(prefix="/auth", tags=["auth"])
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=InstrumentedRoute)
 
 @router.post("/register", response_model=UserOut, status_code=201)
 def register(payload: RegisterIn, db: Session = Depends(get_db)):
@@ -32,7 +26,14 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
 @router.post("/login", response_model=TokenOut)
 def login(payload: LoginIn, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = verify_and_update_password(payload.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Hash eski şema/maliyette: parola elimizdeyken ayardaki şemayla yenile
+        user.hashed_password = new_hash
+        db.commit()
     token = create_access_token({"sub": str(user.id), "email": user.email})
     return TokenOut(access_token=token)
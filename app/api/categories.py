@@ -1,35 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import SessionLocal
 from app.models.category import Category
 from app.models.menu_item import MenuItem
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.core.routing import InstrumentedRoute
 from app.core.deps import get_current_user, get_db,require_admin
+from app.core.menu_store import serve_with_fallback
+from app.core.featured_index import featured_index
+from app.core.audit import audit_writer, diff
+from app.core.config import settings
+from app.core.soft_delete import archive_deleted
+from app.core.tasks import enqueue
+from app.core.menu_tasks import WARM_MENU_CACHES
 from app.models.user import User
 
-router = APIRouter(prefix="/api/v1/categories", tags=["Categories"])
+router = APIRouter(prefix="/api/v1/categories", tags=["Categories"], route_class=InstrumentedRoute)
 
 # Tüm kategorileri listele (GET)
 @router.get("/", response_model=List[CategoryResponse])
 def get_categories(
+    response: Response,
     skip: int = Query(0, ge=0, description="Kaç kayıt atlanacak"),
     limit: int = Query(100, ge=1, le=500, description="Max kayıt sayısı"),
     is_active: Optional[bool] = Query(None, description="Sadece aktif kategoriler"),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Category)
+    def fresh():
+        query = db.query(Category)
 
-    if is_active is not None:
-        query = query.filter(Category.is_active == is_active)
+        if is_active is not None:
+            query = query.filter(Category.is_active == is_active)
 
-    # 🔹 ID’ye göre sıralama eklendi
-    query = query.order_by(Category.id.asc())
+        # 🔹 ID’ye göre sıralama eklendi
+        query = query.order_by(Category.id.asc())
 
-    # 🔹 skip ve limit uygulandı
-    categories = query.offset(skip).limit(limit).all()
+        # 🔹 skip ve limit uygulandı
+        categories = query.offset(skip).limit(limit).all()
 
-    return categories
+        return categories
+
+    # 🔹 DB erişilemezse son menü snapshot'ındaki kategoriler (bayat işaretli)
+    def from_snapshot(snapshot):
+        categories = [
+            c for _, c in sorted(snapshot.categories.items())
+            if is_active is None or bool(c["is_active"]) == is_active
+        ]
+        return categories[skip:skip + limit]
+
+    return serve_with_fallback(response, fresh, from_snapshot, db)
 
     """
     Tüm kategorileri listeler.
@@ -118,6 +138,7 @@ def create_category(
     db.add(new_category)
     db.commit()
     db.refresh(new_category)
+    audit_writer.record(current_user, "categories", new_category.id, "create", diff({}, category_data.dict()))
     
     return CategoryResponse(
         id=new_category.id,
@@ -165,10 +186,16 @@ def update_category(
     
     # Güncelleme yap
     update_dict = category_data.dict(exclude_unset=True)
+    before = {field: getattr(category, field) for field in update_dict}
     for field, value in update_dict.items():
         setattr(category, field, value)
     
-    db.commit()
+    db.commit()  # menü nesli after_commit kancasında ilerler (app.core.invalidation)
+    changes = diff(before, update_dict)
+    if changes:
+        audit_writer.record(current_user, "categories", category_id, "update", changes)
+    featured_index.invalidate()  # kategori adı kayıtlara gömülü
+    enqueue(WARM_MENU_CACHES, {"entity": "categories", "id": category_id, "action": "update"})
     db.refresh(category)
     
     menu_items_count = db.query(MenuItem).filter(MenuItem.category_id == category.id).count()
@@ -195,6 +222,8 @@ def delete_category(
     Bir kategoriyi siler.
     - Authentication gereklidir
     - Kategoriye ait ürünler varsa hata verir (güvenlik için)
+    - Silinmiş (soft delete) ürünleri MENU_ARCHIVE_AFTER_DAYS beklenmeden aynı
+      transaction'da arşive taşınır (bkz. aşağıdaki not)
     """
     category = db.query(Category).filter(Category.id == category_id).first()
     
@@ -212,7 +241,16 @@ def delete_category(
             detail=f"Bu kategoriye ait {items_count} ürün bulunmaktadır. Önce ürünleri silin veya başka kategoriye taşıyın."
         )
     
+    # Soft delete edilmiş ürünler FK ile hâlâ kategoriye bağlı: önce arşive taşınır.
+    # Eşikten erken taşımak güvenli: silinmiş satırlar zaten hiçbir okumada görünmez ve
+    # geri alma yolu yok; arşiv satırları orijinal id ve alanlarıyla tuttuğundan eski
+    # siparişler ürünü bulmaya devam eder. Eşik sadece sıcak tablodaki toplu taşımayı
+    # seyreltir; silme engellenseydi son ürünü silinen kategori günlerce silinemezdi.
+    archive_deleted(db, MenuItem.category_id == category_id, settings.MENU_ARCHIVE_BATCH_SIZE)
+    before = {field: getattr(category, field) for field in CategoryUpdate.model_fields}
     db.delete(category)
     db.commit()
+    audit_writer.record(current_user, "categories", category_id, "delete", diff(before, {}))
+    enqueue(WARM_MENU_CACHES, {"entity": "categories", "id": category_id, "action": "delete"})
     
     return None
\ No newline at end of file
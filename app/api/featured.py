@@ -1,86 +1,83 @@
 # app/api/featured.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session
 from typing import List, Optional
-from sqlalchemy import asc, desc
 
-from app.core.deps import get_db, get_current_user
+from app.core.routing import InstrumentedRoute
+from app.core.deps import get_db, require_admin
+from app.core.menu_store import serve_with_fallback, iter_bits
+from app.core.invalidation import committed_generation
+from app.core.featured_index import featured_index, entry_from_item
+from app.core.availability import availability_index
+from app.core.audit import audit_writer
 from app.models.menu_item import MenuItem
 from app.schemas.menu_item import MenuItemList
+from app.core.fieldsets import FIELDS_DESCRIPTION, MenuItemListFields, parse_fields
 from app.models.user import User
 from pydantic import BaseModel, Field
 
-router = APIRouter(prefix="/api/v1/menu-items", tags=["Featured"])
+router = APIRouter(prefix="/api/v1/menu-items", tags=["Featured"], route_class=InstrumentedRoute)
 
 # ---- Request schema (yalın ve lokal) ----
 class FeaturedPatchIn(BaseModel):
     is_featured: bool = Field(..., description="Ürünün öne çıkan olup olmayacağı")
 
-# ---- Yardımcılar ----
-def _apply_sorting(query, sort_by: Optional[str], sort_dir: Optional[str], default_cols):
-    direction = asc if (sort_dir or "asc") == "asc" else desc
-    mapping = {
-        "name": MenuItem.name,
-        "price": MenuItem.price,
-        "created_at": MenuItem.created_at,
-    }
-    if sort_by in mapping:
-        return query.order_by(direction(mapping[sort_by]))
-    if isinstance(default_cols, (list, tuple)):
-        return query.order_by(*[direction(c) for c in default_cols])
-    return query.order_by(direction(default_cols))
-
-def _as_list(items):
-    return [
-        {
-            "id": i.id,
-            "name": i.name,
-            "description": i.description,
-            "price": i.price,
-            "category_name": i.category.name if i.category else "",
-            "is_available": i.is_available,
-            "is_featured": i.is_featured,
-            "image_url": i.image_url,
-        }
-        for i in items
-    ]
-
 # ---- GET: Featured listesi (public) ----
-@router.get("/featured", response_model=List[MenuItemList])
+@router.get("/featured", response_model=List[MenuItemListFields], response_model_exclude_unset=True)
 def list_featured_items(
+    response: Response,
     limit: int = Query(10, ge=1, le=50),
     category_id: Optional[int] = None,
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     sort_by: Optional[str] = Query(None, pattern="^(name|price|created_at)$"),
     sort_dir: Optional[str] = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
-    q = (
-        db.query(MenuItem)
-        .options(joinedload(MenuItem.category))
-        .filter(MenuItem.is_featured == True, MenuItem.is_available == True)
+    """
+    Öne çıkan ürünler:
+    - Liste bellekte hazır tutulur (yazma uçları yerinde günceller)
+    - Okuma sadece dilimleme + fiyat filtresi yapar, DB'ye gitmez
+    - Satış takvimi penceresi dışındaki ürünler (kahvaltı, happy hour...) listelenmez
+    - `fields` ile sadece istenen alanlar döner
+    - İlk yükleme sırasında DB erişilemezse son menü snapshot'ı kullanılır
+    """
+    selected = parse_fields(fields, MenuItemList)
 
-    )
-    if category_id is not None:
-        q = q.filter(MenuItem.category_id == category_id)
-    if min_price is not None:
-        q = q.filter(MenuItem.price >= min_price)
-    if max_price is not None:
-        q = q.filter(MenuItem.price <= max_price)
+    def fresh():
+        return featured_index.list(
+            db,
+            limit=limit,
+            category_id=category_id,
+            min_price=min_price,
+            max_price=max_price,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            fields=selected,
+            closed=availability_index.closed(db),
+        )
 
-    # varsayılan: yeni eklenenler önce (created_at desc)
-    q = _apply_sorting(q, sort_by, sort_dir, default_cols=[MenuItem.created_at])
+    def from_snapshot(snapshot):
+        mask = snapshot.filter_mask(
+            category_id=category_id,
+            is_featured=True,
+            min_price=min_price,
+            max_price=max_price,
+        ) & availability_index.available_mask(snapshot, availability_index.closed())
+        # snapshot.sort_key: NULL (NaN) created_at en küçük sayılır → sıra deterministik
+        rows = sorted(iter_bits(mask), key=snapshot.sort_key(sort_by or "created_at"), reverse=sort_dir == "desc")
+        return [snapshot.list_row(r, selected) for r in rows[:limit]]
 
-    items = q.limit(limit).all()
-    return _as_list(items)
+    result = serve_with_fallback(response, fresh, from_snapshot, db)
+    return result
 
-# ---- POST: Bir ürünü featured yap ----
+# ---- POST: Bir ürünü featured yap (sadece admin) ----
 @router.post("/{item_id}/featured", status_code=status.HTTP_201_CREATED)
 def mark_featured(
     item_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
 ):
     item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
     if not item:
@@ -91,14 +88,16 @@ def mark_featured(
     item.is_featured = True
     db.add(item)
     db.commit()
+    audit_writer.record(current_user, "menu_items", item_id, "feature", {"is_featured": [False, True]})
+    featured_index.upsert(entry_from_item(item), committed_generation(db))
     return {"status": "ok"}
 
-# ---- DELETE: Bir üründen featured durumunu kaldır ----
+# ---- DELETE: Bir üründen featured durumunu kaldır (sadece admin) ----
 @router.delete("/{item_id}/featured", status_code=status.HTTP_204_NO_CONTENT)
 def unmark_featured(
     item_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
 ):
     item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
     if not item:
@@ -108,20 +107,27 @@ def unmark_featured(
     item.is_featured = False
     db.add(item)
     db.commit()
+    audit_writer.record(current_user, "menu_items", item_id, "unfeature", {"is_featured": [True, False]})
+    featured_index.upsert(entry_from_item(item), committed_generation(db))
     return None
 
-# ---- PATCH: is_featured'i açıkça ayarla ----
+# ---- PATCH: is_featured'i açıkça ayarla (sadece admin) ----
 @router.patch("/{item_id}/featured")
 def set_featured(
     item_id: int,
     payload: FeaturedPatchIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
 ):
     item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Menü öğesi bulunamadı")
+    was_featured = bool(item.is_featured)
     item.is_featured = payload.is_featured
     db.add(item)
     db.commit()
+    if was_featured != payload.is_featured:
+        action = "feature" if payload.is_featured else "unfeature"
+        audit_writer.record(current_user, "menu_items", item_id, action, {"is_featured": [was_featured, payload.is_featured]})
+    featured_index.upsert(entry_from_item(item), committed_generation(db))
     return {"status": "ok", "is_featured": item.is_featured}
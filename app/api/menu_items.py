@@ -1,111 +1,405 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import and_, asc, desc, insert, not_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from app.db.database import SessionLocal
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from app.db.database import SessionLocal, binary_order, integrity_error_kind
 from app.models.menu_item import MenuItem
 from app.models.category import Category
 from app.schemas.menu_item import MenuItemCreate, MenuItemUpdate, MenuItemResponse, MenuItemList
+from app.core.routing import InstrumentedRoute
+from app.core.config import settings
 from app.core.deps import get_current_user, get_db,require_admin
+from app.core.menu_store import SORT_BY_PATTERN, menu_store, serve_with_fallback
+from app.core import menu_vector
+from app.core.availability import availability_index, open_clause
+from app.core.fieldsets import (
+    FIELDS_DESCRIPTION, MenuItemListFields, MenuItemResponseFields, detail_from_row, detail_projection, list_projection,
+    parse_fields, pick,
+)
+from app.core.featured_index import featured_index, make_entry
+from app.core.audit import audit_writer, diff
+from app.core.soft_delete import utcnow
+from app.core.invalidation import committed_generation, record_change
+from app.core.tasks import enqueue
+from app.core.menu_tasks import WARM_MENU_CACHES
 from app.models.user import User
 
-router = APIRouter(prefix="/api/v1/menu-items", tags=["Menu Items"])
+router = APIRouter(prefix="/api/v1/menu-items", tags=["Menu Items"], route_class=InstrumentedRoute)
 
 # Tüm menü öğelerini listele (GET)
-@router.get("/", response_model=List[MenuItemList])
+@router.get("/", response_model=List[MenuItemListFields], response_model_exclude_unset=True)
 def get_menu_items(
+    response: Response,
     skip: int = Query(0, ge=0, description="Kaç kayıt atlanacak"),
     limit: int = Query(100, ge=1, le=500, description="Max kayıt sayısı"),
-    category_id: Optional[int] = Query(None, description="Kategori ID'ye göre filtrele"),
+    category_id: Optional[List[int]] = Query(None, description="Kategori ID('leri)ne göre filtrele; tekrarlanabilir"),
     is_available: Optional[bool] = Query(None, description="Stok durumuna göre filtrele"),
+    available_now: Optional[bool] = Query(None, description="Şu an satışta mı (stok + satış takvimi penceresi)"),
     is_featured: Optional[bool] = Query(None, description="Öne çıkan ürünleri filtrele"),
     is_vegetarian: Optional[bool] = Query(None, description="Vejeteryan ürünleri filtrele"),
     is_vegan: Optional[bool] = Query(None, description="Vegan ürünleri filtrele"),
     is_gluten_free: Optional[bool] = Query(None, description="Glutensiz ürünleri filtrele"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum fiyat"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum fiyat"),
+    min_calories: Optional[int] = Query(None, ge=0, description="Minimum kalori"),
+    max_calories: Optional[int] = Query(None, ge=0, description="Maximum kalori"),
+    max_prep_time: Optional[int] = Query(None, ge=0, description="Maksimum hazırlık süresi (dk)"),
     search: Optional[str] = Query(None, description="İsim veya açıklamada ara"),
+    sort_by: Optional[str] = Query(None, pattern=SORT_BY_PATTERN, description="Sıralama alanı (varsayılan: id)"),
+    sort_dir: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     Menüdeki tüm ürünleri listeler.
-    - Çeşitli filtreleme seçenekleri sunar
-    - Sayfalama destekler
+    - Çeşitli filtreleme seçenekleri sunar (kalori / hazırlık süresi aralıkları, çoklu kategori)
+    - Sayfalama ve alan bazında sıralama destekler
     - Arama yapılabilir
+    - `fields` ile sadece istenen alanlar SELECT edilir ve döndürülür
+    - `available_now` satış takvimlerini (kahvaltı, happy hour...) bellek içi
+      aralık indeksinden çözer; zamanlı is_available yazması gerekmez
+    - Bellek içi snapshot varsa filtreler bitset AND'i ile DB'ye gitmeden uygulanır
+    - DB erişilemezse son snapshot'tan (bayat işaretli) cevap verilir
+    - X-Menu-Source yanıtı üreten yolu bildirir: snapshot | vector | sql
     """
-    query = db.query(MenuItem).join(Category)
+    selected = parse_fields(fields, MenuItemList)
+    filters = dict(
+        category_id=category_id,
+        is_available=is_available,
+        is_featured=is_featured,
+        is_vegetarian=is_vegetarian,
+        is_vegan=is_vegan,
+        is_gluten_free=is_gluten_free,
+        min_price=min_price,
+        max_price=max_price,
+        min_calories=min_calories,
+        max_calories=max_calories,
+        max_prep_time=max_prep_time,
+        search=search,
+    )
+    descending = sort_dir == "desc"
+
+    def from_snapshot(snapshot, closed=None):
+        now_mask = None
+        if available_now is not None:
+            if closed is None:
+                closed = availability_index.closed()  # DB kesintisi: son yüklenen takvim
+            now_mask = availability_index.available_mask(snapshot, closed)
+            if not available_now:
+                now_mask = snapshot.all_mask ^ now_mask
+        index = menu_vector.index_for(snapshot) if sort_by is not None else None
+        if index is not None:
+            vector_mask = index.filter(**filters)
+            if now_mask is not None:
+                vector_mask &= index.mask_to_bool(now_mask)
+            response.headers["X-Menu-Source"] = "vector"
+            return index.page(vector_mask, sort_by, descending, skip, limit, selected)
+        mask = snapshot.filter_mask(**filters)
+        if now_mask is not None:
+            mask &= now_mask
+        response.headers["X-Menu-Source"] = "snapshot"
+        if sort_by is None:
+            return snapshot.page(mask, skip, limit, selected)
+        return snapshot.sorted_page(mask, sort_by, descending, skip, limit, selected)
+
+    def fresh():
+        closed = availability_index.closed(db) if available_now is not None else None
+        snapshot = menu_store.get()
+        if snapshot is not None:
+            return from_snapshot(snapshot, closed)
+
+        response.headers["X-Menu-Source"] = "sql"
+        if selected is None:
+            query = db.query(MenuItem).join(Category)
+        else:
+            # Seyrek alan kümesi: sadece istenen kolonlar (ORM nesnesi kurulmaz)
+            query = db.query(*list_projection(selected)).select_from(MenuItem).join(Category)
     
-    # Filtreleme
-    if category_id is not None:
-        query = query.filter(MenuItem.category_id == category_id)
+        # Filtreleme
+        if category_id:
+            query = query.filter(MenuItem.category_id.in_(category_id))
     
-    if is_available is not None:
-        query = query.filter(MenuItem.is_available == is_available)
+        if is_available is not None:
+            query = query.filter(MenuItem.is_available == is_available)
+
+        if available_now is not None:
+            available = and_(MenuItem.is_available == True, open_clause(closed))
+            query = query.filter(available if available_now else not_(available))
     
-    if is_featured is not None:
-        query = query.filter(MenuItem.is_featured == is_featured)
+        if is_featured is not None:
+            query = query.filter(MenuItem.is_featured == is_featured)
     
-    if is_vegetarian is not None:
-        query = query.filter(MenuItem.is_vegetarian == is_vegetarian)
+        if is_vegetarian is not None:
+            query = query.filter(MenuItem.is_vegetarian == is_vegetarian)
     
-    if is_vegan is not None:
-        query = query.filter(MenuItem.is_vegan == is_vegan)
+        if is_vegan is not None:
+            query = query.filter(MenuItem.is_vegan == is_vegan)
     
-    if is_gluten_free is not None:
-        query = query.filter(MenuItem.is_gluten_free == is_gluten_free)
+        if is_gluten_free is not None:
+            query = query.filter(MenuItem.is_gluten_free == is_gluten_free)
     
-    if min_price is not None:
-        query = query.filter(MenuItem.price >= min_price)
+        if min_price is not None:
+            query = query.filter(MenuItem.price >= min_price)
     
-    if max_price is not None:
-        query = query.filter(MenuItem.price <= max_price)
+        if max_price is not None:
+            query = query.filter(MenuItem.price <= max_price)
+
+        # Aralıklar (calories) / (preparation_time, calories) indekslerini kullanır
+        if min_calories is not None:
+            query = query.filter(MenuItem.calories >= min_calories)
+
+        if max_calories is not None:
+            query = query.filter(MenuItem.calories <= max_calories)
+
+        if max_prep_time is not None:
+            query = query.filter(MenuItem.preparation_time <= max_prep_time)
     
-    # Arama
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (MenuItem.name.ilike(search_term)) | 
-            (MenuItem.description.ilike(search_term))
-        )
+        # Arama
+        if search:
+            search_term = f"%{search}%"
+            query = query.filter(
+                (MenuItem.name.ilike(search_term)) | 
+                (MenuItem.description.ilike(search_term))
+            )
     
-    # Sıralama ve sayfalama
-    items = query.order_by(MenuItem.id.asc()).offset(skip).limit(limit).all()
+        # Sıralama ve sayfalama (eşitlikte id → snapshot yolu ile aynı sıra)
+        if sort_by is None:
+            query = query.order_by(MenuItem.id.asc())
+        else:
+            direction = desc if descending else asc
+            column = binary_order(MenuItem.name) if sort_by == "name" else getattr(MenuItem, sort_by)
+            query = query.order_by(direction(column), direction(MenuItem.id))
+        items = query.offset(skip).limit(limit).all()
+        if selected is not None:
+            return [dict(row._mapping) for row in items]
 
+        # Response formatı
+        result = []
+        for item in items:
+            result.append({
+                "id": item.id,
+                "name": item.name,
+                "description": item.description,
+                "price": item.price,
+                "category_name": item.category.name,
+                "is_available": item.is_available,
+                "is_featured": item.is_featured,
+                "image_url": item.image_url
+            })
     
-    # Response formatı
-    result = []
-    for item in items:
-        result.append({
-            "id": item.id,
-            "name": item.name,
-            "description": item.description,
-            "price": item.price,
-            "category_name": item.category.name,
-            "is_available": item.is_available,
-            "is_featured": item.is_featured,
-            "image_url": item.image_url
-        })
-    
+        return result
+
+    result = serve_with_fallback(response, fresh, from_snapshot, db)
     return result
 
+# ---- Çoklu getirme (sepet / sipariş ekranları) ----
+class MenuItemBatchIn(BaseModel):
+    ids: List[int] = Field(..., min_length=1, description="Menü öğesi ID'leri (yanıt bu sırayla döner)")
+
+class MenuItemBatchEntry(BaseModel):
+    id: int
+    found: bool
+    item: Optional[MenuItemResponse] = None
+
+class MenuItemBatchOut(BaseModel):
+    items: List[MenuItemBatchEntry]
+    missing: List[int] = Field(..., description="Bulunamayan ID'ler (istek sırasıyla, tekrarsız)")
+
+def _batch_items(db: Session, response: Response, ids: List[int]) -> dict:
+    """ID'leri tek IN sorgusuyla (veya snapshot'tan) çözer; istek sırasını ve bulunamayanları korur."""
+    unique_ids = list(dict.fromkeys(ids))
+    if len(unique_ids) > settings.MENU_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek istekte en fazla {settings.MENU_BATCH_MAX_IDS} farklı ID istenebilir"
+        )
+
+    def from_snapshot(snapshot) -> Dict[int, dict]:
+        found = {}
+        for item_id in unique_ids:
+            row = snapshot.row_of(item_id)
+            if row is not None:
+                found[item_id] = snapshot.detail_row(row)
+        return found
+
+    def fresh() -> Dict[int, dict]:
+        snapshot = menu_store.get()
+        if snapshot is not None:
+            return from_snapshot(snapshot)
+        rows = (
+            db.query(*_RETURNING_COLUMNS, Category.name.label("category_name"))
+            .join(Category, MenuItem.category_id == Category.id)
+            .filter(MenuItem.id.in_(unique_ids))
+        )
+        found = {}
+        for row in rows:
+            values = dict(row._mapping)
+            values["category"] = {"id": values["category_id"], "name": values.pop("category_name")}
+            found[values["id"]] = values
+        return found
+
+    found = serve_with_fallback(response, fresh, from_snapshot, db)
+    return {
+        "items": [
+            {"id": item_id, "found": item_id in found, "item": found.get(item_id)}
+            for item_id in ids
+        ],
+        "missing": [item_id for item_id in unique_ids if item_id not in found],
+    }
+
+# Birden çok menü öğesini getir (GET) - /{item_id}'den önce tanımlı olmalı
+@router.get("/batch", response_model=MenuItemBatchOut)
+def get_menu_items_batch(
+    response: Response,
+    ids: str = Query(..., description="Virgülle ayrılmış ID'ler (ör. 3,7,12)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Sepet / sipariş ekranı için çoklu getirme.
+    - Tüm ID'ler tek IN sorgusuyla (snapshot varsa DB'ye gitmeden) çözülür
+    - Yanıt istek sırasındadır; bulunamayanlar found=false ile işaretlenir
+    - Uzun listeler için POST /batch kullanılabilir
+    """
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids virgülle ayrılmış tamsayılardan oluşmalı"
+        )
+    if not parsed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="En az bir ID gerekli")
+    return _batch_items(db, response, parsed)
+
+# Birden çok menü öğesini getir (POST) - URL uzunluğu sınırına takılmayan uzun listeler için
+@router.post("/batch", response_model=MenuItemBatchOut)
+def post_menu_items_batch(
+    payload: MenuItemBatchIn,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """GET /batch ile aynı; ID listesi gövdede gelir."""
+    return _batch_items(db, response, payload.ids)
+
 # Tek bir menü öğesini getir (GET)
-@router.get("/{item_id}", response_model=MenuItemResponse)
+@router.get("/{item_id}", response_model=MenuItemResponseFields, response_model_exclude_unset=True)
 def get_menu_item(
     item_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     Belirli bir menü öğesini ID ile getirir.
     - Kategori bilgilerini de içerir
+    - `fields` ile sadece istenen kolonlar okunur (category istenmezse join yok)
+    - DB erişilemezse son snapshot'tan (bayat işaretli) cevap verilir
     """
-    item = db.query(MenuItem).options(joinedload(MenuItem.category)).filter(MenuItem.id == item_id).first()
-    
-    if not item:
-        raise HTTPException(
+    selected = parse_fields(fields, MenuItemResponse)
+
+    def not_found():
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Menü öğesi bulunamadı: ID={item_id}"
         )
-    
-    return item
+
+    def fresh():
+        if selected is not None:
+            columns, needs_category = detail_projection(selected)
+            query = db.query(*columns).select_from(MenuItem)
+            if needs_category:
+                query = query.join(Category, MenuItem.category_id == Category.id)
+            row = query.filter(MenuItem.id == item_id).first()
+            if row is None:
+                raise not_found()
+            return detail_from_row(row)
+        item = db.query(MenuItem).options(joinedload(MenuItem.category)).filter(MenuItem.id == item_id).first()
+        if not item:
+            raise not_found()
+        return item
+
+    def from_snapshot(snapshot):
+        row = snapshot.row_of(item_id)
+        if row is None:
+            raise not_found()
+        detail = snapshot.detail_row(row)
+        return detail if selected is None else pick(detail, selected)
+
+    result = serve_with_fallback(response, fresh, from_snapshot, db)
+    return result
+
+# ---- Yazma yolu yardımcıları ----
+# INSERT/UPDATE ... RETURNING (SQL Server'da OUTPUT INSERTED.*) ile dönen kolonlar
+_RETURNING_COLUMNS = [
+    MenuItem.id,
+    MenuItem.name,
+    MenuItem.description,
+    MenuItem.price,
+    MenuItem.category_id,
+    MenuItem.image_url,
+    MenuItem.calories,
+    MenuItem.preparation_time,
+    MenuItem.is_vegetarian,
+    MenuItem.is_vegan,
+    MenuItem.is_gluten_free,
+    MenuItem.is_available,
+    MenuItem.is_featured,
+    MenuItem.created_at,
+    MenuItem.updated_at,
+    MenuItem.created_by,
+]
+
+def _category_name(db: Session, category_id: int) -> str:
+    """Kategori adını önce snapshot'tan, yoksa identity map / tek sorgudan alır."""
+    snapshot = menu_store.peek()
+    if snapshot is not None and category_id in snapshot.categories:
+        return snapshot.category_name(category_id)
+    category = db.get(Category, category_id)
+    return category.name if category else ""
+
+def _response_from_row(db: Session, row) -> dict:
+    values = dict(row._mapping)
+    values["category"] = {"id": values["category_id"], "name": _category_name(db, values["category_id"])}
+    return values
+
+def _integrity_http_error(exc: IntegrityError, name: Optional[str], category_id: Optional[int]) -> HTTPException:
+    """DB kısıt ihlallerini anlamlı HTTP hatalarına çevirir."""
+    kind = integrity_error_kind(exc)
+    if kind == "unique":
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bu kategoride aynı isimde bir ürün zaten mevcut: {name}"
+        )
+    if kind == "foreign_key":
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Geçersiz kategori ID: {category_id}"
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Menü öğesi veritabanı kısıtlarını ihlal ediyor"
+    )
+
+def _current_values(db: Session, item_id: int, fields) -> dict:
+    """Güncellemeden önceki değerler: geçerli snapshot'tan, yoksa tek PK sorgusundan."""
+    snapshot = menu_store.peek()
+    row = snapshot.row_of(item_id) if snapshot is not None else None
+    if row is not None:
+        detail = snapshot.detail_row(row)
+        return {field: detail[field] for field in fields}
+    current = db.execute(select(*(getattr(MenuItem, field) for field in fields)).where(MenuItem.id == item_id)).first()
+    return dict(current._mapping) if current is not None else {}
+
+def _after_item_write(db: Session, response: dict, action: str, actor: User, changes: dict) -> None:
+    # Denetim kaydı tampona; toplu INSERT arka planda
+    if changes:
+        audit_writer.record(actor, "menu_items", response["id"], action, changes)
+    # Menü nesli commit kancasında ilerledi; featured listesi yerinde güncellenir
+    featured_index.upsert(make_entry(response, response["category"]["name"]), committed_generation(db))
+    # Snapshot'ın yeniden kurulması isteği uzatmasın: arka plan kuyruğu
+    enqueue(WARM_MENU_CACHES, {"entity": "menu_items", "id": response["id"], "action": action})
 
 # Yeni menü öğesi ekle (POST) - Sadece giriş yapmış kullanıcılar
 @router.post("/", response_model=MenuItemResponse, status_code=status.HTTP_201_CREATED)
@@ -117,39 +411,26 @@ def create_menu_item(
     """
     Yeni bir menü öğesi oluşturur.
     - Authentication gereklidir
-    - Kategori ID'si geçerli olmalıdır
+    - Kategori ID'si geçerli olmalıdır (FK → 400)
+    - Aynı kategoride aynı isim olamaz (unique kısıt → 409)
+    - Tek ifade: INSERT ... RETURNING / OUTPUT INSERTED.*
     """
-    # Kategori var mı kontrol et
-    category = db.query(Category).filter(Category.id == item_data.category_id).first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Geçersiz kategori ID: {item_data.category_id}"
-        )
-    
-    # Aynı isimde ürün var mı kontrol et (aynı kategoride)
-    existing = db.query(MenuItem).filter(
-        MenuItem.name == item_data.name,
-        MenuItem.category_id == item_data.category_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Bu kategoride aynı isimde bir ürün zaten mevcut: {item_data.name}"
-        )
-    
-    # Yeni ürün oluştur
-    new_item = MenuItem(
-        **item_data.dict(),
-        created_by=current_user.id
+    stmt = (
+        insert(MenuItem)
+        .values(**item_data.dict(), created_by=current_user.id)
+        .returning(*_RETURNING_COLUMNS)
     )
-    db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
-    
-    # Kategori bilgileriyle birlikte döndür
-    return db.query(MenuItem).options(joinedload(MenuItem.category)).filter(MenuItem.id == new_item.id).first()
+    try:
+        row = db.execute(stmt).one()
+        record_change(db, "menu_items", row.id)
+        response = _response_from_row(db, row)
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise _integrity_http_error(exc, item_data.name, item_data.category_id)
+
+    _after_item_write(db, response, "create", current_user, diff({}, item_data.dict()))
+    return response
 
 # Menü öğesini güncelle (PUT) - Sadece giriş yapmış kullanıcılar
 @router.put("/{item_id}", response_model=MenuItemResponse)
@@ -163,49 +444,43 @@ def update_menu_item(
     Mevcut bir menü öğesini günceller.
     - Authentication gereklidir
     - Sadece gönderilen alanlar güncellenir (PATCH benzeri)
+    - Tek ifade: UPDATE ... RETURNING; kısıt ihlalleri 400/409'a çevrilir
+    - Değişen alanlar (eski → yeni) denetim kaydına tamponlanır
     """
-    item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
-    
-    if not item:
+    update_dict = item_data.dict(exclude_unset=True)
+    before = _current_values(db, item_id, update_dict) if update_dict else {}
+    if update_dict:
+        stmt = (
+            update(MenuItem)
+            .where(MenuItem.id == item_id)
+            .values(**update_dict)
+            .returning(*_RETURNING_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = select(*_RETURNING_COLUMNS).where(MenuItem.id == item_id)
+
+    try:
+        row = db.execute(stmt).first()
+        if row is not None:
+            if update_dict:
+                record_change(db, "menu_items", item_id)
+            response = _response_from_row(db, row)
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise _integrity_http_error(exc, item_data.name, item_data.category_id)
+
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Menü öğesi bulunamadı: ID={item_id}"
         )
-    
-    # Kategori değişiyorsa, yeni kategorinin geçerli olduğunu kontrol et
-    if item_data.category_id and item_data.category_id != item.category_id:
-        category = db.query(Category).filter(Category.id == item_data.category_id).first()
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Geçersiz kategori ID: {item_data.category_id}"
-            )
-    
-    # İsim değişiyorsa, aynı kategoride başka ürün var mı kontrol et
-    if item_data.name and item_data.name != item.name:
-        category_id = item_data.category_id if item_data.category_id else item.category_id
-        existing = db.query(MenuItem).filter(
-            MenuItem.name == item_data.name,
-            MenuItem.category_id == category_id,
-            MenuItem.id != item_id
-        ).first()
-        
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Bu kategoride aynı isimde başka bir ürün mevcut: {item_data.name}"
-            )
-    
-    # Güncelleme yap
-    update_dict = item_data.dict(exclude_unset=True)
-    for field, value in update_dict.items():
-        setattr(item, field, value)
-    
-    db.commit()
-    db.refresh(item)
-    
-    # Kategori bilgileriyle birlikte döndür
-    return db.query(MenuItem).options(joinedload(MenuItem.category)).filter(MenuItem.id == item.id).first()
+
+    if update_dict:
+        changes = diff(before, {field: response[field] for field in update_dict})
+        _after_item_write(db, response, "update", current_user, changes)
+    return response
 
 # Menü öğesini sil (DELETE) - Sadece giriş yapmış kullanıcılar
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -215,19 +490,32 @@ def delete_menu_item(
     current_user: User = Depends(require_admin)  # Authentication gerekli
 ):
     """
-    Bir menü öğesini siler.
+    Bir menü öğesini siler (soft delete).
     - Authentication gereklidir
+    - Tek ifade: UPDATE ... SET deleted_at; satır eski siparişler için kalır,
+      tüm okuma yollarından düşer ve MENU_ARCHIVE_AFTER_DAYS sonra arşive taşınır
+    - Zaten silinmiş ürün → 404
     """
-    item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+    deleted_at = utcnow()
+    row = db.execute(
+        update(MenuItem)
+        .where(MenuItem.id == item_id)
+        .values(deleted_at=deleted_at)
+        .returning(MenuItem.id)
+        .execution_options(synchronize_session=False)
+    ).first()
     
-    if not item:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Menü öğesi bulunamadı: ID={item_id}"
         )
     
-    db.delete(item)
+    record_change(db, "menu_items", item_id)
     db.commit()
+    audit_writer.record(current_user, "menu_items", item_id, "delete", {"deleted_at": [None, deleted_at]})
+    featured_index.remove(item_id, committed_generation(db))
+    enqueue(WARM_MENU_CACHES, {"entity": "menu_items", "id": item_id, "action": "delete"})
     
     return None
 
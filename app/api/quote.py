@@ -0,0 +1,150 @@
+# app/api/quote.py
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.core.availability import availability_index
+from app.core.config import settings
+from app.core.deps import get_db
+from app.core.menu_store import mark_stale, menu_store, serve_with_fallback
+from app.core.routing import InstrumentedRoute
+from app.db.database import StatementTimeout, statement_timeout
+from app.models.menu_item import MenuItem
+
+router = APIRouter(prefix="/api/v1/menu", tags=["Quote"], route_class=InstrumentedRoute)
+
+LINE_OK = "ok"
+LINE_UNAVAILABLE = "unavailable"
+LINE_NOT_FOUND = "not_found"
+
+# ---- Şemalar (lokal) ----
+class QuoteLineIn(BaseModel):
+    item_id: int
+    quantity: int = Field(..., ge=1, le=settings.QUOTE_MAX_QUANTITY)
+
+class QuoteIn(BaseModel):
+    lines: List[QuoteLineIn] = Field(..., min_length=1, max_length=settings.QUOTE_MAX_LINES)
+
+class QuoteLineOut(BaseModel):
+    item_id: int
+    quantity: int
+    status: str = Field(..., description="ok | unavailable | not_found")
+    name: Optional[str] = None
+    unit_price: Optional[float] = None
+    line_total: float = Field(..., description="Sadece status=ok satırlar için > 0")
+
+class QuoteOut(BaseModel):
+    lines: List[QuoteLineOut]
+    total: float
+    valid: bool = Field(..., description="Tüm satırlar mevcut ve satışta mı?")
+    unavailable: List[int] = Field(..., description="Satışta olmayan veya bulunamayan ID'ler")
+    stale: bool = Field(..., description="DB erişilemediği veya gecikme bütçesi aşıldığı için son snapshot ile fiyatlandı")
+
+
+def _money(value: Decimal) -> float:
+    return float(value.quantize(Decimal("0.01")))
+
+
+@router.post("/quote", response_model=QuoteOut)
+def quote_cart(
+    payload: QuoteIn,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    """
+    Sepet fiyat teklifi (checkout öncesi doğrulama).
+    - Tüm satırlar tek seferde çözülür: geçerli snapshot varsa DB'ye gidilmez,
+      yoksa tek bir IN sorgusu (id, ad, fiyat, is_available)
+    - Takvim ve DB sorgusu QUOTE_LATENCY_BUDGET_MS bütçesiyle çalışır; aşılırsa
+      elimizdeki snapshot'la fiyatlanır (kesinti bildirilmez, yalnız bu istek etkilenir).
+      SQL Server'da sorgu zaman aşımı saniye granülündedir: 1 sn altı bütçe 1 sn olur
+    - Bütçe aşımında snapshot QUOTE_MAX_SNAPSHOT_AGE_SECONDS'tan eskiyse 503 döner
+    - DB erişilemezse son snapshot'la fiyatlanır ve yanıt bayat işaretlenir
+    - Satış takvimi penceresi dışındaki ürünler (ör. öğleden sonra kahvaltı) unavailable döner
+    - Aynı ürün birden çok satırda gelebilir; tutarlar Decimal ile hesaplanır
+    """
+    started = time.perf_counter()
+    item_ids = list(dict.fromkeys(line.item_id for line in payload.lines))
+
+    def from_snapshot(snapshot, closed=None) -> Dict[int, tuple]:
+        if closed is None:
+            closed = availability_index.closed()  # DB kesintisi: son yüklenen takvim
+        available = availability_index.available_mask(snapshot, closed)
+        found = {}
+        for item_id in item_ids:
+            row = snapshot.row_of(item_id)
+            if row is not None:
+                found[item_id] = (snapshot.names[row], snapshot.prices[row], bool(available >> row & 1))
+        return found
+
+    def fresh() -> Dict[int, tuple]:
+        try:
+            with statement_timeout(db, settings.QUOTE_LATENCY_BUDGET_MS / 1000):
+                closed = availability_index.closed(db)
+                snapshot = menu_store.get()  # bloklamaz; bayatsa arka planda yeniden kurulur
+                if snapshot is not None:
+                    return from_snapshot(snapshot, closed)
+                rows = (
+                    db.query(MenuItem.id, MenuItem.name, MenuItem.price, MenuItem.category_id, MenuItem.is_available)
+                    .filter(MenuItem.id.in_(item_ids))
+                    .all()
+                )
+        except StatementTimeout:
+            # Bütçe aşımı kesinti değildir: report_outage çağrılmaz, diğer uçlar DB'den okumaya devam eder
+            return over_budget()
+        return {
+            row.id: (row.name, row.price, bool(row.is_available) and not closed.hides(row.id, row.category_id))
+            for row in rows
+        }
+
+    def over_budget() -> Dict[int, tuple]:
+        snapshot = menu_store.get()
+        if snapshot is None:
+            snapshot = menu_store.stale_snapshot()
+            if snapshot is None or snapshot.age_seconds > settings.QUOTE_MAX_SNAPSHOT_AGE_SECONDS:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Fiyat teklifi gecikme bütçesi içinde hesaplanamadı"
+                )
+            mark_stale(response, snapshot)
+        return from_snapshot(snapshot)
+
+    # db verilmez: fresh() kendi (daha kısa) QUOTE_LATENCY_BUDGET_MS sınırını uygular
+    found = serve_with_fallback(response, fresh, from_snapshot)
+
+    lines = []
+    total = Decimal("0")
+    unavailable = []
+    for line in payload.lines:
+        item = found.get(line.item_id)
+        if item is None:
+            lines.append({"item_id": line.item_id, "quantity": line.quantity, "status": LINE_NOT_FOUND, "line_total": 0.0})
+            unavailable.append(line.item_id)
+            continue
+        name, price, is_available = item
+        line_total = Decimal(str(price)) * line.quantity if is_available else Decimal("0")
+        total += line_total
+        lines.append({
+            "item_id": line.item_id,
+            "quantity": line.quantity,
+            "status": LINE_OK if is_available else LINE_UNAVAILABLE,
+            "name": name,
+            "unit_price": price,
+            "line_total": _money(line_total),
+        })
+        if not is_available:
+            unavailable.append(line.item_id)
+
+    unavailable = list(dict.fromkeys(unavailable))
+    response.headers["Server-Timing"] = f"quote;dur={(time.perf_counter() - started) * 1000:.2f}"
+    return {
+        "lines": lines,
+        "total": _money(total),
+        "valid": not unavailable,
+        "unavailable": unavailable,
+        "stale": "X-Menu-Stale" in response.headers,
+    }
@@ -0,0 +1,170 @@
+# app/api/schedules.py
+from typing import Annotated, List, Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy.orm import Session
+
+from app.core.availability import availability_index
+from app.core.config import settings
+from app.core.deps import get_db, require_admin
+from app.core.menu_tasks import WARM_MENU_CACHES
+from app.core.routing import InstrumentedRoute
+from app.core.tasks import enqueue
+from app.models.availability_schedule import DAY_MINUTES, WEEK_DAYS, AvailabilitySchedule
+from app.models.category import Category
+from app.models.menu_item import MenuItem
+from app.models.user import User
+
+router = APIRouter(prefix="/api/v1", tags=["Schedules"], route_class=InstrumentedRoute)
+
+_TIME_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+_END_TIME_PATTERN = r"^(([01]\d|2[0-3]):[0-5]\d|24:00)$"
+
+# ---- Şemalar (lokal) ----
+class ScheduleWindow(BaseModel):
+    weekdays: List[Annotated[int, Field(ge=0, le=WEEK_DAYS - 1)]] = Field(
+        ..., min_length=1, description="0=Pazartesi ... 6=Pazar (pencerenin başladığı gün)"
+    )
+    start: str = Field(..., pattern=_TIME_PATTERN, description="Başlangıç (HH:MM, yerel saat)")
+    end: str = Field(
+        ..., pattern=_END_TIME_PATTERN,
+        description="Bitiş (HH:MM, hariç); başlangıçtan küçük/eşitse gece yarısını geçer",
+    )
+    timezone: Optional[str] = Field(None, description="IANA saat dilimi; boşsa MENU_TIMEZONE")
+
+    @field_validator("timezone")
+    @classmethod
+    def _known_timezone(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        try:
+            ZoneInfo(value)
+        except (KeyError, ValueError):
+            raise ValueError(f"Bilinmeyen saat dilimi: {value}")
+        return value
+
+class ScheduleIn(BaseModel):
+    windows: List[ScheduleWindow] = Field(
+        ..., max_length=settings.AVAILABILITY_MAX_WINDOWS,
+        description="Satış pencereleri; boş liste takvimi kaldırır (her zaman satışta)",
+    )
+
+class ScheduleOut(BaseModel):
+    windows: List[ScheduleWindow]
+    open_now: bool = Field(
+        ..., description="Takvim şu an açık mı (öğede kategori takvimi de dahil; takvim yoksa true; is_available'dan bağımsız)"
+    )
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _window_out(row: AvailabilitySchedule) -> dict:
+    return {
+        "weekdays": [day for day in range(WEEK_DAYS) if row.weekday_mask >> day & 1],
+        "start": _clock(row.start_minute),
+        "end": _clock(row.end_minute),
+        "timezone": row.timezone,
+    }
+
+
+def _new_row(window: ScheduleWindow, **subject) -> AvailabilitySchedule:
+    return AvailabilitySchedule(
+        **subject,
+        weekday_mask=sum(1 << day for day in set(window.weekdays)),
+        start_minute=_minutes(window.start),
+        end_minute=_minutes(window.end) or DAY_MINUTES,  # "00:00" bitiş = gece yarısı
+        timezone=window.timezone or settings.MENU_TIMEZONE,
+    )
+
+
+def _read_schedule(db: Session, column, subject_id: int, open_now: bool) -> dict:
+    rows = db.query(AvailabilitySchedule).filter(column == subject_id).order_by(AvailabilitySchedule.id).all()
+    return {"windows": [_window_out(row) for row in rows], "open_now": open_now}
+
+
+def _replace_schedule(db: Session, column, subject_id: int, payload: ScheduleIn, **subject) -> None:
+    """Konunun tüm pencerelerini tek transaction'da değiştirir (menü nesli commit kancasında ilerler)."""
+    db.query(AvailabilitySchedule).filter(column == subject_id).delete(synchronize_session=False)
+    db.add_all([_new_row(window, **subject) for window in payload.windows])
+    db.commit()
+    # Takvim indeksi bir sonraki okumada yeniden derlenir; ısıtma arka planda
+    enqueue(WARM_MENU_CACHES, {"entity": "availability_schedules", "id": subject_id, "action": "update"})
+
+
+def _require_item(db: Session, item_id: int) -> int:
+    """Öğe yoksa 404; varsa kategori ID'sini döner."""
+    row = db.query(MenuItem.category_id).filter(MenuItem.id == item_id).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Menü öğesi bulunamadı: ID={item_id}"
+        )
+    return row.category_id
+
+
+def _require_category(db: Session, category_id: int) -> None:
+    if db.query(Category.id).filter(Category.id == category_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Kategori bulunamadı: ID={category_id}"
+        )
+
+# ---- Menü öğesi takvimi ----
+@router.get("/menu-items/{item_id}/schedule", response_model=ScheduleOut)
+def get_item_schedule(item_id: int, db: Session = Depends(get_db)):
+    """
+    Menü öğesinin satış pencereleri.
+    - windows sadece öğenin kendi pencereleridir
+    - open_now kategori takvimini de uygular (liste / quote ile aynı karar)
+    """
+    category_id = _require_item(db, item_id)
+    open_now = not availability_index.closed(db).hides(item_id, category_id)
+    return _read_schedule(db, AvailabilitySchedule.menu_item_id, item_id, open_now)
+
+@router.put("/menu-items/{item_id}/schedule", response_model=ScheduleOut)
+def put_item_schedule(
+    item_id: int,
+    payload: ScheduleIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """
+    Menü öğesinin satış pencerelerini değiştirir (Admin).
+    - Ürün sadece pencerelerinden biri açıkken listelenir / fiyatlanır
+    - is_available'a dokunulmaz: zamanlı yazma gerekmez
+    """
+    _require_item(db, item_id)
+    _replace_schedule(db, AvailabilitySchedule.menu_item_id, item_id, payload, menu_item_id=item_id)
+    return get_item_schedule(item_id, db)
+
+# ---- Kategori takvimi ----
+@router.get("/categories/{category_id}/schedule", response_model=ScheduleOut)
+def get_category_schedule(category_id: int, db: Session = Depends(get_db)):
+    """Kategorinin satış pencereleri (kategorideki tüm ürünlere uygulanır)."""
+    _require_category(db, category_id)
+    open_now = category_id not in availability_index.closed(db).categories
+    return _read_schedule(db, AvailabilitySchedule.category_id, category_id, open_now)
+
+@router.put("/categories/{category_id}/schedule", response_model=ScheduleOut)
+def put_category_schedule(
+    category_id: int,
+    payload: ScheduleIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """
+    Kategorinin satış pencerelerini değiştirir (Admin).
+    - Ürün hem kendi hem kategorisinin takvimi açıkken satıştadır
+    """
+    _require_category(db, category_id)
+    _replace_schedule(db, AvailabilitySchedule.category_id, category_id, payload, category_id=category_id)
+    return get_category_schedule(category_id, db)
@@ -1,26 +1,36 @@
 # app/api/search.py
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, case, func
 from typing import List, Optional
+from pydantic import BaseModel, Field
 
+from app.core.routing import InstrumentedRoute
 from app.core.deps import get_db
+from app.db.database import binary_order
+from app.core.menu_store import SORT_BY_PATTERN, menu_store
+from app.core import menu_vector
 from app.models.menu_item import MenuItem
+from app.models.category import Category
 from app.schemas.menu_item import MenuItemList
+from app.core.fieldsets import FIELDS_DESCRIPTION, MenuItemListFields, list_projection, parse_fields
 
-router = APIRouter(prefix="/api/v1/menu-items", tags=["Search"])
+router = APIRouter(prefix="/api/v1/menu-items", tags=["Search"], route_class=InstrumentedRoute)
 
 def _apply_filters(q, *,
-                   category_id: Optional[int],
+                   category_id: Optional[List[int]],
                    is_available: Optional[bool],
                    is_vegetarian: Optional[bool],
                    is_vegan: Optional[bool],
                    is_gluten_free: Optional[bool],
                    min_price: Optional[float],
                    max_price: Optional[float],
+                   min_calories: Optional[int],
+                   max_calories: Optional[int],
+                   max_prep_time: Optional[int],
                    search: Optional[str]):
-    if category_id is not None:
-        q = q.filter(MenuItem.category_id == category_id)
+    if category_id:
+        q = q.filter(MenuItem.category_id.in_(category_id))
     if is_available is not None:
         q = q.filter(MenuItem.is_available == is_available)
     if is_vegetarian is not None:
@@ -33,6 +43,13 @@ def _apply_filters(q, *,
         q = q.filter(MenuItem.price >= min_price)
     if max_price is not None:
         q = q.filter(MenuItem.price <= max_price)
+    # Aralıklar (calories) / (preparation_time, calories) indekslerini kullanır
+    if min_calories is not None:
+        q = q.filter(MenuItem.calories >= min_calories)
+    if max_calories is not None:
+        q = q.filter(MenuItem.calories <= max_calories)
+    if max_prep_time is not None:
+        q = q.filter(MenuItem.preparation_time <= max_prep_time)
     if search:
         like = f"%{search}%"
         q = q.filter((MenuItem.name.ilike(like)) | (MenuItem.description.ilike(like)))
@@ -41,14 +58,72 @@ def _apply_filters(q, *,
 def _apply_sort(q, sort_by: Optional[str], sort_dir: Optional[str]):
     direction = asc if (sort_dir or "asc") == "asc" else desc
     mapping = {
-        "name": MenuItem.name,
+        "name": binary_order(MenuItem.name),
         "price": MenuItem.price,
         "created_at": MenuItem.created_at,
+        "calories": MenuItem.calories,
+        "preparation_time": MenuItem.preparation_time,
     }
-    if sort_by in mapping:
-        return q.order_by(direction(mapping[sort_by]))
-    # varsayılan: isim
-    return q.order_by(direction(MenuItem.name))
+    # varsayılan: isim; eşitlikte id → sayfalar kararlı (snapshot / vektör motoru ile aynı)
+    column = mapping.get(sort_by, mapping["name"])
+    return q.order_by(direction(column), direction(MenuItem.id))
+
+# Fiyat aralıkları: (alt sınır dahil, üst sınır hariç); None = üst sınır yok
+PRICE_BUCKETS = [(0, 50), (50, 100), (100, 200), (200, None)]
+
+# ---- Facet çıktı şemaları (lokal) ----
+class CategoryFacet(BaseModel):
+    category_id: int
+    category_name: str
+    count: int
+
+class PriceBucketFacet(BaseModel):
+    min_price: float
+    max_price: Optional[float] = Field(None, description="None ise üst sınır yok")
+    count: int
+
+class FacetsOut(BaseModel):
+    total: int
+    is_vegetarian: int
+    is_vegan: int
+    is_gluten_free: int
+    is_available: int
+    is_featured: int
+    categories: List[CategoryFacet]
+    price_buckets: List[PriceBucketFacet]
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+def _price_condition(low, high):
+    if high is None:
+        return MenuItem.price >= low
+    return (MenuItem.price >= low) & (MenuItem.price < high)
+
+def _snapshot_facets(snapshot, mask: int):
+    flags = ["is_vegetarian", "is_vegan", "is_gluten_free", "is_available", "is_featured"]
+    result = {"total": mask.bit_count()}
+    for flag in flags:
+        result[flag] = (mask & snapshot.flags[flag]).bit_count()
+    categories = []
+    for cat_id in sorted(snapshot.category_masks):
+        count = (mask & snapshot.category_masks[cat_id]).bit_count()
+        if count:
+            categories.append({
+                "category_id": cat_id,
+                "category_name": snapshot.category_name(cat_id),
+                "count": count,
+            })
+    result["categories"] = categories
+    result["price_buckets"] = [
+        {
+            "min_price": low,
+            "max_price": high,
+            "count": (mask & snapshot.price_range_mask(low, high, high_inclusive=False)).bit_count(),
+        }
+        for low, high in PRICE_BUCKETS
+    ]
+    return result
 
 def _to_list(items):
     return [
@@ -65,25 +140,28 @@ def _to_list(items):
         for i in items
     ]
 
-@router.get("/search", response_model=List[MenuItemList])
+@router.get("/search", response_model=List[MenuItemListFields], response_model_exclude_unset=True)
 def search_items(
     q: str = Query(..., min_length=2, max_length=100, description="Arama terimi"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    category_id: Optional[int] = None,
+    category_id: Optional[List[int]] = Query(None, description="Kategori ID('leri); tekrarlanabilir"),
     is_available: Optional[bool] = None,
     is_vegetarian: Optional[bool] = None,
     is_vegan: Optional[bool] = None,
     is_gluten_free: Optional[bool] = None,
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
-    sort_by: Optional[str] = Query(None, pattern="^(name|price|created_at)$"),
+    min_calories: Optional[int] = Query(None, ge=0),
+    max_calories: Optional[int] = Query(None, ge=0),
+    max_prep_time: Optional[int] = Query(None, ge=0, description="Maksimum hazırlık süresi (dk)"),
+    sort_by: Optional[str] = Query(None, pattern=SORT_BY_PATTERN),
     sort_dir: Optional[str] = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
-    query = db.query(MenuItem).options(joinedload(MenuItem.category))
-    query = _apply_filters(
-        query,
+    selected = parse_fields(fields, MenuItemList)
+    filters = dict(
         category_id=category_id,
         is_available=is_available,
         is_vegetarian=is_vegetarian,
@@ -91,8 +169,109 @@ def search_items(
         is_gluten_free=is_gluten_free,
         min_price=min_price,
         max_price=max_price,
+        min_calories=min_calories,
+        max_calories=max_calories,
+        max_prep_time=max_prep_time,
         search=q,
     )
-    query = _apply_sort(query, sort_by, sort_dir)
-    items = query.offset(skip).limit(limit).all()
-    return _to_list(items)
+    # Bayat snapshot kullanılmaz: None → SQL yolu (yeniden kurma arka planda)
+    snapshot = menu_store.get()
+    # Snapshot + NumPy varsa: vektör maskeleri + argpartition ile top-k
+    index = menu_vector.index_for(snapshot)
+    if index is not None:
+        mask = index.filter(**filters)
+        items = index.page(mask, sort_by or "name", sort_dir == "desc", skip, limit, selected)
+    # NumPy yoksa veya indeks henüz kurulmadıysa: bitset maskesi + heap ile ilk (skip + limit)
+    elif snapshot is not None:
+        mask = snapshot.filter_mask(**filters)
+        items = snapshot.sorted_page(mask, sort_by or "name", sort_dir == "desc", skip, limit, selected)
+    elif selected is not None:
+        # Seyrek alan kümesi: sadece istenen kolonlar; Category sadece gerekirse join'lenir
+        query = db.query(*list_projection(selected)).select_from(MenuItem)
+        if "category_name" in selected:
+            query = query.join(Category, MenuItem.category_id == Category.id)
+        query = _apply_sort(_apply_filters(query, **filters), sort_by, sort_dir)
+        items = [dict(row._mapping) for row in query.offset(skip).limit(limit)]
+    else:
+        query = db.query(MenuItem).options(joinedload(MenuItem.category))
+        query = _apply_filters(query, **filters)
+        query = _apply_sort(query, sort_by, sort_dir)
+        items = _to_list(query.offset(skip).limit(limit).all())
+    return items
+
+@router.get("/facets", response_model=FacetsOut)
+def get_facets(
+    q: Optional[str] = Query(None, max_length=100, description="Arama terimi"),
+    category_id: Optional[List[int]] = Query(None, description="Kategori ID('leri); tekrarlanabilir"),
+    is_available: Optional[bool] = None,
+    is_vegetarian: Optional[bool] = None,
+    is_vegan: Optional[bool] = None,
+    is_gluten_free: Optional[bool] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_calories: Optional[int] = Query(None, ge=0),
+    max_calories: Optional[int] = Query(None, ge=0),
+    max_prep_time: Optional[int] = Query(None, ge=0, description="Maksimum hazırlık süresi (dk)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Filtre paneli için facet sayıları:
+    - /search ile aynı filtreleri kabul eder
+    - Tüm sayılar kategori bazında gruplanmış TEK bir aggregate sorgudan çıkar
+    - Genel toplamlar kategori satırlarının toplamıdır
+    - Bellek içi snapshot varsa sayılar bitset popcount'larıyla hesaplanır
+    """
+    filters = dict(
+        category_id=category_id,
+        is_available=is_available,
+        is_vegetarian=is_vegetarian,
+        is_vegan=is_vegan,
+        is_gluten_free=is_gluten_free,
+        min_price=min_price,
+        max_price=max_price,
+        min_calories=min_calories,
+        max_calories=max_calories,
+        max_prep_time=max_prep_time,
+        search=q,
+    )
+    snapshot = menu_store.get()
+    if snapshot is not None:
+        return _snapshot_facets(snapshot, snapshot.filter_mask(**filters))
+
+    query = (
+        db.query(
+            MenuItem.category_id,
+            Category.name,
+            func.count(MenuItem.id),
+            _count_if(MenuItem.is_vegetarian == True),
+            _count_if(MenuItem.is_vegan == True),
+            _count_if(MenuItem.is_gluten_free == True),
+            _count_if(MenuItem.is_available == True),
+            _count_if(MenuItem.is_featured == True),
+            *[_count_if(_price_condition(low, high)) for low, high in PRICE_BUCKETS],
+        )
+        .join(Category, MenuItem.category_id == Category.id)
+    )
+    query = _apply_filters(query, **filters)
+    rows = query.group_by(MenuItem.category_id, Category.name).all()
+
+    flags = ["is_vegetarian", "is_vegan", "is_gluten_free", "is_available", "is_featured"]
+    result = {"total": 0, **{f: 0 for f in flags}}
+    bucket_counts = [0] * len(PRICE_BUCKETS)
+    categories = []
+    for row in rows:
+        cat_id, cat_name, count = row[0], row[1], int(row[2] or 0)
+        result["total"] += count
+        for idx, flag in enumerate(flags):
+            result[flag] += int(row[3 + idx] or 0)
+        for idx in range(len(PRICE_BUCKETS)):
+            bucket_counts[idx] += int(row[3 + len(flags) + idx] or 0)
+        categories.append({"category_id": cat_id, "category_name": cat_name, "count": count})
+
+    categories.sort(key=lambda c: c["category_id"])
+    result["categories"] = categories
+    result["price_buckets"] = [
+        {"min_price": low, "max_price": high, "count": bucket_counts[idx]}
+        for idx, (low, high) in enumerate(PRICE_BUCKETS)
+    ]
+    return result
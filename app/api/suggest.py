@@ -1,14 +1,17 @@
 # app/api/suggest.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import asc
 from typing import List
 from pydantic import BaseModel, Field
 
+from app.core.routing import InstrumentedRoute
 from app.core.deps import get_db
+from app.db.database import binary_order
+from app.core.menu_store import serve_with_fallback
 from app.models.menu_item import MenuItem
 
-router = APIRouter(prefix="/api/v1/menu-items", tags=["Suggest"])
+router = APIRouter(prefix="/api/v1/menu-items", tags=["Suggest"], route_class=InstrumentedRoute)
 
 # Minimal çıktı şeması (autocomplete için hafif payload)
 class SuggestItemOut(BaseModel):
@@ -17,6 +20,7 @@ class SuggestItemOut(BaseModel):
 
 @router.get("/suggest", response_model=List[SuggestItemOut])
 def suggest_items(
+    response: Response,
     q: str = Query(..., min_length=1, max_length=100, description="Öneri metni"),
     limit: int = Query(10, ge=1, le=20),
     db: Session = Depends(get_db),
@@ -27,11 +31,33 @@ def suggest_items(
     - Kalan hakkı '%q%' eşleşmeleriyle tamamlar
       (ama prefix'te gelen ID'leri hariç tutar → duplicate olmaz)
     - Hafif döner: sadece {id, name}
+    - DB erişilemezse son menü snapshot'ından (bayat işaretli) önerir
     """
     term = q.strip()
     if not term:
         return []
 
+    return serve_with_fallback(
+        response,
+        lambda: _suggest_from_db(db, term, limit),
+        lambda snapshot: _suggest_from_snapshot(snapshot, term, limit),
+        db,
+    )
+
+def _suggest_from_snapshot(snapshot, term: str, limit: int):
+    needle = term.casefold()
+    prefix, contains = [], []
+    for r, name in enumerate(snapshot.names):
+        folded = name.casefold()
+        if folded.startswith(needle):
+            prefix.append(r)
+        elif needle in folded:
+            contains.append(r)
+    by_name = lambda r: snapshot.names[r]  # SQL yolu ile aynı: kod noktası sırası
+    picked = (sorted(prefix, key=by_name) + sorted(contains, key=by_name))[:limit]
+    return [{"id": snapshot.ids[r], "name": snapshot.names[r]} for r in picked]
+
+def _suggest_from_db(db: Session, term: str, limit: int):
     q_like_prefix = f"{term}%"
     q_like_any = f"%{term}%"
 
@@ -39,7 +65,7 @@ def suggest_items(
     prefix_results = (
         db.query(MenuItem.id, MenuItem.name)
         .filter(MenuItem.name.ilike(q_like_prefix))
-        .order_by(asc(MenuItem.name))
+        .order_by(asc(binary_order(MenuItem.name)))
         .limit(limit)
         .all()
     )
@@ -63,7 +89,7 @@ def suggest_items(
 
     any_results = (
         any_query
-        .order_by(asc(MenuItem.name))
+        .order_by(asc(binary_order(MenuItem.name)))
         .limit(remaining)
         .all()
     )
@@ -0,0 +1,166 @@
+# app/core/audit.py
+"""
+Menü değişikliklerinin toplu, asenkron denetim kaydı (append-only `audit_log`).
+
+- Yazma uçları commit'ten SONRA `audit_writer.record(...)` çağırır; kayıt
+  bellekteki tampona eklenir, admin isteği ek bir INSERT beklemez
+- Arka plan yazıcısı tamponu AUDIT_FLUSH_INTERVAL_SECONDS'de bir (AUDIT_BATCH_SIZE
+  dolunca hemen) tek executemany INSERT ile boşaltır
+- Sınırlı kayıp: tampon AUDIT_BUFFER_MAX'a ulaşırsa record() flush'ı kendisi
+  yapar (geri basınç) → süreç çökmesinde en fazla AUDIT_BUFFER_MAX, normalde
+  sadece son flush aralığındaki kayıtlar kaybolur
+- Yazılamayan parti (DB kesintisi) tamponun başına geri konur ve sonraki turda
+  yeniden denenir; sınır aşılırsa en eski kayıtlar düşürülür (`dropped`)
+- Kapanışta tampon boşaltılır
+"""
+import json
+import threading
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.database import engine
+from app.models.audit_log import AuditLog
+
+
+def diff(before: Mapping[str, Any], after: Mapping[str, Any]) -> Dict[str, list]:
+    """Değişen alanlar: {alan: [eski, yeni]}; olmayan taraf None sayılır."""
+    keys = list(before) + [key for key in after if key not in before]
+    return {
+        key: [before.get(key), after.get(key)]
+        for key in keys
+        if before.get(key) != after.get(key)
+    }
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class AuditWriter:
+    """Denetim kayıtlarını tamponlar, arka planda toplu olarak yazar."""
+
+    def __init__(self, engine, batch_size: int = 500, interval: float = 1.0, max_buffer: int = 10000,
+                 enabled: bool = True):
+        self._engine = engine
+        self._batch_size = max(1, batch_size)
+        self._interval = interval
+        self._max_buffer = max(self._batch_size, max_buffer)
+        self._enabled = enabled
+        self._buffer: Deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # aynı anda tek yazıcı (sıra korunur)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def record(
+        self,
+        actor,
+        entity: str,
+        entity_id: Optional[int],
+        action: str,
+        changes: Mapping[str, Any],
+    ) -> None:
+        """Değişikliği tampona ekler (commit'ten sonra çağrılmalıdır)."""
+        if not self._enabled:
+            return
+        entry = {
+            "occurred_at": datetime.now(timezone.utc).replace(tzinfo=None),
+            "actor_id": getattr(actor, "id", None),
+            "actor_email": getattr(actor, "email", None),
+            "entity": entity,
+            "entity_id": entity_id,
+            "action": action,
+            "changes": json.dumps(changes, default=_json_default, ensure_ascii=False),
+        }
+        with self._lock:
+            self._buffer.append(entry)
+            size = len(self._buffer)
+        if size >= self._max_buffer:
+            self.flush()  # geri basınç: kayıp sınırı aşılmasın
+        elif size >= self._batch_size:
+            self._wake.set()
+
+    def _take(self) -> List[dict]:
+        with self._lock:
+            count = min(self._batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _restore(self, batch: List[dict]) -> None:
+        with self._lock:
+            self._buffer.extendleft(reversed(batch))
+            overflow = len(self._buffer) - self._max_buffer
+            for _ in range(max(0, overflow)):
+                self._buffer.popleft()
+        if overflow > 0:
+            self.dropped += overflow
+            print(f"⚠️ Denetim tamponu dolu, en eski {overflow} kayıt düşürüldü")
+
+    def flush(self) -> int:
+        """Tamponu parti parti yazar; yazılan kayıt sayısını döner."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return written
+                try:
+                    with self._engine.begin() as conn:
+                        conn.execute(insert(AuditLog), batch)
+                except Exception as e:
+                    self.failed_flushes += 1
+                    self._restore(batch)
+                    print(f"⚠️ Denetim kaydı yazılamadı, tamponda tutuluyor: {e}")
+                    return written
+                written += len(batch)
+                self.written += len(batch)
+
+    def buffered(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._enabled and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": self.buffered(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+audit_writer = AuditWriter(
+    engine,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    max_buffer=settings.AUDIT_BUFFER_MAX,
+    enabled=settings.AUDIT_LOG_ENABLED,
+)
@@ -0,0 +1,224 @@
+# app/core/availability.py
+"""
+Satış takvimlerinin (availability_schedules) bellek içi aralık indeksi.
+
+- Pencereler saat dilimi başına haftanın dakikalarına (0..10080) açılır; gece
+  yarısını veya hafta sonunu geçen pencereler ikiye bölünür
+- Sınırlar sıralanıp tek taramayla (sweep) her segment için açık konular
+  kümesi çıkarılır → "şu an açık mı" = saat dilimi başına bir bisect
+- Kapalı konular (takvimi olup hiçbir penceresi açık olmayan öğe / kategoriler)
+  dakika başına bir kez hesaplanır; snapshot satır maskesi de önbelleklenir
+- Zamanlı yazma yok: kahvaltı / happy hour ürünleri is_available değişmeden
+  pencere dışında listelerden düşer; menü nesli sadece takvim değişince ilerler
+- İndeks yüklendiği menü neslini tutar (featured_index gibi); DB erişilemezse
+  son yüklenen takvim kullanılır
+"""
+import threading
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, true
+from sqlalchemy.orm import Session
+
+from app.core.menu_store import MenuSnapshot, menu_store
+from app.models.availability_schedule import DAY_MINUTES, WEEK_DAYS, AvailabilitySchedule
+from app.models.menu_item import MenuItem
+
+WEEK_MINUTES = WEEK_DAYS * DAY_MINUTES
+
+ITEM = "item"
+CATEGORY = "category"
+Subject = Tuple[str, int]
+
+
+def window_spans(weekday_mask: int, start_minute: int, end_minute: int) -> Iterator[Tuple[int, int]]:
+    """Pencereyi haftanın dakikası cinsinden [başlangıç, bitiş) aralıklarına açar."""
+    length = (end_minute - start_minute) % DAY_MINUTES or DAY_MINUTES
+    for day in range(WEEK_DAYS):
+        if not weekday_mask >> day & 1:
+            continue
+        start = day * DAY_MINUTES + start_minute
+        end = start + length
+        if end <= WEEK_MINUTES:
+            yield start, end
+        else:  # Pazar → Pazartesi geçişi
+            yield start, WEEK_MINUTES
+            yield 0, end - WEEK_MINUTES
+
+
+class ClosedSet:
+    """Şu an pencere dışında kalan menü öğeleri ve kategoriler."""
+
+    __slots__ = ("items", "categories")
+
+    def __init__(self, items: FrozenSet[int] = frozenset(), categories: FrozenSet[int] = frozenset()):
+        self.items = items
+        self.categories = categories
+
+    def __bool__(self) -> bool:
+        return bool(self.items or self.categories)
+
+    def hides(self, item_id: int, category_id: Optional[int]) -> bool:
+        return item_id in self.items or category_id in self.categories
+
+
+NOTHING_CLOSED = ClosedSet()
+
+
+class _Timeline:
+    """Tek saat dilimindeki pencerelerin segment tablosu (sınır → açık konular)."""
+
+    def __init__(self, tz: str, spans: List[Tuple[Subject, int, int]]):
+        self.zone = ZoneInfo(tz)
+        opening: Dict[int, List[Subject]] = defaultdict(list)
+        closing: Dict[int, List[Subject]] = defaultdict(list)
+        for subject, start, end in spans:
+            opening[start].append(subject)
+            closing[end].append(subject)
+        self.boundaries = sorted({0, *opening, *(m for m in closing if m < WEEK_MINUTES)})
+        self.segments: List[FrozenSet[Subject]] = []
+        active: Counter = Counter()  # aynı konunun çakışan pencereleri
+        current: FrozenSet[Subject] = frozenset()
+        for minute in self.boundaries:
+            for subject in closing.get(minute, ()):
+                active[subject] -= 1
+                if not active[subject]:
+                    del active[subject]
+            for subject in opening.get(minute, ()):
+                active[subject] += 1
+            if set(active) != current:
+                current = frozenset(active)
+            self.segments.append(current)
+
+    def open_at(self, now: datetime) -> FrozenSet[Subject]:
+        local = now.astimezone(self.zone)
+        minute = local.weekday() * DAY_MINUTES + local.hour * 60 + local.minute
+        return self.segments[bisect_right(self.boundaries, minute) - 1]
+
+
+class _Compiled:
+    """Bir takvim yüklemesinin derlenmiş hali; dakika önbelleği de bunun üzerinde tutulur."""
+
+    def __init__(self, rows):
+        spans_by_zone: Dict[str, List[Tuple[Subject, int, int]]] = defaultdict(list)
+        scheduled = set()
+        for row in rows:
+            subject = (ITEM, row.menu_item_id) if row.menu_item_id is not None else (CATEGORY, row.category_id)
+            scheduled.add(subject)
+            for start, end in window_spans(row.weekday_mask, row.start_minute, row.end_minute):
+                spans_by_zone[row.timezone].append((subject, start, end))
+        self.scheduled: FrozenSet[Subject] = frozenset(scheduled)
+        self.timelines = [_Timeline(tz, spans) for tz, spans in spans_by_zone.items()]
+        self.minute_cache: Optional[Tuple[int, ClosedSet]] = None
+
+    def closed_at(self, now: datetime) -> ClosedSet:
+        minute = int(now.timestamp() // 60)
+        cached = self.minute_cache
+        if cached is not None and cached[0] == minute:
+            return cached[1]
+        open_now = set()
+        for timeline in self.timelines:
+            open_now.update(timeline.open_at(now))
+        closed = self.scheduled.difference(open_now)
+        result = ClosedSet(
+            frozenset(subject_id for kind, subject_id in closed if kind == ITEM),
+            frozenset(subject_id for kind, subject_id in closed if kind == CATEGORY),
+        )
+        self.minute_cache = (minute, result)
+        return result
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._generation: Optional[int] = None
+        self._compiled = _Compiled(())
+        self._mask_cache: Optional[Tuple[MenuSnapshot, ClosedSet, int]] = None
+
+    # ---- Yükleme / geçersiz kılma ----
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    def advance(self, generation: int) -> None:
+        """Takvimlere dokunmayan bir yazmadan sonra yüklü takvimi yeni nesle taşır (yeniden yüklenmez)."""
+        with self._lock:
+            if self._loaded and self._generation == generation - 1:
+                self._generation = generation
+            else:
+                self._loaded = False
+
+    def _load(self, db: Session) -> None:
+        generation = menu_store.generation  # sorgudan önce: araya giren yazma yeniden yüklemeye yol açar
+        rows = db.query(
+            AvailabilitySchedule.menu_item_id,
+            AvailabilitySchedule.category_id,
+            AvailabilitySchedule.weekday_mask,
+            AvailabilitySchedule.start_minute,
+            AvailabilitySchedule.end_minute,
+            AvailabilitySchedule.timezone,
+        ).all()
+        self._compiled = _Compiled(rows)
+        self._generation = generation
+        self._loaded = True
+
+    def _is_current(self) -> bool:
+        return self._loaded and self._generation == menu_store.generation
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._is_current():
+            return
+        with self._lock:
+            if not self._is_current():
+                self._load(db)
+
+    # ---- Okuma ----
+    def closed(self, db: Optional[Session] = None, now: Optional[datetime] = None) -> ClosedSet:
+        """
+        Şu an pencere dışında kalan öğe / kategoriler.
+        db verilmezse (DB kesintisi yolu) son yüklenen takvim kullanılır.
+        """
+        if db is not None:
+            self.ensure_loaded(db)
+        compiled = self._compiled
+        if not compiled.scheduled:
+            return NOTHING_CLOSED
+        return compiled.closed_at(now or datetime.now(timezone.utc))
+
+    def closed_mask(self, snapshot: MenuSnapshot, closed: ClosedSet) -> int:
+        """Kapalı konuların snapshot satır maskesi (kategori bitsetlerinin OR'u + öğe bitleri)."""
+        if not closed:
+            return 0
+        cached = self._mask_cache
+        if cached is not None and cached[0] is snapshot and cached[1] is closed:
+            return cached[2]
+        mask = 0
+        for category_id in closed.categories:
+            mask |= snapshot.category_masks.get(category_id, 0)
+        for item_id in closed.items:
+            row = snapshot.row_of(item_id)
+            if row is not None:
+                mask |= 1 << row
+        self._mask_cache = (snapshot, closed, mask)
+        return mask
+
+    def available_mask(self, snapshot: MenuSnapshot, closed: ClosedSet) -> int:
+        """is_available=True ve penceresi açık satırlar."""
+        return snapshot.flags["is_available"] & ~self.closed_mask(snapshot, closed)
+
+
+def open_clause(closed: ClosedSet):
+    """SQL yolu: pencere dışındaki öğe / kategorileri dışlayan koşul."""
+    conditions = []
+    if closed.items:
+        conditions.append(MenuItem.id.not_in(sorted(closed.items)))
+    if closed.categories:
+        conditions.append(MenuItem.category_id.not_in(sorted(closed.categories)))
+    return and_(*conditions) if conditions else true()
+
+
+availability_index = AvailabilityIndex()
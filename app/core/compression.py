@@ -0,0 +1,178 @@
+# app/core/compression.py
+"""
+Yanıt sıkıştırma middleware'i (gzip / brotli).
+
+- Accept-Encoding pazarlığı: brotli kuruluysa `br`, değilse `gzip`; q=0 ile
+  reddedilen kodlama seçilmez
+- Eşik (COMPRESSION_MIN_SIZE) altındaki gövdeler olduğu gibi gönderilir
+- Önbelleklenebilir okuma yanıtları (menü GET'leri) için sıkıştırılmış baytlar
+  (menü nesli, kodlama, gövde özeti) anahtarıyla saklanır → aynı içerik bir
+  daha sıkıştırılmaz. Menü nesli değişince önbellek boşaltılır.
+- Akış (çok parçalı) yanıtlar ve zaten kodlanmış yanıtlar dokunulmadan geçer
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # isteğe bağlı: pip install brotli
+    brotli = None
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.menu_store import menu_store
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+_CACHEABLE_PREFIXES = (
+    "/api/v1/menu-items",
+    "/api/v1/categories",
+)
+
+
+def _accepted_encodings(header: str) -> dict:
+    """'gzip;q=0.8, br' → {'gzip': 0.8, 'br': 1.0}"""
+    accepted = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (("br", "gzip") if brotli is not None else ("gzip",))
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """(nesil, kodlama, gövde özeti) → sıkıştırılmış bayt; boyut sınırlı LRU."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, generation: int, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        compressed = compress(body, encoding)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = compressed
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, cache: Optional[CompressedBodyCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = (
+            self.cache is not None
+            and scope["method"] == "GET"
+            and scope["path"].startswith(_CACHEABLE_PREFIXES)
+        )
+        # Gövde üretilmeden önceki nesil: araya yazma girerse sonraki istekler yeni nesille gelir
+        generation = menu_store.generation if cacheable else None
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+            ):
+                # Akış, küçük veya sıkıştırılamaz gövde: dokunmadan geçir
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            use_cache = (
+                cacheable
+                and start_message["status"] == 200
+                and "x-menu-stale" not in headers
+                and "set-cookie" not in headers
+            )
+            if use_cache:
+                compressed = self.cache.get_or_compress(generation, encoding, body)
+            else:
+                compressed = compress(body, encoding)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+compressed_body_cache = CompressedBodyCache(settings.COMPRESSION_CACHE_MAX_ENTRIES)
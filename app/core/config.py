@@ -7,10 +7,117 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
 
+    # Gömülü SQLite modu (DATABASE_URL=sqlite:///menu.db): kiosk replikası / yerel benchmark
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_MB: int = 256
+
     JWT_SECRET: str = "change-me-please"
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Parola hash şeması ve maliyeti: bcrypt | scrypt | argon2 (argon2-cffi gerekir)
+    # Şema/maliyet değişince eski hash'ler başarılı girişte yeniden hash'lenir
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    SCRYPT_ROUNDS: int = 16          # log2(N)
+    SCRYPT_BLOCK_SIZE: int = 8
+    SCRYPT_PARALLELISM: int = 1
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 2
+
+    # Bellek içi menü snapshot'ı (bitset filtreleme)
+    MENU_STORE_ENABLED: bool = True
+    MENU_STORE_TTL_SECONDS: int = 60
+    # NumPy kuruluysa sıralı listelemeler vektörel motorla yapılır
+    VECTOR_ENGINE_ENABLED: bool = True
+    # GET/POST /menu-items/batch: tek istekte en fazla bu kadar farklı ID
+    MENU_BATCH_MAX_IDS: int = 200
+    # POST /menu/quote: sepet satır sınırı ve DB yolu için gecikme bütçesi.
+    # SQL Server (pyodbc) sorgu süresini saniye granülünde keser: 1000 ms altı bütçe orada 1 sn olur
+    QUOTE_MAX_LINES: int = 100
+    QUOTE_MAX_QUANTITY: int = 99
+    QUOTE_LATENCY_BUDGET_MS: int = 250
+    # Bütçe aşılınca bundan eski snapshot ile fiyat verilmez (503)
+    QUOTE_MAX_SNAPSHOT_AGE_SECONDS: int = 300
+    # Satış takvimleri: saat dilimi verilmeyen pencereler bu dilimde yorumlanır
+    MENU_TIMEZONE: str = "Europe/Istanbul"
+    AVAILABILITY_MAX_WINDOWS: int = 50
+
+    # Soft delete edilen menü öğeleri bu kadar gün sonra menu_items_archive'a taşınır
+    # (arşivleyici aralığı 0 → kapalı; taşıma parça parça, kısa transaction'larla)
+    MENU_ARCHIVE_AFTER_DAYS: int = 30
+    MENU_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    MENU_ARCHIVE_BATCH_SIZE: int = 500
+
+    # DB kesintisinde son menü snapshot'ından servis (stale-while-revalidate)
+    MENU_SNAPSHOT_PATH: str = "menu_snapshot.bin"
+    MENU_SNAPSHOT_PERSIST_SECONDS: int = 30
+    DB_OUTAGE_BACKOFF_SECONDS: int = 10
+    # Sadece snapshot'a düşebilen menü okumalarına uygulanır (serve_with_fallback);
+    # yazmalar, snapshot kurulumu, arşivleyici ve açılış DDL'i sınırsız çalışır. 0 = kapalı
+    DB_QUERY_TIMEOUT_SECONDS: int = 5
+    DB_POOL_TIMEOUT_SECONDS: int = 5
+
+    # Çok worker'lı dağıtım: snapshot MENU_SNAPSHOT_PATH üzerinden mmap ile paylaşılır
+    # (mümkünse /dev/shm altında bir yol verin)
+    MENU_SHARED_CACHE_ENABLED: bool = False
+    MENU_SHARED_REFRESH_INTERVAL_MS: int = 100
+
+    # Düğümler arası geçersiz kılma: boş → süreç içi; "redis://host:6379" veya "unix:///yol/redis.sock"
+    INVALIDATION_BUS_URL: str = ""
+    INVALIDATION_CHANNEL: str = "menu-invalidation"
+
+    # Yanıt sıkıştırma (brotli kuruluysa br, değilse gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256
+
+    # Aynı anda gelen özdeş menü okumalarını tek DB sorgusunda birleştir
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS: float = 5.0
+
+    # Commit sonrası yan işler için arka plan kuyruğu (boş spool → sadece bellek)
+    TASK_QUEUE_WORKERS: int = 2
+    TASK_SPOOL_DIR: str = "task_spool"
+    TASK_MAX_RETRIES: int = 5
+    TASK_RETRY_BASE_SECONDS: float = 1.0
+    TASK_RETRY_MAX_SECONDS: float = 60.0
+
+    # Menü değişiklikleri denetim kaydı: bellekte tamponlanır, arka planda toplu INSERT.
+    # Tampon AUDIT_BUFFER_MAX'a ulaşırsa yazma isteği flush'ı bekler → çökmede en fazla bu kadar kayıt kaybolur
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_BUFFER_MAX: int = 10000
+
+    # Yavaş sorgu kaydı (admin: GET /api/v1/admin/slow-queries)
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+    SLOW_QUERY_CAPTURE_PLANS: bool = False
+
+    # Örneklemeli profiler: admin isteğinde "X-Profile: folded|store" başlığı
+    PROFILER_ENABLED: bool = True
+    PROFILER_SAMPLE_INTERVAL_MS: float = 1.0
+    PROFILER_STORE_SIZE: int = 20
+    # Sürekli düşük frekanslı örnekleme (0 → kapalı); worker'lar PROFILER_DIR'e yazar
+    PROFILER_CONTINUOUS_HZ: float = 0.0
+    PROFILER_DIR: str = "profiles"
+    PROFILER_FLUSH_SECONDS: float = 30.0
+
+    # Tracing (W3C traceparent her zaman yayılır; span'ler sadece açıkken kaydedilir)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 0.01
+    TRACING_EXPORTER: str = "file"  # file | otlp
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+
     class Config:
         env_file = ".env"
         extra = "ignore"
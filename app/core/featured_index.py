@@ -0,0 +1,225 @@
+# app/core/featured_index.py
+"""
+Öne çıkan ürünlerin önceden hesaplanmış (materialized) listesi.
+
+- Sadece is_featured=True ve is_available=True ürünler tutulur
+- Genel liste ve kategori bazlı listeler (created_at, id) sırasıyla saklanır
+- Yazma uçları (featured toggle, menü öğesi oluşturma/güncelleme/silme)
+  listeyi yerinde günceller; okuma sadece dilimleme + fiyat filtresidir
+- Satış takvimi penceresi dışındaki öğeler okuma sırasında atlanır (kapalı
+  küme dışarıdan verilir, liste yeniden kurulmaz)
+- Liste, yüklendiği menü neslini tutar; başka bir süreçteki yazma nesli
+  ilerletirse bir sonraki okumada yeniden yüklenir
+- Başka düğümdeki ürün yazmalarında sadece değişen id'ler DB'den tazelenir
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.availability import ClosedSet
+from app.core.menu_store import menu_store
+from app.models.category import Category
+from app.models.menu_item import MenuItem
+
+_ENTRY_COLUMNS = ("id", "name", "description", "price", "category_id", "is_available", "is_featured", "image_url", "created_at")
+LIST_FIELDS = ("id", "name", "description", "price", "category_name", "is_available", "is_featured", "image_url")
+
+
+def _sort_key(entry: dict) -> Tuple[float, int]:
+    created_at = entry.get("created_at")
+    if created_at is None:
+        return (float("-inf"), entry["id"])  # NULL'lar başta
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return (created_at.timestamp(), entry["id"])
+
+
+def make_entry(values: Mapping[str, Any], category_name: str) -> dict:
+    """Menü öğesi alanlarından (dict / RETURNING satırı) indeks kaydı üretir."""
+    return {
+        "id": values["id"],
+        "name": values["name"],
+        "description": values["description"],
+        "price": values["price"],
+        "category_id": values["category_id"],
+        "category_name": category_name,
+        "is_available": values["is_available"],
+        "is_featured": values["is_featured"],
+        "image_url": values["image_url"],
+        "created_at": values["created_at"],
+    }
+
+
+def entry_from_item(item: MenuItem) -> dict:
+    """ORM nesnesinden indeks kaydı üretir."""
+    return make_entry(
+        {column: getattr(item, column) for column in _ENTRY_COLUMNS},
+        item.category.name if item.category else "",
+    )
+
+
+class FeaturedIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._generation: Optional[int] = None
+        self._entries: Dict[int, dict] = {}
+        self._overall: List[Tuple[float, int]] = []
+        self._by_category: Dict[int, List[Tuple[float, int]]] = {}
+
+    # ---- Yükleme / geçersiz kılma ----
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    @staticmethod
+    def _entry_query(db: Session):
+        return (
+            db.query(
+                MenuItem.id,
+                MenuItem.name,
+                MenuItem.description,
+                MenuItem.price,
+                MenuItem.category_id,
+                Category.name.label("category_name"),
+                MenuItem.is_available,
+                MenuItem.is_featured,
+                MenuItem.image_url,
+                MenuItem.created_at,
+            )
+            .join(Category, MenuItem.category_id == Category.id)
+        )
+
+    def _load(self, db: Session) -> None:
+        generation = menu_store.generation  # sorgudan önce: araya giren yazma yeniden yüklemeye yol açar
+        rows = (
+            self._entry_query(db)
+            .filter(MenuItem.is_featured == True, MenuItem.is_available == True)
+            .all()
+        )
+        self._entries = {}
+        self._overall = []
+        self._by_category = {}
+        for row in rows:
+            self._insert(dict(row._mapping))
+        self._generation = generation
+        self._loaded = True
+
+    def _is_current(self) -> bool:
+        return self._loaded and self._generation == menu_store.generation
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._is_current():
+            return
+        with self._lock:
+            if not self._is_current():
+                self._load(db)
+
+    # ---- Yerinde güncelleme ----
+    def _insert(self, entry: dict) -> None:
+        key = _sort_key(entry)
+        self._entries[entry["id"]] = entry
+        insort(self._overall, key)
+        insort(self._by_category.setdefault(entry["category_id"], []), key)
+
+    def _remove(self, item_id: int) -> None:
+        entry = self._entries.pop(item_id, None)
+        if entry is None:
+            return
+        key = _sort_key(entry)
+        for bucket in (self._overall, self._by_category.get(entry["category_id"], [])):
+            pos = bisect_left(bucket, key)
+            if pos < len(bucket) and bucket[pos] == key:
+                del bucket[pos]
+
+    def _advance(self, generation: int) -> bool:
+        """Yerinde güncelleme sadece araya başka yazma girmediyse geçerlidir."""
+        if not self._loaded:
+            return False  # ilk okumada zaten DB'den yüklenecek
+        if self._generation != generation - 1:
+            self._loaded = False
+            return False
+        self._generation = generation
+        return True
+
+    def upsert(self, entry: dict, generation: int) -> None:
+        """Ürünün güncel halini uygular: featured + mevcut ise listede, değilse dışarıda."""
+        with self._lock:
+            if not self._advance(generation):
+                return
+            self._remove(entry["id"])
+            if entry.get("is_featured") and entry.get("is_available"):
+                self._insert(entry)
+
+    def advance(self, generation: int) -> None:
+        """Ürünlere dokunmayan bir yazmadan (ör. takvim) sonra listeyi yeni nesle taşır."""
+        with self._lock:
+            self._advance(generation)
+
+    def remove(self, item_id: int, generation: int) -> None:
+        with self._lock:
+            if self._advance(generation):
+                self._remove(item_id)
+
+    def reload_items(self, db: Session, item_ids: Sequence[int], generation: int) -> None:
+        """
+        Başka düğümde değişen ürünlerin kayıtlarını DB'den tazeler (liste yeniden
+        yüklenmez). Silinmiş / featured olmaktan çıkmış ürünler listeden düşer.
+        """
+        if not self._loaded:
+            return  # ilk okumada zaten DB'den yüklenecek
+        rows = self._entry_query(db).filter(MenuItem.id.in_(item_ids)).all()
+        current = {row.id: dict(row._mapping) for row in rows}
+        with self._lock:
+            if not self._advance(generation):
+                return
+            for item_id in item_ids:
+                self._remove(item_id)
+                entry = current.get(item_id)
+                if entry is not None and entry["is_featured"] and entry["is_available"]:
+                    self._insert(entry)
+
+    # ---- Okuma ----
+    def list(
+        self,
+        db: Session,
+        *,
+        limit: int,
+        category_id: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort_by: Optional[str] = None,
+        sort_dir: Optional[str] = "asc",
+        fields: Optional[Sequence[str]] = None,
+        closed: Optional[ClosedSet] = None,
+    ) -> List[dict]:
+        self.ensure_loaded(db)
+        with self._lock:
+            keys = self._overall if category_id is None else self._by_category.get(category_id, [])
+            descending = sort_dir == "desc"
+            ordered = reversed(keys) if descending else keys
+            price_ok = lambda e: (min_price is None or e["price"] >= min_price) and (
+                max_price is None or e["price"] <= max_price
+            ) and not (closed and closed.hides(e["id"], e["category_id"]))
+            if sort_by in (None, "created_at"):
+                picked = []
+                for _, item_id in ordered:
+                    entry = self._entries[item_id]
+                    if price_ok(entry):
+                        picked.append(entry)
+                        if len(picked) >= limit:
+                            break
+            else:
+                # Featured kümesi küçük: isim/fiyat sıralaması doğrudan yapılır
+                picked = [self._entries[item_id] for _, item_id in keys if price_ok(self._entries[item_id])]
+                sort_field = (lambda e: e["name"]) if sort_by == "name" else (lambda e: e["price"])
+                picked.sort(key=sort_field, reverse=descending)
+                picked = picked[:limit]
+            fields = fields or LIST_FIELDS
+            return [{field: entry[field] for field in fields} for entry in picked]
+
+
+featured_index = FeaturedIndex()
@@ -0,0 +1,108 @@
+# app/core/fieldsets.py
+"""
+Seyrek alan kümeleri (sparse fieldsets): `?fields=id,name,price`.
+
+- İstenen alanlar yanıt modelinin alanlarına göre doğrulanır (bilinmeyen → 400)
+  ve modelin alan sırasına göre normalize edilir → aynı küme tek anahtar
+- Route'lar `sparse_model(...)` (tüm alanlar opsiyonel) + response_model_exclude_unset
+  kullanır: daraltılmış yanıt da response_model ile doğrulanır ve OpenAPI'de
+  belgelenir; handler sadece istenen anahtarları içeren sözlükler döner
+- SQL projeksiyonu için alan → kolon eşlemeleri de buradadır: sadece istenen
+  kolonlar SELECT edilir (ör. Text açıklama sütunu okunmaz)
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from pydantic.fields import FieldInfo
+
+from app.models.category import Category
+from app.models.menu_item import MenuItem
+from app.schemas.menu_item import MenuItemList, MenuItemResponse
+
+FIELDS_DESCRIPTION = "Virgülle ayrılmış alan listesi (ör. id,name,price); boşsa tüm alanlar"
+
+# MenuItemList alanı → SQL ifadesi (category_name için Category join'i gerekir)
+LIST_COLUMNS = {
+    "id": MenuItem.id,
+    "name": MenuItem.name,
+    "description": MenuItem.description,
+    "price": MenuItem.price,
+    "category_name": Category.name,
+    "is_available": MenuItem.is_available,
+    "is_featured": MenuItem.is_featured,
+    "image_url": MenuItem.image_url,
+}
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """'price, id' → ('id', 'price'); None / boş → None (tüm alanlar)."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        return None
+    allowed = tuple(model.model_fields)
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bilinmeyen alan(lar): {', '.join(sorted(unknown))}. Geçerli alanlar: {', '.join(allowed)}",
+        )
+    return tuple(name for name in allowed if name in requested)
+
+
+@lru_cache(maxsize=None)
+def sparse_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Route'un response_model'i: aynı alanlar (tip, kısıt, açıklama), hepsi opsiyonel.
+    `response_model_exclude_unset=True` ile birlikte kullanılır: tam yanıtta tüm
+    alanlar, `fields` verilince sadece istenenler döner; ikisi de FastAPI
+    tarafından doğrulanır ve OpenAPI şemasında görünür.
+    """
+    definitions = {
+        name: (Optional[field.annotation], FieldInfo.merge_field_infos(field, default=None))
+        for name, field in model.model_fields.items()
+    }
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        __doc__=f"{model.__name__}; `fields` verilirse sadece istenen alanlar bulunur.",
+        **definitions,
+    )
+
+
+MenuItemListFields = sparse_model(MenuItemList)
+MenuItemResponseFields = sparse_model(MenuItemResponse)
+
+
+def list_projection(fields: Tuple[str, ...]) -> list:
+    """MenuItemList alan kümesi için etiketli SELECT kolonları."""
+    return [LIST_COLUMNS[name].label(name) for name in fields]
+
+
+def detail_projection(fields: Tuple[str, ...]) -> Tuple[list, bool]:
+    """MenuItemResponse alan kümesi için SELECT kolonları ve Category join'i gerekip gerekmediği."""
+    columns = []
+    needs_category = "category" in fields
+    for name in fields:
+        if name == "category":
+            columns.append(Category.id.label("category__id"))
+            columns.append(Category.name.label("category__name"))
+        else:
+            columns.append(getattr(MenuItem, name).label(name))
+    return columns, needs_category
+
+
+def detail_from_row(row) -> Dict[str, object]:
+    """detail_projection satırını yanıt sözlüğüne çevirir (category iç içe)."""
+    values = dict(row._mapping)
+    if "category__id" in values:
+        values["category"] = {"id": values.pop("category__id"), "name": values.pop("category__name")}
+    return values
+
+
+def pick(values: dict, fields: Tuple[str, ...]) -> dict:
+    return {name: values[name] for name in fields}
+
@@ -0,0 +1,297 @@
+# app/core/invalidation.py
+"""
+Düğümler (pod'lar) arası önbellek geçersiz kılma veri yolu.
+
+- Menü tablolarına dokunan her commit, SQLAlchemy `after_commit` kancasında
+  yerel menü neslini ilerletir ve bus'a {nesil, değişen id'ler} yayınlar
+- Diğer düğümler mesajı alınca snapshot'ı geçersiz kılar; featured listesinde
+  sadece mesajdaki ürün id'lerini tazeler, takvim indeksini sadece takvim
+  değiştiyse yeniden kurar → önbellekler uzun TTL ile çalışabilir
+- Arka uçlar:
+    InProcessBus  → testler ve tek düğüm (varsayılan)
+    RespBus       → Redis protokolü (PUBLISH/SUBSCRIBE); `redis://host:port`
+                    veya `unix:///yol/redis.sock`. RESP konuşan herhangi bir
+                    yerel sunucu yerine geçebilir.
+"""
+import json
+import os
+import queue
+import socket
+import threading
+import uuid
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.availability import availability_index
+from app.core.config import settings
+from app.core.featured_index import featured_index
+from app.core.menu_store import menu_store
+from app.db.database import SessionLocal
+from app.models.availability_schedule import AvailabilitySchedule
+from app.models.category import Category
+from app.models.menu_item import MenuItem
+
+NODE_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_ENTITY_KEYS = {
+    MenuItem: "menu_items",
+    Category: "categories",
+    AvailabilitySchedule: "availability_schedules",
+}
+_CHANGES_KEY = "menu_changes"
+_GENERATION_KEY = "menu_generation"
+
+Callback = Callable[[dict], None]
+
+
+# ---- Arka uçlar ----
+class InvalidationBus:
+    def __init__(self):
+        self._subscribers: List[Callback] = []
+
+    def subscribe(self, callback: Callback) -> None:
+        self._subscribers.append(callback)
+
+    def publish(self, message: dict) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def _deliver(self, message: dict) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"⚠️ Geçersiz kılma mesajı işlenemedi: {e}")
+
+
+class InProcessBus(InvalidationBus):
+    """Aynı süreç içinde senkron teslim (testler / tek düğüm)."""
+
+    def publish(self, message: dict) -> None:
+        self._deliver(message)
+
+
+def _resp_command(*parts: str) -> bytes:
+    out = [f"*{len(parts)}\r\n".encode()]
+    for part in parts:
+        data = part.encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def _resp_read(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("RESP bağlantısı kapandı")
+    kind, body = line[:1], line[1:-2]
+    if kind in (b"+", b":"):
+        return body
+    if kind == b"-":
+        raise ConnectionError(body.decode("utf-8", "replace"))
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        return [_resp_read(reader) for _ in range(int(body))]
+    raise ConnectionError(f"Beklenmeyen RESP yanıtı: {line!r}")
+
+
+class RespBus(InvalidationBus):
+    """Redis protokolü üzerinden PUBLISH/SUBSCRIBE (TCP veya Unix soketi)."""
+
+    def __init__(self, url: str, channel: str, timeout: float = 2.0):
+        super().__init__()
+        self._url = urlparse(url)
+        self._channel = channel
+        self._timeout = timeout
+        self._outbox: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=10000)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._listen_sock: Optional[socket.socket] = None
+
+    def _connect(self, timeout: Optional[float]) -> socket.socket:
+        if self._url.scheme == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(self._url.path)
+        else:
+            sock = socket.create_connection((self._url.hostname or "localhost", self._url.port or 6379), timeout)
+            sock.settimeout(timeout)
+        if self._url.password:
+            sock.sendall(_resp_command("AUTH", self._url.password))
+            _resp_read(sock.makefile("rb"))
+        return sock
+
+    def publish(self, message: dict) -> None:
+        # İsteği bekletmemek için kuyruk; gönderim arka planda
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            print("⚠️ Geçersiz kılma kuyruğu dolu, mesaj atlandı (TTL ile telafi edilir)")
+
+    def start(self) -> None:
+        for target, name in ((self._send_loop, "invalidation-publisher"), (self._listen_loop, "invalidation-subscriber")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._outbox.put(None)
+        if self._listen_sock is not None:
+            try:
+                self._listen_sock.shutdown(socket.SHUT_RDWR)  # bloklu okumayı uyandırır
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join(timeout=self._timeout + 1)
+        self._threads = []
+
+    def _send_loop(self) -> None:
+        sock, reader = None, None
+        while not self._stop.is_set():
+            message = self._outbox.get()
+            if message is None:
+                break
+            try:
+                if sock is None:
+                    sock = self._connect(self._timeout)
+                    reader = sock.makefile("rb")
+                sock.sendall(_resp_command("PUBLISH", self._channel, json.dumps(message)))
+                _resp_read(reader)
+            except (OSError, ConnectionError) as e:
+                print(f"⚠️ Geçersiz kılma mesajı yayınlanamadı: {e}")
+                if sock is not None:
+                    sock.close()
+                sock, reader = None, None
+        if sock is not None:
+            sock.close()
+
+    def _listen_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                sock = self._connect(self._timeout)
+                sock.sendall(_resp_command("SUBSCRIBE", self._channel))
+                sock.settimeout(None)  # mesajlar seyrek; stop() soketi kapatarak uyandırır
+                self._listen_sock = sock
+                reader = sock.makefile("rb")
+                with sock:
+                    while not self._stop.is_set():
+                        reply = _resp_read(reader)
+                        if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                            self._deliver(json.loads(reply[2]))
+            except (OSError, ConnectionError, ValueError) as e:
+                if not self._stop.is_set():
+                    print(f"⚠️ Geçersiz kılma aboneliği koptu, yeniden bağlanılıyor: {e}")
+                    self._stop.wait(1.0)
+
+
+def create_bus(url: str) -> InvalidationBus:
+    if not url:
+        return InProcessBus()
+    return RespBus(url, settings.INVALIDATION_CHANNEL)
+
+
+bus: InvalidationBus = InProcessBus()
+
+
+def set_bus(new_bus: InvalidationBus) -> None:
+    """Kullanılacak bus'ı ayarlar ve uzak mesajlara abone olur (tek abonelik noktası)."""
+    global bus
+    bus = new_bus
+    bus.subscribe(_on_message)
+
+
+# ---- Değişiklik kaydı (session.info) ----
+def record_change(db: Session, entity: str, entity_id: Optional[int] = None) -> None:
+    """Bu transaction'da menü verisinin değiştiğini kaydeder (Core INSERT/UPDATE için)."""
+    changes = db.info.setdefault(_CHANGES_KEY, {})
+    ids = changes.setdefault(entity, set())
+    if entity_id is not None:
+        ids.add(entity_id)
+
+
+def committed_generation(db: Session) -> int:
+    """Son commit'in ürettiği menü nesli (featured indeksinin yerinde güncellemesi için)."""
+    return db.info.get(_GENERATION_KEY, menu_store.generation)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        entity = _ENTITY_KEYS.get(type(obj))
+        if entity is not None:
+            record_change(session, entity, obj.id)
+
+
+def _do_orm_execute(state) -> None:
+    # ORM-etkin INSERT/UPDATE/DELETE (RETURNING yolu) flush'tan geçmez
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    entity = _ENTITY_KEYS.get(mapper.class_) if mapper is not None else None
+    if entity is not None:
+        record_change(state.session, entity)
+
+
+def _after_commit(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    generation = menu_store.invalidate()
+    session.info[_GENERATION_KEY] = generation
+    bus.publish({
+        "origin": NODE_ID,
+        "version": generation,
+        **{entity: sorted(ids) for entity, ids in changes.items()},
+    })
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGES_KEY, None)
+
+
+def _on_message(message: dict) -> None:
+    if message.get("origin") == NODE_ID:
+        return  # kendi yazmamız; yerelde zaten uygulandı
+    generation = menu_store.invalidate()
+    if "availability_schedules" in message:
+        availability_index.invalidate()
+    else:
+        availability_index.advance(generation)
+    if "categories" in message:
+        featured_index.invalidate()  # kategori adı / silme tüm kayıtları etkileyebilir
+        return
+    item_ids = message.get("menu_items")
+    if item_ids is None:
+        featured_index.advance(generation)  # sadece takvim değişti
+        return
+    if not item_ids:
+        featured_index.invalidate()  # id'siz toplu yazma: hangi ürünler değişti bilinmiyor
+        return
+    db = SessionLocal()
+    try:
+        featured_index.reload_items(db, item_ids, generation)
+    except Exception:
+        featured_index.invalidate()
+        raise
+    finally:
+        db.close()
+
+
+def install_hooks(session_factory) -> None:
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
+
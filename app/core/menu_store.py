@@ -0,0 +1,671 @@
+# app/core/menu_store.py
+"""
+Menü öğelerinin bellek içi, sütun bazlı (columnar) kopyası.
+
+- Her boolean bayrak ve her category_id için bir bitset (Python int)
+- Sayısal alanlar tipli dizilerde (array), öğe başına Python nesnesi yok
+- Metin alanları ortak bir UTF-8 tamponda (ofset dizisi + blob); erişildikçe çözülür
+- Kategori adları kategori başına bir kez (sys.intern) tutulur
+- Fiyat, kalori ve hazırlık süresi için satır sıralaması (bisect(key=...) ile
+  aralık araması)
+- Çoklu filtre = bitsetlerin AND'i + ikili arama → DB'ye gitmeden cevap
+
+Satırlar id'ye göre artan sıradadır; bit i, i. satırı temsil eder.
+Snapshot tek bir projeksiyon sorgusunun satırlarından akış halinde kurulur.
+Yazma işlemlerinden sonra `menu_store.invalidate()` çağrılır; bayat snapshot
+servis edilmez. Yeniden kurma arka planda tek seferde yapılır, o sürede
+okumalar SQL yolundan cevap verir.
+"""
+import heapq
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import DB_UNAVAILABLE_ERRORS, SessionLocal, StatementTimeout, statement_timeout
+from app.models.category import Category
+from app.models.menu_item import MenuItem
+
+FLAG_COLUMNS = ("is_vegetarian", "is_vegan", "is_gluten_free", "is_available", "is_featured")
+
+# Projeksiyon sorgusunun (ve from_rows'un beklediği satır tuple'larının) alan sırası
+ITEM_FIELDS = (
+    "id", "name", "description", "price", "category_id", "image_url",
+    "calories", "preparation_time", *FLAG_COLUMNS, "created_at", "updated_at", "created_by",
+)
+
+# NULL tamsayılar için işaret değeri (kalori/süre/created_by zaten >= 0)
+NULL_INT = -1
+
+# Snapshot'ın saklanan sütunları (dosya formatı da bunları kullanır).
+# 32 bit sığan alanlar ve satır indeksleri "i" (4 bayt) tutulur.
+ARRAY_COLUMNS = {
+    "ids": "q",
+    "category_ids": "i",
+    "prices": "d",
+    "calories": "i",
+    "preparation_times": "i",
+    "created_by": "q",
+    "created_at": "d",
+    "updated_at": "d",
+    "price_order": "i",
+    "calorie_order": "i",
+    "preparation_order": "i",
+}
+STRING_COLUMNS = ("names", "descriptions", "image_urls")
+
+# Sıralanabilir alanlar (snapshot, vektör motoru ve SQL yolu aynı listeyi kullanır)
+SORT_KEYS = ("name", "price", "created_at", "calories", "preparation_time")
+SORT_BY_PATTERN = f"^({'|'.join(SORT_KEYS)})$"
+
+# build_snapshot: sunucudan parça başına çekilen satır sayısı
+SNAPSHOT_FETCH_SIZE = 2000
+
+
+# ---- Yardımcılar ----
+def _to_ts(value: Optional[datetime]) -> float:
+    if value is None:
+        return float("nan")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _from_ts(value: float) -> Optional[datetime]:
+    if value != value:  # NaN
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+def _bits_from_rows(rows, size: int) -> int:
+    """Satır indekslerinden bitset üretir (O(k) + O(n/8))."""
+    buf = bytearray((size + 7) // 8)
+    for r in rows:
+        buf[r >> 3] |= 1 << (r & 7)
+    return int.from_bytes(buf, "little")
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Bitset içindeki satır indekslerini artan sırada döndürür."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for byte_idx, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (byte_idx << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class StringColumn:
+    """Ofset dizisi + ortak UTF-8 blob üzerinde tembel çözülen metin sütunu."""
+
+    __slots__ = ("_offsets", "_blob", "_nulls", "_size")
+
+    def __init__(self, offsets, blob, nulls: int, size: int):
+        self._offsets = offsets
+        self._blob = blob
+        self._nulls = nulls
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self._nulls >> i & 1:
+            return None
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for i in range(self._size):
+            yield self[i]
+
+    def parts(self) -> tuple:
+        """(ofsetler, blob, null bitseti)."""
+        return self._offsets, self._blob, self._nulls
+
+    @classmethod
+    def from_values(cls, values: Iterable[Optional[str]]) -> "StringColumn":
+        builder = StringColumnBuilder()
+        for value in values:
+            builder.append(value)
+        return builder.finish()
+
+
+class StringColumnBuilder:
+    """StringColumn'u tek geçişte doldurur; değerler tek tek str olarak tutulmaz."""
+
+    __slots__ = ("_offsets", "_blob", "_nulls", "_size")
+
+    def __init__(self):
+        self._offsets = array("q", [0])
+        self._blob = bytearray()
+        self._nulls = bytearray()
+        self._size = 0
+
+    def append(self, value: Optional[str]) -> None:
+        i = self._size
+        if not i & 7:
+            self._nulls.append(0)
+        if value is None:
+            self._nulls[i >> 3] |= 1 << (i & 7)
+        else:
+            self._blob += value.encode("utf-8")
+        self._offsets.append(len(self._blob))
+        self._size = i + 1
+
+    def finish(self) -> StringColumn:
+        return StringColumn(self._offsets, self._blob, int.from_bytes(self._nulls, "little"), self._size)
+
+
+class MenuSnapshot:
+    """Belirli bir andaki menünün salt-okunur, sütun bazlı görüntüsü."""
+
+    def __init__(self, items, categories, version: int = 0):
+        """Sözlük satırlarından kurar; DB'den kurulum `from_rows` ile akış halinde yapılır."""
+        items = sorted(items, key=lambda i: i["id"])
+        self._build((tuple(i[field] for field in ITEM_FIELDS) for i in items), categories, version)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], categories, version: int = 0) -> "MenuSnapshot":
+        """ITEM_FIELDS sırasındaki, id'ye göre artan satırlardan tek geçişte kurar."""
+        snapshot = cls.__new__(cls)
+        snapshot._build(rows, categories, version)
+        return snapshot
+
+    def _build(self, rows: Iterable[tuple], categories, version: int) -> None:
+        self.version = version
+        self.built_at = time.time()
+
+        # Kategoriler: id -> alanlar (ad kategori başına tek str)
+        self.categories: Dict[int, dict] = {
+            c["id"]: {**c, "name": sys.intern(c["name"])} for c in categories
+        }
+
+        ids, category_ids, prices = array("q"), array("i"), array("d")
+        calories, preparation_times, created_by = array("i"), array("i"), array("q")
+        created_at, updated_at = array("d"), array("d")
+        names, descriptions, image_urls = StringColumnBuilder(), StringColumnBuilder(), StringColumnBuilder()
+        flag_bits = [bytearray() for _ in FLAG_COLUMNS]
+        rows_by_category: Dict[int, array] = {}
+
+        n = 0
+        for (item_id, name, description, price, category_id, image_url, calorie, preparation_time,
+             *flags, created, updated, creator) in rows:
+            if n and item_id <= ids[-1]:
+                raise ValueError("Snapshot satırları id'ye göre artan sırada olmalı")
+            ids.append(item_id)
+            category_ids.append(category_id)
+            prices.append(float(price))
+            calories.append(NULL_INT if calorie is None else calorie)
+            preparation_times.append(NULL_INT if preparation_time is None else preparation_time)
+            created_by.append(NULL_INT if creator is None else creator)
+            created_at.append(_to_ts(created))
+            updated_at.append(_to_ts(updated))
+            names.append(name)
+            descriptions.append(description)
+            image_urls.append(image_url)
+            if not n & 7:
+                for bits in flag_bits:
+                    bits.append(0)
+            for bits, value in zip(flag_bits, flags):
+                if value:
+                    bits[n >> 3] |= 1 << (n & 7)
+            category_rows = rows_by_category.get(category_id)
+            if category_rows is None:
+                category_rows = rows_by_category[category_id] = array("i")
+            category_rows.append(n)
+            n += 1
+
+        self.size = n
+        self.all_mask = (1 << n) - 1
+        self.ids, self.category_ids, self.prices = ids, category_ids, prices
+        self.calories, self.preparation_times, self.created_by = calories, preparation_times, created_by
+        self.created_at, self.updated_at = created_at, updated_at
+        self.names = names.finish()
+        self.descriptions = descriptions.finish()
+        self.image_urls = image_urls.finish()
+
+        # Bayrak ve kategori bitsetleri
+        self.flags: Dict[str, int] = {
+            flag: int.from_bytes(bits, "little") for flag, bits in zip(FLAG_COLUMNS, flag_bits)
+        }
+        self.category_masks: Dict[int, int] = {
+            cat_id: _bits_from_rows(category_rows, n) for cat_id, category_rows in rows_by_category.items()
+        }
+
+        # Fiyat/kalori/süre sırasına göre satır indeksleri → aralık = iki bisect(key=...)
+        # (NULL kalori/süre sıralamaya girmez; SQL'deki gibi aralık filtresine takılmaz)
+        self.price_order = array("i", sorted(range(n), key=prices.__getitem__))
+        self.calorie_order = array(
+            "i", sorted((r for r in range(n) if calories[r] != NULL_INT), key=calories.__getitem__)
+        )
+        self.preparation_order = array(
+            "i",
+            sorted((r for r in range(n) if preparation_times[r] != NULL_INT), key=preparation_times.__getitem__),
+        )
+        self._finish()
+        # Arama metni de burada (arka plandaki kurulumda) hazırlanır: ilk arama bedel ödemez
+        self._search_text = self._build_search_text()
+
+    @classmethod
+    def from_state(cls, *, version: int, built_at: float, size: int, categories, columns: dict,
+                   flags: Dict[str, int], category_masks: Dict[int, int]) -> "MenuSnapshot":
+        """Hazır sütunlardan (ör. diskten eşlenmiş dosya) snapshot kurar; yeniden hesaplama yapmaz."""
+        snapshot = cls.__new__(cls)
+        snapshot.version = version
+        snapshot.built_at = built_at
+        snapshot.size = size
+        snapshot.all_mask = (1 << size) - 1
+        snapshot.categories = {c["id"]: c for c in categories}
+        for name, value in columns.items():
+            setattr(snapshot, name, value)
+        snapshot.flags = flags
+        snapshot.category_masks = category_masks
+        snapshot._finish()
+        return snapshot
+
+    def _finish(self) -> None:
+        # Arama metni: casefold edilmiş "ad\naçıklama" satırları "\0" ile tek str'de + satır başları.
+        # _build hemen kurar; diskten eşlenen snapshot'ta ilk aramada kurulur
+        self._search_text: Optional[tuple] = None
+        # Yayından önce menu_store'un indeks kurucuları ekler (menu_vector.attach_index)
+        self.vector_index = None
+
+    def _build_search_text(self) -> tuple:
+        starts = array("q")
+        parts = []
+        position = 0
+        for name, description in zip(self.names, self.descriptions):
+            text = f"{name}\n{description or ''}".casefold()
+            starts.append(position)
+            parts.append(text)
+            position += len(text) + 1
+        return "\0".join(parts), starts
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.built_at)
+
+    # ---- Filtreleme ----
+    def _range_mask(self, values, order, low, high) -> int:
+        key = values.__getitem__
+        start = bisect_left(order, low, key=key) if low is not None else 0
+        end = bisect_right(order, high, key=key) if high is not None else len(order)
+        if start == 0 and end == self.size:
+            return self.all_mask
+        return _bits_from_rows(order[start:end], self.size)
+
+    def _text_mask(self, term: str) -> int:
+        if self._search_text is None:
+            self._search_text = self._build_search_text()
+        text, starts = self._search_text
+        needle = term.casefold()
+        if "\0" in needle:
+            return 0
+        rows = []
+        position = text.find(needle)
+        while position >= 0:
+            r = bisect_right(starts, position) - 1
+            rows.append(r)
+            if r + 1 >= self.size:
+                break
+            position = text.find(needle, starts[r + 1])
+        return _bits_from_rows(rows, self.size)
+
+    def filter_mask(
+        self,
+        *,
+        category_id: Union[int, Sequence[int], None] = None,
+        is_available: Optional[bool] = None,
+        is_featured: Optional[bool] = None,
+        is_vegetarian: Optional[bool] = None,
+        is_vegan: Optional[bool] = None,
+        is_gluten_free: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_calories: Optional[int] = None,
+        max_calories: Optional[int] = None,
+        max_prep_time: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> int:
+        """
+        Filtreleri bitset AND'leri ile birleştirir; eşleşen satırların maskesini döner.
+        category_id tek değer veya liste olabilir (liste → kategori bitsetlerinin OR'u).
+        """
+        mask = self.all_mask
+        if category_id is not None:
+            category_ids = (category_id,) if isinstance(category_id, int) else category_id
+            category_mask = 0
+            for cat_id in category_ids:
+                category_mask |= self.category_masks.get(cat_id, 0)
+            mask &= category_mask
+        for flag, wanted in (
+            ("is_available", is_available),
+            ("is_featured", is_featured),
+            ("is_vegetarian", is_vegetarian),
+            ("is_vegan", is_vegan),
+            ("is_gluten_free", is_gluten_free),
+        ):
+            if wanted is None:
+                continue
+            mask &= self.flags[flag] if wanted else (self.all_mask ^ self.flags[flag])
+        if min_price is not None or max_price is not None:
+            mask &= self._range_mask(self.prices, self.price_order, min_price, max_price)
+        if min_calories is not None or max_calories is not None:
+            mask &= self._range_mask(self.calories, self.calorie_order, min_calories, max_calories)
+        if max_prep_time is not None:
+            mask &= self._range_mask(self.preparation_times, self.preparation_order, None, max_prep_time)
+        if search and mask:
+            mask &= self._text_mask(search)
+        return mask
+
+    def price_range_mask(self, low: Optional[float], high: Optional[float], *, high_inclusive: bool = True) -> int:
+        key = self.prices.__getitem__
+        start = bisect_left(self.price_order, low, key=key) if low is not None else 0
+        if high is None:
+            end = self.size
+        elif high_inclusive:
+            end = bisect_right(self.price_order, high, key=key)
+        else:
+            end = bisect_left(self.price_order, high, key=key)
+        return _bits_from_rows(self.price_order[start:end], self.size)
+
+    # ---- Satır erişimi ----
+    def row_of(self, item_id: int) -> Optional[int]:
+        # ids artan sıralı: sözlük yerine ikili arama (paylaşılan snapshot'ta kopya yok)
+        row = bisect_left(self.ids, item_id)
+        if row < self.size and self.ids[row] == item_id:
+            return row
+        return None
+
+    def category_name(self, category_id: int) -> str:
+        category = self.categories.get(category_id)
+        return category["name"] if category else ""
+
+    def list_row(self, r: int, fields: Optional[Sequence[str]] = None) -> dict:
+        """MenuItemList alanları; `fields` verilirse sadece onlar (gereksiz metinler çözülmez)."""
+        if fields is not None:
+            return {name: _LIST_GETTERS[name](self, r) for name in fields}
+        return {
+            "id": self.ids[r],
+            "name": self.names[r],
+            "description": self.descriptions[r],
+            "price": self.prices[r],
+            "category_name": self.category_name(self.category_ids[r]),
+            "is_available": bool(self.flags["is_available"] >> r & 1),
+            "is_featured": bool(self.flags["is_featured"] >> r & 1),
+            "image_url": self.image_urls[r],
+        }
+
+    def detail_row(self, r: int) -> dict:
+        """MenuItemResponse alanları."""
+        category_id = self.category_ids[r]
+        optional_int = lambda value: None if value == NULL_INT else value
+        return {
+            "id": self.ids[r],
+            "name": self.names[r],
+            "description": self.descriptions[r],
+            "price": self.prices[r],
+            "category_id": category_id,
+            "category": {"id": category_id, "name": self.category_name(category_id)},
+            "image_url": self.image_urls[r],
+            "calories": optional_int(self.calories[r]),
+            "preparation_time": optional_int(self.preparation_times[r]),
+            **{flag: bool(self.flags[flag] >> r & 1) for flag in FLAG_COLUMNS},
+            "created_at": _from_ts(self.created_at[r]),
+            "updated_at": _from_ts(self.updated_at[r]),
+            "created_by": optional_int(self.created_by[r]),
+        }
+
+    def page(self, mask: int, skip: int, limit: int, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Maske içindeki satırları id sırasıyla sayfalar."""
+        result = []
+        for position, r in enumerate(iter_bits(mask)):
+            if position < skip:
+                continue
+            if len(result) >= limit:
+                break
+            result.append(self.list_row(r, fields))
+        return result
+
+    def sort_key(self, sort_by: str) -> Callable[[int], tuple]:
+        """
+        Satır → (değer, id); NULL'lar en küçük sayılır (SQL Server / SQLite ile aynı).
+        Ad kod noktası sırasıyla karşılaştırılır (SQL yolu: database.binary_order).
+        """
+        ids = self.ids
+        if sort_by == "name":
+            names = self.names
+            return lambda r: (names[r], ids[r])
+        if sort_by == "created_at":
+            created_at = self.created_at
+            return lambda r: (created_at[r] if created_at[r] == created_at[r] else float("-inf"), ids[r])
+        column = {
+            "price": self.prices,
+            "calories": self.calories,  # NULL_INT (-1) gerçek değerlerden küçük
+            "preparation_time": self.preparation_times,
+        }[sort_by]
+        return lambda r: (column[r], ids[r])
+
+    def sorted_page(self, mask: int, sort_by: str, descending: bool, skip: int, limit: int,
+                    fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Maske içindeki satırları alana göre sıralı sayfalar (sadece ilk skip + limit seçilir)."""
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        rows = pick(skip + limit, iter_bits(mask), key=self.sort_key(sort_by))
+        return [self.list_row(r, fields) for r in rows[skip:]]
+
+
+# Seyrek alan kümeleri için MenuItemList alanı → değer okuyucu
+_LIST_GETTERS: Dict[str, Callable[[MenuSnapshot, int], Any]] = {
+    "id": lambda s, r: s.ids[r],
+    "name": lambda s, r: s.names[r],
+    "description": lambda s, r: s.descriptions[r],
+    "price": lambda s, r: s.prices[r],
+    "category_name": lambda s, r: s.category_name(s.category_ids[r]),
+    "is_available": lambda s, r: bool(s.flags["is_available"] >> r & 1),
+    "is_featured": lambda s, r: bool(s.flags["is_featured"] >> r & 1),
+    "image_url": lambda s, r: s.image_urls[r],
+}
+
+
+class MenuStore:
+    """Süreç içi snapshot sahibi: tembel kurulum, sürüm ile geçersiz kılma ve TTL."""
+
+    def __init__(self):
+        self._snapshot: Optional[MenuSnapshot] = None
+        self._fallback: Optional[MenuSnapshot] = None  # diskten yüklenen son sağlam snapshot
+        self._outage_until = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # aynı anda tek yeniden kurma
+        self._rebuilding = False
+        self._shared = None  # çok süreçli mod: SharedMenuCache
+        self._index_builders: List[Callable[[MenuSnapshot], None]] = []
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def generation(self) -> int:
+        """Menü nesli: paylaşımlı modda tüm süreçlerde ortak sayaç, yoksa yerel sürüm."""
+        if self._shared is not None:
+            return self._shared.generation()
+        return self._version
+
+    def attach_shared(self, shared) -> None:
+        """Snapshot'ı süreçler arası paylaşılan (mmap) önbellekten okumaya geçer."""
+        self._shared = shared
+
+    def add_index_builder(self, builder: Callable[[MenuSnapshot], None]) -> None:
+        """Snapshot yayınlanmadan önce arka planda çalışacak indeks kurucuyu kaydeder."""
+        self._index_builders.append(builder)
+
+    def build_indexes(self, snapshot: MenuSnapshot) -> None:
+        """Kayıtlı indeksleri snapshot'a ekler; hata snapshot'ın yayınlanmasını engellemez."""
+        for builder in self._index_builders:
+            try:
+                builder(snapshot)
+            except Exception as e:
+                print(f"⚠️ Snapshot indeksi kurulamadı: {e}")
+
+    def invalidate(self) -> int:
+        """Snapshot'ı geçersiz kılar ve yeni nesli döner."""
+        with self._lock:
+            self._version += 1
+        if self._shared is not None:
+            return self._shared.bump()
+        return self._version
+
+    def peek(self) -> Optional[MenuSnapshot]:
+        """Geçerli (bayat olmayan) snapshot varsa döner; yoksa None. DB'ye gitmez."""
+        if self._shared is not None:
+            return self._shared.current()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self._version:
+            return None
+        if time.time() - snapshot.built_at > settings.MENU_STORE_TTL_SECONDS:
+            return None
+        return snapshot
+
+    def get(self) -> Optional[MenuSnapshot]:
+        """
+        Geçerli snapshot'ı döner. Bayatsa None döner (çağıran SQL yoluna düşer) ve
+        arka planda tek bir yeniden kurma başlatır; istek yolunda tablo taranmaz.
+        """
+        if not settings.MENU_STORE_ENABLED:
+            return None
+        snapshot = self.peek()
+        if snapshot is None and self._shared is None:
+            # Paylaşımlı modda kurulum tek bir yenileyici süreçte yapılır
+            self.revalidate()
+        return snapshot
+
+    def revalidate(self) -> None:
+        """Arka planda yeniden kurmayı başlatır; zaten çalışıyorsa veya kesinti sürüyorsa bir şey yapmaz."""
+        with self._lock:
+            if self._rebuilding or self.outage_active():
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, name="menu-store-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            db = SessionLocal()
+            try:
+                self.refresh(db)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Menü snapshot'ı yeniden kurulamadı: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def refresh(self, db: Session) -> Optional[MenuSnapshot]:
+        """
+        Snapshot bayatsa eşzamanlı olarak yeniden kurar (arka plan işleri için).
+        Aynı anda tek kurulum yapılır; kilidi bekleyenler kurulan snapshot'ı kullanır.
+        """
+        if not settings.MENU_STORE_ENABLED or self._shared is not None:
+            return self.peek()
+        with self._build_lock:
+            snapshot = self.peek()
+            if snapshot is not None:
+                return snapshot
+            snapshot = build_snapshot(db, self._version)
+            self.build_indexes(snapshot)
+            with self._lock:
+                current = self._snapshot
+                if current is None or current.version <= snapshot.version:
+                    self._snapshot = snapshot
+            return snapshot
+
+    # ---- Kesinti (stale-while-revalidate) desteği ----
+    def set_fallback(self, snapshot: Optional[MenuSnapshot]) -> None:
+        self._fallback = snapshot
+
+    def stale_snapshot(self) -> Optional[MenuSnapshot]:
+        """Bayat da olsa elimizdeki en yeni snapshot (önce bellek, sonra disk)."""
+        if self._shared is not None:
+            return self._shared.latest() or self._fallback
+        return self._snapshot or self._fallback
+
+    def report_outage(self) -> None:
+        self._outage_until = time.time() + settings.DB_OUTAGE_BACKOFF_SECONDS
+
+    def outage_active(self) -> bool:
+        return time.time() < self._outage_until
+
+
+def build_snapshot(db: Session, version: int = 0) -> MenuSnapshot:
+    """
+    Kategorileri ve menü öğelerini iki projeksiyon sorgusuyla okuyup snapshot kurar.
+    Öğe satırları id sırasıyla parça parça (yield_per) akar; ORM nesnesi veya satır
+    sözlüğü oluşturulmaz.
+    """
+    categories = [
+        {
+            "id": c.id,
+            "name": c.name,
+            "description": c.description,
+            "is_active": c.is_active,
+            "display_order": c.display_order,
+            "created_at": c.created_at,
+            "updated_at": c.updated_at,
+        }
+        for c in db.query(
+            Category.id,
+            Category.name,
+            Category.description,
+            Category.is_active,
+            Category.display_order,
+            Category.created_at,
+            Category.updated_at,
+        )
+    ]
+    columns = [getattr(MenuItem, field) for field in ITEM_FIELDS]
+    rows = db.query(*columns).order_by(MenuItem.id).yield_per(SNAPSHOT_FETCH_SIZE)
+    return MenuSnapshot.from_rows(rows, categories, version)
+
+
+menu_store = MenuStore()
+
+
+def mark_stale(response: Response, snapshot: MenuSnapshot) -> None:
+    response.headers["X-Menu-Stale"] = "true"
+    response.headers["X-Menu-Snapshot-Age"] = str(int(snapshot.age_seconds))
+    response.headers["Warning"] = '110 - "Response is Stale"'
+
+
+def serve_with_fallback(response: Response, fresh: Callable[[], Any], from_snapshot: Callable[[MenuSnapshot], Any],
+                        db: Optional[Session] = None):
+    """
+    Okuma uçları için stale-while-revalidate:
+    - Normalde fresh() çalışır (DB / geçerli snapshot)
+    - db verilirse fresh()'in sorguları DB_QUERY_TIMEOUT_SECONDS ile sınırlanır
+      (statement_timeout); sınır sadece bu okumalara uygulanır, yazmalara değil
+    - DB erişilemez veya zaman aşımına uğrarsa son snapshot'tan cevap verilir ve
+      yanıt bayat olarak işaretlenir
+    - Kesinti sürerken (backoff süresince) DB hiç denenmez
+    """
+    if not menu_store.outage_active():
+        try:
+            if db is None or settings.DB_QUERY_TIMEOUT_SECONDS <= 0:
+                return fresh()
+            with statement_timeout(db, settings.DB_QUERY_TIMEOUT_SECONDS):
+                return fresh()
+        except (*DB_UNAVAILABLE_ERRORS, StatementTimeout) as e:
+            print(f"⚠️ Veritabanı erişilemiyor, snapshot'tan servis ediliyor: {e!r}")
+            menu_store.report_outage()
+    snapshot = menu_store.stale_snapshot()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Veritabanına şu an ulaşılamıyor"
+        )
+    mark_stale(response, snapshot)
+    return from_snapshot(snapshot)
@@ -0,0 +1,29 @@
+# app/core/menu_tasks.py
+"""
+Menü yazmalarından sonra kuyruğa alınan arka plan işleri.
+
+Yazma uçları commit'ten sonra `enqueue(...)` ile bu işleri ekler; işler
+idempotenttir (spool en az bir kez çalıştırır).
+"""
+from app.core.availability import availability_index
+from app.core.featured_index import featured_index
+from app.core.menu_store import menu_store
+from app.core.tasks import task
+from app.db.database import SessionLocal
+
+WARM_MENU_CACHES = "menu.warm_caches"
+
+
+@task(WARM_MENU_CACHES)
+def warm_menu_caches(payload: dict) -> None:
+    """
+    Geçersiz kılınan menü snapshot'ını, featured ve takvim indekslerini yeniden kurar;
+    bir sonraki okuyucu yeniden kurma maliyetini ödemez.
+    """
+    db = SessionLocal()
+    try:
+        menu_store.refresh(db)
+        featured_index.ensure_loaded(db)
+        availability_index.ensure_loaded(db)
+    finally:
+        db.close()
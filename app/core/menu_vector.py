@@ -0,0 +1,157 @@
+# app/core/menu_vector.py
+"""
+Menü snapshot'ı üzerinde NumPy ile vektörel filtre + sıralama + top-k.
+
+- Sütunlar snapshot'taki dizilerden kopyasız (np.frombuffer) okunur
+- Tüm koşullar boolean vektör maskeleri olarak uygulanır
+- Sıralı sayfa için tüm küme sıralanmaz: argpartition ile ilk (skip + limit)
+  eleman seçilir, sadece onlar sıralanır
+
+NumPy opsiyoneldir; kurulu değilse `available()` False döner ve çağıranlar
+bitset yoluna düşer. İndeks snapshot ile birlikte arka planda kurulur ve ona
+eklenir (`attach_index`); istek yolu sadece hazır indeksi kullanır.
+"""
+from typing import Dict, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsiyonel bağımlılık
+    np = None
+
+from app.core.config import settings
+from app.core.menu_store import MenuSnapshot, menu_store
+
+
+def available() -> bool:
+    return np is not None and settings.VECTOR_ENGINE_ENABLED
+
+
+class VectorIndex:
+    """Tek bir snapshot sürümüne bağlı NumPy sütunları ve sıralama rank'leri."""
+
+    def __init__(self, snapshot: MenuSnapshot):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        n = snapshot.size
+        self.size = n
+
+        self.ids = np.frombuffer(snapshot.ids, dtype=np.int64) if n else np.zeros(0, np.int64)
+        self.category_ids = np.frombuffer(snapshot.category_ids, dtype=np.int32) if n else np.zeros(0, np.int32)
+        self.prices = np.frombuffer(snapshot.prices, dtype=np.float64) if n else np.zeros(0)
+        self.calories = np.frombuffer(snapshot.calories, dtype=np.int32) if n else np.zeros(0, np.int32)
+        self.preparation_times = (
+            np.frombuffer(snapshot.preparation_times, dtype=np.int32) if n else np.zeros(0, np.int32)
+        )
+        self.flags: Dict[str, "np.ndarray"] = {
+            flag: self.mask_to_bool(mask) for flag, mask in snapshot.flags.items()
+        }
+
+        # Her sıralama anahtarı için benzersiz rank (eşitlikte id ile bozulur)
+        created = np.frombuffer(snapshot.created_at, dtype=np.float64) if n else np.zeros(0)
+        created = np.where(np.isnan(created), -np.inf, created)  # NULL'lar başta (SQL Server gibi)
+        name_keys = sorted(range(n), key=lambda r: (snapshot.names[r], snapshot.ids[r]))
+        self.ranks: Dict[str, "np.ndarray"] = {
+            "name": self._rank_from_order(np.asarray(name_keys, dtype=np.int64)),
+            "price": self._rank_from_order(np.lexsort((self.ids, self.prices))),
+            "created_at": self._rank_from_order(np.lexsort((self.ids, created))),
+            # NULL_INT (-1) gerçek değerlerden küçük → NULL'lar başta
+            "calories": self._rank_from_order(np.lexsort((self.ids, self.calories))),
+            "preparation_time": self._rank_from_order(np.lexsort((self.ids, self.preparation_times))),
+        }
+
+    def _rank_from_order(self, order) -> "np.ndarray":
+        rank = np.empty(self.size, dtype=np.int64)
+        rank[order] = np.arange(self.size, dtype=np.int64)
+        return rank
+
+    def mask_to_bool(self, mask: int) -> "np.ndarray":
+        nbytes = (self.size + 7) // 8
+        raw = np.frombuffer(mask.to_bytes(nbytes, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little")[: self.size].astype(bool)
+
+    def filter(
+        self,
+        *,
+        category_id: Union[int, Sequence[int], None] = None,
+        is_available: Optional[bool] = None,
+        is_featured: Optional[bool] = None,
+        is_vegetarian: Optional[bool] = None,
+        is_vegan: Optional[bool] = None,
+        is_gluten_free: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_calories: Optional[int] = None,
+        max_calories: Optional[int] = None,
+        max_prep_time: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> "np.ndarray":
+        """Tüm koşulları vektör maskesi olarak uygular."""
+        mask = np.ones(self.size, dtype=bool)
+        if category_id is not None:
+            if isinstance(category_id, int):
+                mask &= self.category_ids == category_id
+            else:
+                mask &= np.isin(self.category_ids, np.asarray(list(category_id), dtype=np.int64))
+        for flag, wanted in (
+            ("is_available", is_available),
+            ("is_featured", is_featured),
+            ("is_vegetarian", is_vegetarian),
+            ("is_vegan", is_vegan),
+            ("is_gluten_free", is_gluten_free),
+        ):
+            if wanted is not None:
+                mask &= self.flags[flag] == wanted
+        if min_price is not None:
+            mask &= self.prices >= min_price
+        if max_price is not None:
+            mask &= self.prices <= max_price
+        if min_calories is not None or max_calories is not None:
+            mask &= self.calories >= 0
+            if min_calories is not None:
+                mask &= self.calories >= min_calories
+            if max_calories is not None:
+                mask &= self.calories <= max_calories
+        if max_prep_time is not None:
+            mask &= (self.preparation_times >= 0) & (self.preparation_times <= max_prep_time)
+        if search and mask.any():
+            mask &= self.mask_to_bool(self.snapshot._text_mask(search))
+        return mask
+
+    def top_k(self, mask, sort_by: str, descending: bool, skip: int, limit: int):
+        """Maskelenmiş satırlardan sıralı [skip, skip + limit) dilimini döner (satır indeksleri)."""
+        rows = np.flatnonzero(mask)
+        if not len(rows) or skip >= len(rows):
+            return rows[:0]
+        keys = self.ranks[sort_by][rows]
+        if descending:
+            keys = -keys
+        k = min(skip + limit, len(rows))
+        if k < len(rows):
+            candidates = np.argpartition(keys, k - 1)[:k]
+        else:
+            candidates = np.arange(len(rows))
+        ordered = candidates[np.argsort(keys[candidates])]
+        return rows[ordered[skip:k]]
+
+    def page(self, mask, sort_by: str, descending: bool, skip: int, limit: int, fields=None):
+        return [self.snapshot.list_row(int(r), fields) for r in self.top_k(mask, sort_by, descending, skip, limit)]
+
+
+def attach_index(snapshot: MenuSnapshot) -> None:
+    """
+    Snapshot'a vektör indeksini ekler. menu_store'un indeks kurucusu olarak
+    snapshot yayınlanmadan önce arka plan kurulumunda çalışır (istek yolunda değil).
+    """
+    if available() and snapshot.vector_index is None:
+        snapshot.vector_index = VectorIndex(snapshot)
+
+
+def index_for(snapshot: Optional[MenuSnapshot]) -> Optional[VectorIndex]:
+    """
+    Snapshot'a önceden eklenmiş vektör indeksini döner. İndeks henüz kurulmadıysa,
+    snapshot bayatsa (menu_store.peek() artık onu döndürmüyorsa) veya NumPy yoksa
+    None → çağıran bitset yoluna düşer. Burada indeks kurulmaz.
+    """
+    if snapshot is None or not available() or menu_store.peek() is not snapshot:
+        return None
+    return snapshot.vector_index
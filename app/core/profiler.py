@@ -0,0 +1,366 @@
+# app/core/profiler.py
+"""
+Örneklemeli (sampling) profiler.
+
+İsteğe bağlı, tek istek:
+- Admin token'ı ile `X-Profile: folded` başlığı (veya `?__profile=folded`)
+  → yanıt gövdesi yerine flame graph uyumlu "folded stacks" metni döner
+  (asıl durum kodu `X-Profile-Status` başlığında)
+- `X-Profile: store` → istek normal cevaplanır, profil saklanır; kimliği
+  `X-Profile-Id` başlığında, indirme: GET /api/v1/admin/profiles/{id}
+- İstek, ayrı bir iş parçacığındaki kısa ömürlü event loop'ta çalıştırılır;
+  o loop'un thread havuzu sadece bu isteğe hizmet eder → bağımlılıklar,
+  handler, ORM ve response_model doğrulaması diğer isteklerle karışmadan
+  örneklenir
+
+Sürekli, düşük frekans:
+- PROFILER_CONTINUOUS_HZ > 0 ise arka planda tüm worker thread'leri
+  örneklenir ve route'a göre toplanır; her süreç kendi dosyasını
+  PROFILER_DIR altına yazar, admin ucu tüm worker'ları birleştirir
+- Kapalıyken (varsayılan) maliyet: istek başına tek bir bayrak kontrolü
+"""
+import asyncio
+import glob
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Set
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB = sysconfig.get_paths()["stdlib"]
+PROFILE_MODES = ("folded", "store")
+# Bekleyen (iş yapmayan) thread'lerin tepe çerçeveleri; örneğe sayılmaz
+_IDLE_FRAMES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+
+
+# ---- Yığın → folded satırı ----
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    elif filename.startswith(_STDLIB) and "site-packages" not in filename:
+        filename = os.path.relpath(filename, _STDLIB)
+    else:
+        marker = "site-packages" + os.sep
+        index = filename.find(marker)
+        if index >= 0:
+            filename = filename[index + len(marker):]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+
+
+def folded_stack(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def render_folded(counts: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class Sampler:
+    """Seçilen thread'lerin yığınlarını periyodik olarak sayar."""
+
+    def __init__(self, interval: float, thread_ids: Callable[[], Iterable[int]]):
+        self._interval = interval
+        self._thread_ids = thread_ids
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_once(self) -> None:
+        frames = sys._current_frames()
+        for thread_id in list(self._thread_ids()):
+            frame = frames.get(thread_id)
+            if frame is not None and not is_idle(frame):
+                self.counts[folded_stack(frame)] += 1
+                self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.sample_once()
+
+    def __enter__(self) -> "Sampler":
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+# ---- Tek istek profili ----
+class ProfileStore:
+    """Son N profili tutar (indirme için)."""
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._profiles: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> str:
+        profile_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > self._capacity:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list:
+        with self._lock:
+            return [
+                {"id": pid, **{k: v for k, v in p.items() if k != "folded"}}
+                for pid, p in reversed(self._profiles.items())
+            ]
+
+
+profile_store = ProfileStore(settings.PROFILER_STORE_SIZE)
+
+
+def requested_mode(scope: Scope) -> Optional[str]:
+    mode = Headers(scope=scope).get("x-profile")
+    if mode is None:
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        mode = query.get("__profile")
+    return mode if mode in PROFILE_MODES else None
+
+
+def _is_admin_request(scope: Scope) -> bool:
+    # Yerel import: app.db.database bu modülü (attribute_thread) import eder
+    from app.core.security import decode_access_token
+    from app.db.database import SessionLocal
+    from app.models.user import User
+
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        return False
+    db = SessionLocal()
+    try:
+        user = db.get(User, int(payload["sub"]))
+        return bool(user and user.is_admin)
+    finally:
+        db.close()
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None or not await asyncio.to_thread(_is_admin_request, scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Gövdeyi ana loop'ta oku; yan loop kendi receive/send'i ile çalışır
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        profile, messages = await asyncio.to_thread(self._run_profiled, scope, bytes(body))
+
+        start = next(m for m in messages if m["type"] == "http.response.start")
+        route = f"{scope['method']} {scope['path']}"
+        profile.update(route=route, status=start["status"], at=time.time())
+        if mode == "folded":
+            payload = profile["folded"].encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(payload)).encode()),
+                    (b"x-profile-status", str(start["status"]).encode()),
+                    (b"x-profile-samples", str(profile["samples"]).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": payload})
+            return
+
+        profile_id = profile_store.add(profile)
+        start["headers"] = list(start["headers"]) + [(b"x-profile-id", profile_id.encode())]
+        for message in messages:
+            await send(message)
+
+    def _run_profiled(self, scope: Scope, body: bytes):
+        messages = []
+        loop_holder: Dict[str, object] = {}
+        runner_id = threading.get_ident()
+
+        async def local_receive() -> Message:
+            if loop_holder.get("body_sent"):
+                await asyncio.Event().wait()  # istemci bağlantısı burada kopmaz
+            loop_holder["body_sent"] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def local_send(message: Message) -> None:
+            messages.append(message)
+
+        async def run() -> None:
+            loop_holder["loop"] = asyncio.get_running_loop()
+            await self.app(scope, local_receive, local_send)
+
+        def thread_ids() -> Set[int]:
+            loop = loop_holder.get("loop")
+            # Yan loop'un anyio worker thread'leri `.loop` özniteliği taşır
+            ids = {t.ident for t in threading.enumerate() if loop is not None and getattr(t, "loop", None) is loop}
+            ids.add(runner_id)
+            return ids
+
+        started = time.perf_counter()
+        with Sampler(self.interval, thread_ids) as sampler:
+            asyncio.run(run())
+        return {
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "samples": sampler.samples,
+            "interval_ms": self.interval * 1000,
+            "folded": render_folded(sampler.counts),
+        }, messages
+
+
+# ---- Sürekli örnekleme (route bazında) ----
+_active_routes: Dict[int, str] = {}
+_continuous_enabled = False
+
+
+@contextmanager
+def _attribute(route: str):
+    thread_id = threading.get_ident()
+    _active_routes[thread_id] = route
+    try:
+        yield
+    finally:
+        _active_routes.pop(thread_id, None)
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+def attribute_thread(route: Optional[str]):
+    """Handler çalışırken bu thread'i route'a bağlar (sürekli örnekleme kapalıyken no-op)."""
+    if not _continuous_enabled or route is None:
+        return _noop()
+    return _attribute(route)
+
+
+class ContinuousProfiler:
+    def __init__(self, hz: float, directory: str, flush_seconds: float = 30.0):
+        self._interval = 1.0 / hz if hz > 0 else 0
+        self._directory = directory
+        self._flush_seconds = flush_seconds
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._interval > 0
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self._directory, f"continuous-{pid}.folded")
+
+    def sample_once(self) -> None:
+        frames = sys._current_frames()
+        for thread_id, route in list(_active_routes.items()):
+            frame = frames.get(thread_id)
+            if frame is not None and not is_idle(frame):
+                self.counts[f"{route};{folded_stack(frame)}"] += 1
+
+    def flush(self) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_folded(self.counts))
+        os.replace(tmp_path, path)
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while not self._stop.wait(self._interval):
+            self.sample_once()
+            if time.monotonic() - last_flush >= self._flush_seconds:
+                last_flush = time.monotonic()
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"⚠️ Profil dosyası yazılamadı: {e}")
+
+    def start(self) -> None:
+        global _continuous_enabled
+        if not self.enabled or self._thread is not None:
+            return
+        _continuous_enabled = True
+        self._thread = threading.Thread(target=self._run, name="profiler-continuous", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        global _continuous_enabled
+        _continuous_enabled = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def merged(self, route: Optional[str] = None) -> Counter:
+        """Tüm worker'ların dosyalarını (ve bu sürecin güncel sayaçlarını) birleştirir."""
+        merged: Counter = Counter()
+        own_path = self._path(os.getpid())
+        for path in glob.glob(os.path.join(self._directory, "continuous-*.folded")):
+            if path == own_path:
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if stack and count.isdigit():
+                        merged[stack] += int(count)
+        merged.update(self.counts)
+        if route:
+            prefix = f"{route};"
+            merged = Counter({k: v for k, v in merged.items() if k.startswith(prefix)})
+        return merged
+
+
+continuous_profiler = ContinuousProfiler(
+    settings.PROFILER_CONTINUOUS_HZ,
+    settings.PROFILER_DIR,
+    settings.PROFILER_FLUSH_SECONDS,
+)
@@ -0,0 +1,45 @@
+# app/core/routing.py
+"""
+Profil ve trace ölçümü yapan route sınıfı.
+
+- SessionReleasingRoute'un (bağlantıyı handler dönünce bırakır) üzerine
+  handler'ı sarar: sürekli profil örneklemesinde çalışan thread route'a
+  bağlanır, tracing açıksa handler span'i ve faz sınırları işaretlenir
+- Ölçüm sarmalayıcısı handler'ın çalıştığı thread'de (senkron handler'larda
+  threadpool) çalışır; bu yüzden middleware değil route sınıfıdır
+- DB katmanı profiler / tracing modüllerini import etmez
+"""
+import asyncio
+import functools
+
+from app.core.profiler import attribute_thread
+from app.core.tracing import handler_phase
+from app.db.database import SessionReleasingRoute, current_route
+
+
+def _instrumented(endpoint):
+    if getattr(endpoint, "__instrumented__", False):
+        return endpoint  # include_router route'u yeniden kurarken çift sarmalama olmasın
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            with handler_phase(current_route()):
+                return await endpoint(*args, **kwargs)
+        async_wrapper.__instrumented__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        route = current_route()
+        with attribute_thread(route), handler_phase(route):  # profil örneklemesi + trace fazları
+            return endpoint(*args, **kwargs)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+class InstrumentedRoute(SessionReleasingRoute):
+    """Bağlantıyı erken bırakan ve handler'ı profil / trace için ölçen route sınıfı."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _instrumented(endpoint), **kwargs)
@@ -1,17 +1,57 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import argon2
 from app.core.config import settings
 
 ALGORITHM = settings.JWT_ALG
 SECRET_KEY = settings.JWT_SECRET
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_SCHEMES = ("bcrypt", "scrypt", "argon2")
+
+def build_password_context(
+    scheme: str = settings.PASSWORD_HASH_SCHEME,
+    *,
+    bcrypt_rounds: int = settings.BCRYPT_ROUNDS,
+    scrypt_rounds: int = settings.SCRYPT_ROUNDS,
+    scrypt_block_size: int = settings.SCRYPT_BLOCK_SIZE,
+    scrypt_parallelism: int = settings.SCRYPT_PARALLELISM,
+    argon2_time_cost: int = settings.ARGON2_TIME_COST,
+    argon2_memory_cost: int = settings.ARGON2_MEMORY_COST,
+    argon2_parallelism: int = settings.ARGON2_PARALLELISM,
+) -> CryptContext:
+    """
+    Varsayılan şema + maliyetle CryptContext kurar.
+    - Diğer şemalar doğrulama için tanınır ama "deprecated" sayılır
+    - Şeması veya maliyeti ayardan farklı hash'ler needs_update → True
+    """
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Geçersiz PASSWORD_HASH_SCHEME: {scheme} (seçenekler: {', '.join(PASSWORD_SCHEMES)})")
+    if scheme == "argon2" and not argon2.has_backend():
+        raise ValueError("PASSWORD_HASH_SCHEME=argon2 için 'argon2-cffi' paketi kurulu olmalı")
+    return CryptContext(
+        schemes=list(PASSWORD_SCHEMES),
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        scrypt__rounds=scrypt_rounds,
+        scrypt__block_size=scrypt_block_size,
+        scrypt__parallelism=scrypt_parallelism,
+        argon2__rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+pwd_context = build_password_context()
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    """(doğru mu, yeni hash | None) — yeni hash varsa eski şema/maliyet yükseltilmeli."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password):
     return pwd_context.hash(password)
 
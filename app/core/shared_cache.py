@@ -0,0 +1,171 @@
+# app/core/shared_cache.py
+"""
+Worker süreçleri arasında paylaşılan menü snapshot'ı.
+
+- Tek bir yenileyici süreç (dosya kilidiyle seçilir) snapshot'ı kurar ve
+  snapshot dosyasına (snapshot_file formatı) atomik olarak yayınlar
+- Worker'lar dosyayı mmap ile eşler: sayısal sütunlar kopyalanmaz, sayfa
+  önbelleği tüm süreçlerde ortaktır → worker sayısı arttıkça bellek sabit
+- Geçersiz kılma kanalı: `<yol>.ctl` dosyasında mmap'li 8 baytlık nesil
+  sayacı. Yazma uçları sayacı artırır; tüm worker'lar aynı anda görür.
+  Nesli tutmayan snapshot bayattır ve servis edilmez (SQL'e düşülür),
+  yenileyici yeni nesli yayınlayana kadar.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: paylaşımlı mod desteklenmez
+    fcntl = None
+
+from app.core.config import settings
+from app.core.menu_store import MenuSnapshot, build_snapshot, menu_store
+from app.core.snapshot_file import load_snapshot, write_snapshot
+
+_GENERATION = struct.Struct("<Q")
+
+
+def supported() -> bool:
+    return fcntl is not None
+
+
+class SharedMenuCache:
+    def __init__(self, path: str, session_factory):
+        self.path = path
+        self._session_factory = session_factory
+        self._ctl_file = open(self._ensure_ctl(f"{path}.ctl"), "r+b")
+        self._ctl = mmap.mmap(self._ctl_file.fileno(), _GENERATION.size)
+        self._lock_path = f"{path}.lock"
+        self._lock_file = None
+        self._mapped: Optional[MenuSnapshot] = None
+        self._mapped_stat = None
+        self._map_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _ensure_ctl(ctl_path: str) -> str:
+        fd = os.open(ctl_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _GENERATION.size:
+                os.write(fd, b"\0" * _GENERATION.size)
+        finally:
+            os.close(fd)
+        return ctl_path
+
+    # ---- Nesil sayacı (geçersiz kılma kanalı) ----
+    def generation(self) -> int:
+        return _GENERATION.unpack_from(self._ctl, 0)[0]
+
+    def bump(self) -> int:
+        """Nesli artırır; süreçler arası kilit altında oku-değiştir-yaz."""
+        fcntl.flock(self._ctl_file.fileno(), fcntl.LOCK_EX)
+        try:
+            generation = self.generation() + 1
+            _GENERATION.pack_into(self._ctl, 0, generation)
+            return generation
+        finally:
+            fcntl.flock(self._ctl_file.fileno(), fcntl.LOCK_UN)
+
+    # ---- Okuyucu (tüm worker'lar) ----
+    def _remap(self) -> Optional[MenuSnapshot]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return self._mapped
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat_key == self._mapped_stat:
+            return self._mapped
+        with self._map_lock:
+            if stat_key != self._mapped_stat:
+                try:
+                    self._mapped = load_snapshot(self.path)
+                    self._mapped_stat = stat_key
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Paylaşılan menü snapshot'ı eşlenemedi: {e}")
+        return self._mapped
+
+    def latest(self) -> Optional[MenuSnapshot]:
+        """Bayat olsa bile yayınlanmış son snapshot."""
+        return self._remap()
+
+    def current(self) -> Optional[MenuSnapshot]:
+        """Neslini tutan ve TTL içindeki snapshot; yoksa None."""
+        snapshot = self._remap()
+        if snapshot is None or snapshot.version != self.generation():
+            return None
+        if snapshot.age_seconds > 2 * settings.MENU_STORE_TTL_SECONDS:
+            return None  # yenileyici çalışmıyor olabilir
+        return snapshot
+
+    # ---- Yenileyici (tek süreç) ----
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="menu-shared-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()  # kilit bırakılır, başka süreç devralır
+            self._lock_file = None
+
+    def _try_lead(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        lock_file = open(self._lock_path, "a+b")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def publish_once(self) -> bool:
+        """Yayınlanan snapshot nesli tutmuyor veya TTL'i dolduysa yeniden kurup yayınlar."""
+        generation = self.generation()  # sorgudan ÖNCE okunur: araya giren yazma yeni nesil yaratır
+        published = self._remap()
+        if (
+            published is not None
+            and published.version == generation
+            and published.age_seconds < settings.MENU_STORE_TTL_SECONDS
+        ):
+            return False
+        db = self._session_factory()
+        try:
+            snapshot = build_snapshot(db, generation)
+        finally:
+            db.close()
+        write_snapshot(snapshot, self.path)
+        return True
+
+    def _index_mapped(self) -> None:
+        """Eşlenen snapshot'ın indeksleri her süreçte bu thread'de kurulur (istek yolunda değil)."""
+        snapshot = self._remap()
+        if snapshot is not None:
+            menu_store.build_indexes(snapshot)
+
+    def _run(self) -> None:
+        interval = settings.MENU_SHARED_REFRESH_INTERVAL_MS / 1000
+        while not self._stop.is_set():
+            try:
+                if self._try_lead():
+                    self.publish_once()
+                    self._index_mapped()
+                    self._stop.wait(interval)
+                else:
+                    self._index_mapped()
+                    self._stop.wait(max(interval, 1.0))  # lider ölürse kilit boşalır
+            except Exception as e:
+                print(f"⚠️ Paylaşılan menü snapshot'ı yayınlanamadı: {e}")
+                self._stop.wait(max(interval, 1.0))
@@ -0,0 +1,151 @@
+# app/core/singleflight.py
+"""
+Aynı anda gelen özdeş okuma isteklerini birleştiren (single-flight) middleware.
+
+- Anahtar: yol + sıralanmış sorgu parametreleri + menü nesli
+- İlk gelen istek (lider) uygulamayı çalıştırır; aynı anahtarla beklemekte
+  olanlar (takipçiler) liderin serileştirilmiş yanıtının (durum, başlıklar,
+  gövde) kopyasını alır → tek DB sorgusu, tek serileştirme
+- Lider hata verirse (istisna) aynı hata takipçilere iletilir; 5xx yanıtlar da
+  olduğu gibi paylaşılır
+- Takipçi SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS içinde cevap alamazsa isteği
+  kendisi çalıştırır (lider takılırsa herkes beklemez)
+- Sadece herkese açık menü okuma uçları birleştirilir; yanıt kullanıcıya göre
+  değişmez
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.menu_store import menu_store
+from app.core.profiler import requested_mode
+
+_COALESCED_PREFIXES = (
+    "/api/v1/menu-items",
+    "/api/v1/categories",
+)
+
+
+@dataclass
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    max_waiters: int = 0
+
+    def as_dict(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_waiters": self.max_waiters,
+            "coalesce_ratio": round(self.coalesced / total, 4) if total else 0.0,
+        }
+
+
+singleflight_stats = SingleFlightStats()
+
+
+@dataclass
+class _Flight:
+    future: "asyncio.Future[List[Message]]"
+    waiters: int = field(default=0)
+
+
+def request_key(scope: Scope) -> Tuple[str, str, int]:
+    """Parametre sırası farklı olsa da aynı sorguyu aynı anahtara indirger."""
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    return scope["path"], urlencode(sorted(query)), menu_store.generation
+
+
+async def _replay(messages: List[Message], send: Send) -> None:
+    # Dış middleware'ler (sıkıştırma) başlık listesini yerinde değiştirir → kopya gönder
+    for message in messages:
+        if "headers" in message:
+            message = {**message, "headers": list(message["headers"])}
+        await send(message)
+
+
+class SingleFlightMiddleware:
+    def __init__(self, app: ASGIApp, wait_timeout: float = 5.0, stats: Optional[SingleFlightStats] = None):
+        self.app = app
+        self.wait_timeout = wait_timeout
+        self.stats = stats if stats is not None else singleflight_stats
+        self._flights: Dict[tuple, _Flight] = {}
+
+    def _coalescable(self, scope: Scope) -> bool:
+        return (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and scope["path"].startswith(_COALESCED_PREFIXES)
+            and requested_mode(scope) is None  # profillenen istek kendi başına çalışmalı
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._coalescable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        key = request_key(scope)
+        flight = self._flights.get(key)
+        if flight is not None:
+            await self._follow(flight, scope, receive, send)
+            return
+
+        flight = _Flight(asyncio.get_running_loop().create_future())
+        self._flights[key] = flight
+        self.stats.leaders += 1
+        self.stats.in_flight += 1
+        try:
+            messages = await self._capture(scope, receive)
+        except asyncio.CancelledError:
+            flight.future.cancel()  # lider iptal edildi (istemci koptu); takipçiler kendisi çalışır
+            raise
+        except Exception as exc:
+            self.stats.errors += 1
+            flight.future.set_exception(exc)
+            flight.future.exception()  # takipçi yoksa "never retrieved" uyarısını bastır
+            raise
+        else:
+            flight.future.set_result(messages)
+        finally:
+            self.stats.in_flight -= 1
+            self._flights.pop(key, None)
+
+        await _replay(messages, send)
+
+    async def _follow(self, flight: _Flight, scope: Scope, receive: Receive, send: Send) -> None:
+        flight.waiters += 1
+        self.stats.max_waiters = max(self.stats.max_waiters, flight.waiters)
+        try:
+            messages = await asyncio.wait_for(asyncio.shield(flight.future), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            await self.app(scope, receive, send)
+            return
+        except asyncio.CancelledError:
+            if not flight.future.cancelled():
+                raise  # bu isteğin kendisi iptal edildi
+            await self.app(scope, receive, send)
+            return
+        self.stats.coalesced += 1
+        await _replay(messages, send)
+
+    async def _capture(self, scope: Scope, receive: Receive) -> List[Message]:
+        messages: List[Message] = []
+
+        async def capture_send(message: Message) -> None:
+            messages.append(message)
+
+        await self.app(scope, receive, capture_send)
+        return messages
+
+
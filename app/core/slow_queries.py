@@ -0,0 +1,142 @@
+# app/core/slow_queries.py
+"""
+Yavaş sorgu kaydı (engine olaylarına bağlı).
+
+- Eşiği (SLOW_QUERY_THRESHOLD_MS) aşan her ifade için: SQL metni, bağlı
+  parametrelerin ŞEKLİ (değerler değil, tipler), süre ve çağıran route
+- İsteğe bağlı çalıştırma planı yakalama (SLOW_QUERY_CAPTURE_PLANS):
+    SQL Server → SET SHOWPLAN_XML ON (tahmini plan, sorgu çalıştırılmaz)
+    SQLite     → EXPLAIN QUERY PLAN
+  Aynı ifadenin planı PLAN_REUSE_SECONDS içinde tekrar yakalanmaz
+- Kayıtlar sınırlı bir halka tamponda (deque) tutulur; admin ucu okur
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.database import current_route
+
+PLAN_REUSE_SECONDS = 60
+_MAX_PLAN_CHARS = 64 * 1024
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Değerleri gizleyip sadece tiplerini döner: {"param_1": "int"} / ["str", "int"]."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _capture_plan(dialect_name: str, dbapi_connection, statement: str, parameters) -> Optional[str]:
+    if not statement.lstrip()[:6].upper() == "SELECT":
+        return None  # yazma ifadelerinin planı yakalanmaz
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect_name == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return "\n".join(f"{row[0]}|{row[1]}|{row[3]}" for row in cursor.fetchall())
+        if dialect_name == "mssql":
+            cursor.execute("SET SHOWPLAN_XML ON")
+            try:
+                cursor.execute(statement, parameters)
+                row = cursor.fetchone()
+                return row[0] if row else None
+            finally:
+                cursor.execute("SET SHOWPLAN_XML OFF")
+        return None
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, capacity: int, capture_plans: bool = False):
+        self.threshold_ms = threshold_ms
+        self.capture_plans = capture_plans
+        self._entries: deque = deque(maxlen=capacity)
+        self._plans: Dict[str, tuple] = {}  # ifade → (zaman, plan)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    # ---- Engine olayları ----
+    def install(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        plan = None
+        if self.capture_plans and not executemany:
+            plan = self._plan_for(conn, statement, parameters)
+        self.record(statement, parameter_shape(parameters, executemany), duration_ms, plan)
+
+    def _plan_for(self, conn, statement: str, parameters) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            cached = self._plans.get(statement)
+        if cached is not None and now - cached[0] < PLAN_REUSE_SECONDS:
+            return cached[1]
+        try:
+            plan = _capture_plan(conn.dialect.name, conn.connection.dbapi_connection, statement, parameters)
+        except Exception as e:
+            plan = f"plan yakalanamadı: {e}"
+        if plan is not None and len(plan) > _MAX_PLAN_CHARS:
+            plan = plan[:_MAX_PLAN_CHARS] + "…"
+        with self._lock:
+            if len(self._plans) >= self._entries.maxlen:
+                self._plans.clear()
+            self._plans[statement] = (now, plan)
+        return plan
+
+    # ---- Tampon ----
+    def record(self, statement: str, parameters, duration_ms: float, plan: Optional[str] = None) -> None:
+        entry = {
+            "at": time.time(),
+            "route": current_route(),
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "parameters": parameters,
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+    def entries(self, limit: int = 100, route: Optional[str] = None, min_duration_ms: float = 0) -> List[dict]:
+        """En yeniden eskiye kayıtlar."""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        if route:
+            entries = [e for e in entries if e["route"] == route]
+        if min_duration_ms:
+            entries = [e for e in entries if e["duration_ms"] >= min_duration_ms]
+        return entries[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_BUFFER_SIZE,
+    capture_plans=settings.SLOW_QUERY_CAPTURE_PLANS,
+)
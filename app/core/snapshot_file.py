@@ -0,0 +1,208 @@
+# app/core/snapshot_file.py
+"""
+Menü snapshot'ının diske yazılan kompakt ikili formatı.
+
+Yerleşim:
+    MAGIC (8 bayt) | meta uzunluğu (u32) | meta JSON | 8 bayt hizalı bölümler
+
+- Sayısal sütunlar ham dizi baytları olarak yazılır; okurken mmap üzerinden
+  memoryview.cast ile kopyasız kullanılır
+- Metin sütunları: ofset dizisi + UTF-8 blob + NULL bitseti
+- Bitsetler little-endian bayt dizisi olarak saklanır
+- Kategoriler (küçük) meta JSON içindedir
+
+Yazma atomiktir (geçici dosya + rename); eski dosyayı eşlemiş okuyucular
+etkilenmez.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.menu_store import ARRAY_COLUMNS, STRING_COLUMNS, MenuSnapshot, StringColumn
+
+MAGIC = b"MENUSNP1"
+FORMAT_VERSION = 3  # 2: 32 bit sütunlar, price/calorie_sorted yok; 3: preparation_order
+_ALIGN = 8
+
+
+def _bitset_bytes(mask: int, size: int) -> bytes:
+    return mask.to_bytes((size + 7) // 8, "little")
+
+
+def _category_json(category: dict) -> dict:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in category.items()
+    }
+
+
+def _category_from_json(category: dict) -> dict:
+    for key in ("created_at", "updated_at"):
+        if category.get(key):
+            category[key] = datetime.fromisoformat(category[key])
+    return category
+
+
+def encode_snapshot(snapshot: MenuSnapshot) -> bytes:
+    sections: List[tuple] = []  # (isim, typecode, bayt)
+    for name, typecode in ARRAY_COLUMNS.items():
+        sections.append((name, typecode, getattr(snapshot, name).tobytes()))
+    for name in STRING_COLUMNS:
+        column = getattr(snapshot, name)
+        if not isinstance(column, StringColumn):
+            column = StringColumn.from_values(column)
+        offsets, blob, nulls = column.parts()
+        sections.append((f"{name}.offsets", "q", offsets.tobytes()))
+        sections.append((f"{name}.blob", "B", bytes(blob)))
+        sections.append((f"{name}.nulls", "B", _bitset_bytes(nulls, snapshot.size)))
+    for flag, mask in snapshot.flags.items():
+        sections.append((f"flag.{flag}", "B", _bitset_bytes(mask, snapshot.size)))
+    for cat_id, mask in snapshot.category_masks.items():
+        sections.append((f"category.{cat_id}", "B", _bitset_bytes(mask, snapshot.size)))
+
+    table = {}
+    offset = 0
+    for name, typecode, data in sections:
+        table[name] = [offset, len(data), typecode]
+        offset += len(data) + (-len(data) % _ALIGN)
+
+    meta = json.dumps({
+        "format": FORMAT_VERSION,
+        "version": snapshot.version,
+        "built_at": snapshot.built_at,
+        "size": snapshot.size,
+        "categories": [_category_json(c) for c in snapshot.categories.values()],
+        "sections": table,
+    }).encode("utf-8")
+
+    header = MAGIC + struct.pack("<I", len(meta)) + meta
+    header += b"\0" * (-len(header) % _ALIGN)
+    out = bytearray(header)
+    for _, _, data in sections:
+        out += data
+        out += b"\0" * (-len(data) % _ALIGN)
+    return bytes(out)
+
+
+def decode_snapshot(buffer) -> MenuSnapshot:
+    """Buffer'dan (bytes veya mmap) snapshot kurar; sayısal sütunlar kopyalanmaz."""
+    view = memoryview(buffer)
+    if bytes(view[:8]) != MAGIC:
+        raise ValueError("Geçersiz menü snapshot dosyası")
+    (meta_len,) = struct.unpack_from("<I", view, 8)
+    meta = json.loads(bytes(view[12:12 + meta_len]))
+    if meta["format"] != FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen snapshot formatı: {meta['format']}")
+    base = 12 + meta_len
+    base += -base % _ALIGN
+    size = meta["size"]
+
+    def section(name: str):
+        offset, length, typecode = meta["sections"][name]
+        chunk = view[base + offset: base + offset + length]
+        return chunk if typecode == "B" else chunk.cast(typecode)
+
+    columns = {name: section(name) for name in ARRAY_COLUMNS}
+    for name in STRING_COLUMNS:
+        columns[name] = StringColumn(
+            section(f"{name}.offsets"),
+            section(f"{name}.blob"),
+            int.from_bytes(section(f"{name}.nulls"), "little"),
+            size,
+        )
+    flags = {
+        name.split(".", 1)[1]: int.from_bytes(section(name), "little")
+        for name in meta["sections"] if name.startswith("flag.")
+    }
+    category_masks = {
+        int(name.split(".", 1)[1]): int.from_bytes(section(name), "little")
+        for name in meta["sections"] if name.startswith("category.")
+    }
+    return MenuSnapshot.from_state(
+        version=meta["version"],
+        built_at=meta["built_at"],
+        size=size,
+        categories=[_category_from_json(c) for c in meta["categories"]],
+        columns=columns,
+        flags=flags,
+        category_masks=category_masks,
+    )
+
+
+def write_snapshot(snapshot: MenuSnapshot, path: str) -> None:
+    """Snapshot'ı atomik olarak dosyaya yazar."""
+    data = encode_snapshot(snapshot)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".menu_snapshot.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path: str) -> Optional[MenuSnapshot]:
+    """Dosyayı bellek-eşlemeli (mmap) açıp snapshot döner; dosya yoksa None."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return decode_snapshot(mapped)
+
+
+class SnapshotPersister:
+    """Son sağlam snapshot'ı periyodik olarak diske yazan arka plan iş parçacığı."""
+
+    def __init__(self, store, session_factory, path: str, interval: float):
+        self._store = store
+        self._session_factory = session_factory
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._persisted_version: Optional[int] = None
+        self._persisted_built_at: Optional[float] = None
+
+    def start(self) -> None:
+        if not self._path or self._interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="menu-snapshot-persister", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def persist_once(self) -> bool:
+        db = self._session_factory()
+        try:
+            snapshot = self._store.refresh(db)
+        finally:
+            db.close()
+        if snapshot is None:
+            return False
+        if (snapshot.version, snapshot.built_at) == (self._persisted_version, self._persisted_built_at):
+            return False
+        write_snapshot(snapshot, self._path)
+        self._persisted_version, self._persisted_built_at = snapshot.version, snapshot.built_at
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.persist_once()
+            except Exception as e:
+                print(f"⚠️ Menü snapshot kaydedilemedi: {e}")
+            self._stop.wait(self._interval)
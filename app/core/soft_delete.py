@@ -0,0 +1,165 @@
+# app/core/soft_delete.py
+"""
+Menü öğeleri için soft delete ve arşivleme.
+
+- Silme `deleted_at`'i doldurur (tek UPDATE); satır eski siparişler için kalır
+- Session üzerinden çalışan tüm ORM okumaları (liste, detay, arama, snapshot /
+  featured yüklemesi, ilişki yüklemeleri, sayımlar) ve ORM UPDATE/DELETE'ler
+  otomatik olarak `deleted_at IS NULL` koşuluyla çalışır (with_loader_criteria).
+  Silinmiş satırlara ihtiyaç duyan ifade `execution_options(include_deleted=True)` verir
+- MenuArchiver: MENU_ARCHIVE_AFTER_DAYS'ten uzun süredir silinmiş satırları
+  MENU_ARCHIVE_BATCH_SIZE'lık parçalarla menu_items_archive'a taşır (parça başına
+  INSERT ... SELECT + DELETE, kısa transaction) → sıcak menu_items tablosu ve
+  indeksleri yıllar içinde büyümez
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import DateTime, delete, event, insert, literal, select
+from sqlalchemy.orm import with_loader_criteria
+
+from app.core.config import settings
+from app.db.database import engine
+from app.models.availability_schedule import AvailabilitySchedule
+from app.models.menu_item import MenuItem
+from app.models.menu_item_archive import MenuItemArchive
+
+INCLUDE_DELETED = "include_deleted"
+
+# Arşive kopyalanan kolonlar (archived_at hariç; ikisinde de aynı isimler)
+_ARCHIVE_COLUMNS = tuple(column.name for column in MenuItemArchive.__table__.columns if column.name != "archived_at")
+
+
+def utcnow() -> datetime:
+    """deleted_at / archived_at için naive UTC zaman damgası."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _live_only(state) -> None:
+    # İlişki / kolon yüklemeleri kriteri üst sorgudan devralır
+    if state.is_column_load or state.is_relationship_load:
+        return
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    if state.execution_options.get(INCLUDE_DELETED):
+        return
+    state.statement = state.statement.options(
+        with_loader_criteria(MenuItem, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+    )
+
+
+def install_hooks(session_factory) -> None:
+    event.listen(session_factory, "do_orm_execute", _live_only)
+
+
+# ---- Arşivleme ----
+def archive_chunk(conn, condition, limit: int) -> int:
+    """
+    Koşula uyan silinmiş satırlardan en fazla `limit` tanesini arşive taşır.
+    conn bir Session veya Connection olabilir; transaction çağıranındır.
+    """
+    ids = conn.execute(
+        select(MenuItem.id)
+        .where(MenuItem.deleted_at.is_not(None), condition)
+        .order_by(MenuItem.id)
+        .limit(limit)
+        .execution_options(**{INCLUDE_DELETED: True})
+    ).scalars().all()
+    if not ids:
+        return 0
+    source = select(
+        *(getattr(MenuItem, name) for name in _ARCHIVE_COLUMNS),
+        literal(utcnow(), DateTime).label("archived_at"),
+    ).where(MenuItem.id.in_(ids))
+    conn.execute(
+        insert(MenuItemArchive)
+        .from_select([*_ARCHIVE_COLUMNS, "archived_at"], source)
+        .execution_options(**{INCLUDE_DELETED: True})
+    )
+    conn.execute(
+        delete(AvailabilitySchedule)
+        .where(AvailabilitySchedule.menu_item_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    conn.execute(
+        delete(MenuItem)
+        .where(MenuItem.id.in_(ids))
+        .execution_options(synchronize_session=False, **{INCLUDE_DELETED: True})
+    )
+    return len(ids)
+
+
+def archive_deleted(conn, condition, batch_size: int) -> int:
+    """Koşula uyan tüm silinmiş satırları aynı transaction'da parça parça taşır."""
+    moved = 0
+    while True:
+        count = archive_chunk(conn, condition, batch_size)
+        moved += count
+        if count < batch_size:
+            return moved
+
+
+class MenuArchiver:
+    """Eski soft delete kayıtlarını periyodik olarak arşive taşıyan arka plan iş parçacığı."""
+
+    def __init__(self, engine, after_days: int, interval: float, batch_size: int = 500):
+        self._engine = engine
+        self._after_days = after_days
+        self._interval = interval
+        self._batch_size = max(1, batch_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.archived = 0
+        self.last_run: Optional[datetime] = None
+
+    def archive_once(self) -> int:
+        """Eşiği geçen tüm satırları taşır; her parça ayrı, kısa bir transaction'dır."""
+        cutoff = utcnow() - timedelta(days=self._after_days)
+        moved = 0
+        while True:
+            with self._engine.begin() as conn:
+                count = archive_chunk(conn, MenuItem.deleted_at < cutoff, self._batch_size)
+            moved += count
+            if count < self._batch_size:
+                break
+        self.archived += moved
+        self.last_run = utcnow()
+        return moved
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                moved = self.archive_once()
+                if moved:
+                    print(f"✅ {moved} silinmiş menü öğesi arşive taşındı")
+            except Exception as e:
+                print(f"⚠️ Menü arşivleme başarısız: {e}")
+
+    def start(self) -> None:
+        if self._interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="menu-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "archived": self.archived,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "after_days": self._after_days,
+        }
+
+
+menu_archiver = MenuArchiver(
+    engine,
+    after_days=settings.MENU_ARCHIVE_AFTER_DAYS,
+    interval=settings.MENU_ARCHIVE_INTERVAL_SECONDS,
+    batch_size=settings.MENU_ARCHIVE_BATCH_SIZE,
+)
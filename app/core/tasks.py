@@ -0,0 +1,233 @@
+# app/core/tasks.py
+"""
+Commit sonrası yan işler için süreç içi arka plan iş kuyruğu.
+
+- Sınırlı worker havuzu (TASK_QUEUE_WORKERS iş parçacığı); istek sadece
+  kuyruğa yazar, yan iş admin'in isteğini uzatmaz
+- Hata → üstel geri çekilme (+ jitter) ile yeniden deneme; TASK_MAX_RETRIES
+  aşılınca iş `dead/` klasörüne taşınır
+- Kalıcı yerel spool: her iş `pending/` altında JSON dosyasıdır, çalışırken
+  `running/`'e taşınır, başarıda silinir. Yeniden başlatmada `pending/` ve
+  yarıda kalan `running/` işleri geri yüklenir → işler en az bir kez çalışır,
+  bu yüzden handler'lar idempotent olmalıdır
+- İşler isimle kaydedilir (`@task("menu.warm_snapshot")`), yük JSON'dır
+"""
+import heapq
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+TaskHandler = Callable[[dict], None]
+
+_registry: Dict[str, TaskHandler] = {}
+
+
+def task(name: str) -> Callable[[TaskHandler], TaskHandler]:
+    """İş handler'ını isimle kaydeder (spool'dan geri yüklerken isim → fonksiyon)."""
+    def decorator(handler: TaskHandler) -> TaskHandler:
+        _registry[name] = handler
+        return handler
+    return decorator
+
+
+class TaskQueue:
+    def __init__(
+        self,
+        spool_dir: str,
+        workers: int = 2,
+        max_retries: int = 5,
+        retry_base: float = 1.0,
+        retry_max: float = 60.0,
+    ):
+        self._spool_dir = spool_dir
+        self._workers = max(1, workers)
+        self._max_retries = max_retries
+        self._retry_base = retry_base
+        self._retry_max = retry_max
+        self._heap: List[tuple] = []  # (çalışma zamanı, sıra, iş)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    # ---- Spool ----
+    def _dir(self, state: str) -> Optional[str]:
+        if not self._spool_dir:
+            return None
+        path = os.path.join(self._spool_dir, state)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _write(self, state: str, job: dict) -> None:
+        directory = self._dir(state)
+        if directory is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(prefix=".task.", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, os.path.join(directory, f"{job['id']}.json"))
+
+    def _move(self, job: dict, src: str, dst: Optional[str]) -> None:
+        if not self._spool_dir:
+            return
+        src_path = os.path.join(self._dir(src), f"{job['id']}.json")
+        if dst is None:
+            if os.path.exists(src_path):
+                os.unlink(src_path)
+            return
+        self._write(dst, job)
+        if os.path.exists(src_path):
+            os.unlink(src_path)
+
+    def _recover(self) -> int:
+        """Önceki çalışmadan kalan işleri (bekleyen + yarıda kalan) kuyruğa alır."""
+        if not self._spool_dir:
+            return 0
+        recovered = set()
+        for state in ("running", "pending"):
+            directory = self._dir(state)
+            for filename in sorted(os.listdir(directory)):
+                if not filename.endswith(".json") or filename in recovered:
+                    continue  # running/'den pending/'e taşınan iş ikinci kez yüklenmesin
+                path = os.path.join(directory, filename)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        job = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Bozuk iş dosyası atlandı: {filename}: {e}")
+                    continue
+                if state == "running":
+                    self._move(job, "running", "pending")
+                self._push(job)
+                recovered.add(filename)
+        return len(recovered)
+
+    # ---- Kuyruk ----
+    def _push(self, job: dict) -> None:
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (job["run_at"], self._seq, job))
+            self._cond.notify()
+
+    def enqueue(self, name: str, payload: Optional[dict] = None, delay: float = 0.0) -> str:
+        """İşi spool'a yazar ve kuyruğa alır; commit'ten SONRA çağrılmalıdır."""
+        if name not in _registry:
+            raise KeyError(f"Kayıtlı olmayan iş: {name}")
+        job = {
+            "id": f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+            "name": name,
+            "payload": payload or {},
+            "attempts": 0,
+            "run_at": time.time() + delay,
+            "last_error": None,
+        }
+        try:
+            self._write("pending", job)
+        except OSError as e:
+            print(f"⚠️ İş spool'a yazılamadı, sadece bellekte tutuluyor: {e}")
+        self._push(job)
+        return job["id"]
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _next_job(self) -> Optional[dict]:
+        with self._cond:
+            while not self._stop.is_set():
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2]
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+        return None
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self._retry_max, self._retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_job(self, job: dict) -> bool:
+        """İşi bir kez çalıştırır; başarısızsa yeniden denemeye veya dead/'e alır."""
+        self._move(job, "pending", "running")
+        try:
+            _registry[job["name"]](job["payload"])
+        except Exception as e:
+            job["attempts"] += 1
+            job["last_error"] = f"{type(e).__name__}: {e}"
+            if job["attempts"] > self._max_retries:
+                self.failed += 1
+                print(f"⚠️ İş kalıcı olarak başarısız: {job['name']} ({job['last_error']})")
+                self._move(job, "running", "dead")
+            else:
+                self.retried += 1
+                job["run_at"] = time.time() + self._backoff(job["attempts"])
+                self._move(job, "running", "pending")
+                self._push(job)
+            return False
+        self.completed += 1
+        self._move(job, "running", None)
+        return True
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self.run_job(job)
+            except Exception as e:  # spool G/Ç hatası worker'ı öldürmesin
+                print(f"⚠️ Arka plan işi işlenemedi: {e}")
+
+    # ---- Yaşam döngüsü ----
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        recovered = self._recover()
+        if recovered:
+            print(f"✅ Spool'dan {recovered} arka plan işi geri yüklendi")
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._worker, name=f"task-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Worker'ları durdurur; bitmemiş işler spool'da kalır ve sonraki açılışta çalışır."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        with self._cond:
+            self._heap.clear()  # spool'dan yeniden yüklenecek
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+task_queue = TaskQueue(
+    settings.TASK_SPOOL_DIR,
+    workers=settings.TASK_QUEUE_WORKERS,
+    max_retries=settings.TASK_MAX_RETRIES,
+    retry_base=settings.TASK_RETRY_BASE_SECONDS,
+    retry_max=settings.TASK_RETRY_MAX_SECONDS,
+)
+
+
+def enqueue(name: str, payload: Optional[dict] = None, delay: float = 0.0) -> str:
+    return task_queue.enqueue(name, payload, delay)
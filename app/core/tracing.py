@@ -0,0 +1,364 @@
+# app/core/tracing.py
+"""
+Hafif dağıtık izleme (tracing): istek, bağımlılık, DB ve serileştirme span'leri.
+
+- W3C `traceparent` (00-<trace-id>-<parent-id>-<flags>) okunur ve yanıtta
+  döndürülür; üst servis örneklediyse bu istek de örneklenir, yoksa
+  TRACING_SAMPLE_RATIO oranında
+- Span'ler ContextVar ile taşınır; Starlette thread havuzu bağlamı kopyaladığı
+  için sync handler / bağımlılık thread'lerindeki span'ler doğru ebeveyne bağlanır
+- Fazlar:
+    http.request        → kök span (middleware)
+    dependencies        → istek başı → handler başı (gövde ayrıştırma + Depends)
+    auth.get_current_user (JWT çözme + kullanıcı sorgusu)
+    handler             → endpoint fonksiyonu
+    db.query            → her SQL ifadesi (engine olayları)
+    serialize           → handler sonu → yanıt başlığı (response_model doğrulama + JSON)
+- Dışa aktarım (arka plan thread'inde toplu):
+    file → JSON satırları (TRACING_FILE_PATH)
+    otlp → OTLP/HTTP JSON (`<endpoint>/v1/traces`), collector veya stand-in
+"""
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_MAX_STATEMENT_CHARS = 2000
+
+
+def _new_id(bytes_count: int) -> str:
+    return os.urandom(bytes_count).hex()
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+@dataclass
+class _RequestTrace:
+    """İstek boyunca paylaşılan (thread'ler arası değiştirilebilir) durum."""
+    trace_id: str
+    sampled: bool
+    root: Optional[Span] = None
+    handler_start_ns: int = 0
+    handler_end_ns: int = 0
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_trace: ContextVar[Optional[_RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+# ---- Dışa aktarım ----
+class SpanExporter:
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, path: str):
+        self._path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self._path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.as_dict()) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPSpanExporter(SpanExporter):
+    """OTLP/HTTP JSON (protobuf bağımlılığı olmadan)."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self._url = endpoint.rstrip("/") + "/v1/traces"
+        self._service_name = service_name
+        self._timeout = timeout
+
+    def payload(self, spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self._service_name}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [
+                        {
+                            "traceId": span.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 2 if span.parent_id is None else 1,  # SERVER / INTERNAL
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": [
+                                {"key": key, "value": _otlp_value(value)}
+                                for key, value in span.attributes.items()
+                            ],
+                            "status": {"code": 2, "message": span.error} if span.error else {},
+                        }
+                        for span in spans
+                    ],
+                }],
+            }],
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            self._url,
+            data=json.dumps(self.payload(spans)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """Span'leri kuyruğa alır, arka planda toplu olarak dışa aktarır."""
+
+    def __init__(self, exporter: SpanExporter, max_batch: int = 512, interval: float = 1.0, max_queue: int = 10000):
+        self._exporter = exporter
+        self._max_batch = max_batch
+        self._interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> List[Span]:
+        batch = []
+        while len(batch) < self._max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> None:
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            try:
+                self._exporter.export(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                print(f"⚠️ Trace span'leri dışa aktarılamadı: {e}")
+                return
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+def create_processor() -> Optional[BatchSpanProcessor]:
+    if not settings.TRACING_ENABLED:
+        return None
+    if settings.TRACING_EXPORTER == "otlp":
+        exporter: SpanExporter = OTLPSpanExporter(settings.TRACING_OTLP_ENDPOINT, settings.APP_NAME)
+    else:
+        exporter = FileSpanExporter(settings.TRACING_FILE_PATH)
+    return BatchSpanProcessor(exporter)
+
+
+span_processor: Optional[BatchSpanProcessor] = create_processor()
+
+
+# ---- Span API ----
+def _finish(span: Span) -> None:
+    if span_processor is not None:
+        span_processor.on_end(span)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """Zamanları önceden bilinen bir span'i (ör. faz aralığı) kök altında kaydeder."""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled or trace.root is None:
+        return
+    _finish(Span(trace.trace_id, _new_id(8), trace.root.span_id, name, start_ns, end_ns, attributes))
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Geçerli span'in altında yeni span; istek örneklenmiyorsa no-op."""
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    if trace is None or not trace.sampled or parent is None:
+        yield None
+        return
+    current = Span(trace.trace_id, _new_id(8), parent.span_id, name, time.time_ns(), attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        _finish(current)
+
+
+@contextmanager
+def handler_phase(route: Optional[str]):
+    """Handler'ı span'ler ve dependencies / serialize fazlarının sınırlarını işaretler."""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+    trace.handler_start_ns = time.time_ns()
+    try:
+        with span("handler", route=route or ""):
+            yield
+    finally:
+        trace.handler_end_ns = time.time_ns()
+
+
+# ---- DB span'leri (engine olayları) ----
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    if trace is None or not trace.sampled or parent is None:
+        return
+    db_span = Span(
+        trace.trace_id, _new_id(8), parent.span_id, "db.query", time.time_ns(),
+        attributes={"db.system": conn.dialect.name, "db.statement": statement[:_MAX_STATEMENT_CHARS]},
+    )
+    conn.info.setdefault("trace_spans", []).append(db_span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        db_span = spans.pop()
+        db_span.end_ns = time.time_ns()
+        _finish(db_span)
+
+
+def install_db_tracing(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---- Middleware ----
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent_id, sampled) veya None."""
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, sample_ratio: float = 0.01):
+        self.app = app
+        self.sample_ratio = sample_ratio
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = _new_id(16), None
+            sampled = random.random() < self.sample_ratio
+        trace = _RequestTrace(trace_id, sampled and span_processor is not None)
+        root = Span(
+            trace_id, _new_id(8), parent_id, "http.request", time.time_ns(),
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        trace.root = root
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(root)
+        traceparent = f"00-{trace_id}-{root.span_id}-{'01' if trace.sampled else '00'}".encode()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.time_ns()
+                root.attributes["http.status_code"] = message["status"]
+                if trace.handler_start_ns:
+                    record_span("dependencies", root.start_ns, trace.handler_start_ns)
+                if trace.handler_end_ns:
+                    record_span("serialize", trace.handler_end_ns, now)
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", traceparent)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            if trace.sampled:
+                root.end_ns = time.time_ns()
+                _finish(root)
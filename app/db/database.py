@@ -1,5 +1,17 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+import asyncio
+import functools
+import math
+import time
+
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.schema import CreateTable
 from app.core.config import settings
 import urllib
 
@@ -13,14 +25,99 @@ def get_connection_string():
         # PostgreSQL (eski hal)
         return settings.DATABASE_URL
 
+DATABASE_TYPES = {"mssql": "SQL Server", "sqlite": "SQLite", "postgresql": "PostgreSQL"}
+
+def _engine_options(url: str) -> dict:
+    """Dialect'e göre engine ayarları; SQLite gömülü mod (kiosk / benchmark)."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # Dosya DB'de bağlantı havuzu; iş parçacıkları arası kullanım serbest
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    return {
+        "pool_pre_ping": True,
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
 # Engine oluştur
 engine = create_engine(
     get_connection_string(),
     echo=False,  # SQL sorgularını görmek için True yapabilirsiniz
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    **_engine_options(get_connection_string()),
 )
+IS_SQLITE = engine.dialect.name == "sqlite"
+DATABASE_TYPE = DATABASE_TYPES.get(engine.dialect.name, engine.dialect.name)
+
+# DB erişilemez / yavaş sayılan hatalar (okuma uçları bunlarda snapshot'a düşer)
+DB_UNAVAILABLE_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+class StatementTimeout(Exception):
+    """statement_timeout bütçesi aşıldı (DB ayakta, sorgu yavaş)."""
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """SQLite: WAL (okuyucular yazarı beklemez), FK zorlaması ve önbellek ayarları."""
+    if not IS_SQLITE:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+@contextmanager
+def statement_timeout(db: Session, seconds: float):
+    """
+    Blok içindeki ifadelere bağlantı düzeyinde süre sınırı (menü okumaları, gecikme bütçeli uçlar).
+    - SQL Server (pyodbc): cursor timeout, saniye granülünde (HYT00); 1 sn altı bütçe 1 sn olur
+    - SQLite: progress handler süre dolunca ifadeyi keser ("interrupted")
+    Oturum henüz bağlantı almadıysa sınır bağlantı alındığında (after_begin) uygulanır;
+    blok hiç SQL çalıştırmazsa havuzdan bağlantı alınmaz. Blok içinde commit yapılmamalı.
+    Bütçe aşımı StatementTimeout olarak fırlatılır; DB_UNAVAILABLE_ERRORS'tan ayrıdır,
+    kesinti sayıp saymamak çağırana kalır. Bağlantı / havuz hataları olduğu gibi yükselir.
+    Çıkışta bağlantının önceki ayarı geri yüklenir.
+    """
+    deadline = time.monotonic() + seconds
+    restores = {}
+
+    def apply(raw):
+        if id(raw) in restores:
+            return
+        if IS_SQLITE:
+            raw.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            restores[id(raw)] = lambda: raw.set_progress_handler(None, 0)
+        elif engine.dialect.driver == "pyodbc":
+            previous = raw.timeout
+            raw.timeout = max(1, math.ceil(seconds))
+            restores[id(raw)] = lambda: setattr(raw, "timeout", previous)
+
+    def on_begin(session, transaction, connection):
+        apply(connection.connection.dbapi_connection)
+
+    event.listen(db, "after_begin", on_begin)
+    try:
+        if db.in_transaction():
+            apply(db.connection().connection.dbapi_connection)
+        yield
+    except OperationalError as e:
+        if "interrupted" in str(e.orig) or "HYT00" in str(e.orig):
+            raise StatementTimeout(seconds) from e
+        raise
+    finally:
+        event.remove(db, "after_begin", on_begin)
+        for restore in restores.values():
+            restore()
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
@@ -35,11 +132,245 @@ def ping_db() -> bool:
         print(f"Database connection error: {e}")
         return False
 
+def list_tables() -> List[str]:
+    """Dialect bağımsız tablo listesi (health check için)."""
+    return sorted(inspect(engine).get_table_names())
+
+# Modelden kaldırılmış ama eski veritabanlarında duran kısıtlar: (tablo, kısıt adı)
+_LEGACY_CONSTRAINTS = (
+    # Yerini soft delete'e uygun filtreli unique indeks aldı (uq_menu_items_live_category_name)
+    ("menu_items", "uq_menu_items_category_name"),
+)
+
+def ensure_columns() -> None:
+    """
+    Mevcut tablolara modelde sonradan eklenen nullable kolonları ekler
+    (ALTER TABLE ... ADD). create_all var olan tabloları değiştirmez.
+    """
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    keyword = "" if engine.dialect.name == "mssql" else "COLUMN "
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD {keyword}{column.name} {column_type}")
+                print(f"✅ Kolon eklendi: {table.name}.{column.name}")
+
+# SQLite'ta yeniden kurulan tablonun id sayacı bu tablodaki en büyük id'nin altında kalmasın
+_SQLITE_ID_FLOORS = {
+    # Arşive taşınan id'ler eski siparişlere ait: yeni ürüne yeniden verilmemeli
+    "menu_items": "menu_items_archive",
+}
+
+def _sqlite_needs_rebuild(conn, table) -> bool:
+    sql = conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+    ).scalar()
+    if sql is None:
+        return False
+    if table.dialect_options["sqlite"]["autoincrement"] and "AUTOINCREMENT" not in sql.upper():
+        return True
+    return any(name in sql for table_name, name in _LEGACY_CONSTRAINTS if table_name == table.name)
+
+def rebuild_sqlite_tables() -> None:
+    """
+    SQLite: tablo tanımı ALTER ile değiştirilemeyen tabloları modelden yeniden kurar
+    (sqlite_autoincrement sonradan eklendiyse veya eski bir kısıt duruyorsa).
+    SQLite'ın önerdiği sıra: FK kapalı → yeni tablo → veri kopyası → eskiyi sil →
+    yeniden adlandır → foreign_key_check → commit. İndeksler ensure_indexes ile kurulur.
+    """
+    if not IS_SQLITE:
+        return
+    existing = set(inspect(engine).get_table_names())
+    with engine.connect() as conn:
+        tables = [
+            table for table in Base.metadata.sorted_tables
+            if table.name in existing and _sqlite_needs_rebuild(conn, table)
+        ]
+    if not tables:
+        return
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("PRAGMA foreign_keys=OFF")  # transaction dışında olmalı
+        try:
+            cursor.execute("BEGIN")
+            for table in tables:
+                _rebuild_sqlite_table(cursor, table)
+            violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+            if violations:
+                raise RuntimeError(f"Yeniden kurma FK ihlali bıraktı: {violations[:5]}")
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        raw.close()
+    for table in tables:
+        print(f"✅ Tablo yeniden kuruldu: {table.name}")
+
+def _rebuild_sqlite_table(cursor, table) -> None:
+    temp_name = f"{table.name}__rebuild"
+    create_sql = str(CreateTable(table).compile(dialect=engine.dialect)).strip()
+    cursor.execute(f"DROP TABLE IF EXISTS {temp_name}")
+    cursor.execute(create_sql.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {temp_name} ", 1))
+    present = {row[1] for row in cursor.execute(f"PRAGMA table_info({table.name})")}
+    columns = ", ".join(column.name for column in table.columns if column.name in present)
+    cursor.execute(f"INSERT INTO {temp_name} ({columns}) SELECT {columns} FROM {table.name}")
+    cursor.execute(f"DROP TABLE {table.name}")
+    cursor.execute(f"ALTER TABLE {temp_name} RENAME TO {table.name}")
+    floor_table = _SQLITE_ID_FLOORS.get(table.name)
+    if floor_table is not None and table.dialect_options["sqlite"]["autoincrement"]:
+        floor = cursor.execute(f"SELECT MAX(id) FROM {floor_table}").fetchone()[0] or 0
+        current = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table.name,)).fetchone()
+        if current is None:
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, floor))
+        elif current[0] < floor:
+            cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (floor, table.name))
+
+def drop_legacy_constraints() -> None:
+    """Eski unique kısıtları kaldırır; SQLite'ta kısıt rebuild_sqlite_tables ile tablo yeniden kurularak gider."""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    for table_name, name in _LEGACY_CONSTRAINTS:
+        if table_name not in existing:
+            continue
+        if name not in {uc["name"] for uc in inspector.get_unique_constraints(table_name)}:
+            continue
+        if engine.dialect.name == "sqlite":
+            continue  # rebuild_sqlite_tables
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE {table_name} DROP CONSTRAINT {name}")
+        print(f"✅ Eski kısıt kaldırıldı: {table_name}.{name}")
+
+def ensure_indexes() -> None:
+    """
+    Modellerde tanımlı indekslerden eksik olanları oluşturur.
+    create_all sadece yeni tabloların indekslerini kurar; mevcut tablolara
+    sonradan eklenen indeksler burada tamamlanır.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+# Ad sıralaması için kod noktası (binary) collation'ları. Bellek içi yollar (snapshot,
+# vektör, featured) Python str karşılaştırmasıyla sıralar; DB'nin varsayılan collation'ı
+# (büyük/küçük harf / aksan duyarsız, dile bağlı) snapshot'ta taklit edilemez. SQL yolu da
+# binary sıralarsa aynı sayfa snapshot sıcak da soğuk da olsa aynı sırada döner.
+# (SQL Server'da kod noktası sırası nvarchar kolonlar içindir.)
+_BINARY_COLLATIONS = {"sqlite": "BINARY", "mssql": "Latin1_General_BIN2", "postgresql": "C"}
+
+def binary_order(column):
+    """Metin kolonunu snapshot ile aynı (kod noktası) sırada sıralatır."""
+    collation = _BINARY_COLLATIONS.get(engine.dialect.name)
+    return column.collate(collation) if collation else column
+
+def integrity_error_kind(exc) -> str:
+    """
+    IntegrityError'ı sınıflandırır: "unique", "foreign_key" veya "other".
+    - SQL Server: 2627/2601 (unique), 547 (FK)
+    - PostgreSQL: SQLSTATE 23505 / 23503
+    - SQLite: mesaj metni
+    """
+    orig = getattr(exc, "orig", exc)
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate == "23505":
+        return "unique"
+    if sqlstate == "23503":
+        return "foreign_key"
+    message = str(orig).lower()
+    if "unique" in message or "duplicate" in message or "(2627)" in message or "(2601)" in message:
+        return "unique"
+    if "foreign key" in message or "(547)" in message:
+        return "foreign_key"
+    return "other"
+
+# İstek kapsamındaki oturumlar (SessionReleasingRoute tarafından kurulur)
+_request_sessions: ContextVar[Optional[List[Session]]] = ContextVar("request_sessions", default=None)
+# Çalışan route ("GET /api/v1/menu-items/"); yavaş sorgu kaydı vb. için
+_current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+def current_route() -> Optional[str]:
+    return _current_route.get()
+
 def get_db():
-    """Dependency injection için database session"""
+    """
+    Dependency injection için TEK database session sağlayıcısı.
+    - Session bağlantıyı ilk SQL ifadesine kadar havuzdan almaz (tembel)
+    - FastAPI aynı istekte bağımlılığı önbelleğe alır: get_current_user ve
+      handler aynı oturumu paylaşır
+    - Handler döner dönmez bağlantı havuza iade edilir (yanıt serileştirmesinden önce)
+    """
     db = SessionLocal()
+    sessions = _request_sessions.get()
+    if sessions is not None:
+        sessions.append(db)
     try:
         yield db
     finally:
         db.close()
 
+def release_request_sessions() -> None:
+    """Bu isteğe ait oturumları kapatır; yüklenmiş nesneler okunabilir kalır."""
+    for db in _request_sessions.get() or ():
+        db.close()
+
+def _release_sessions_after(endpoint):
+    if getattr(endpoint, "__releases_sessions__", False):
+        return endpoint  # include_router route'u yeniden kurarken çift sarmalama olmasın
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                release_request_sessions()
+        async_wrapper.__releases_sessions__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            release_request_sessions()
+    wrapper.__releases_sessions__ = True
+    return wrapper
+
+def _route_methods(route: APIRoute) -> str:
+    return "|".join(sorted(route.methods or ()))
+
+class SessionReleasingRoute(APIRoute):
+    """
+    Handler'ın son sorgusu bittiğinde bağlantıyı bırakan route sınıfı.
+    Yield'li bağımlılıkların çıkışı yanıt gönderildikten sonra çalıştığı için
+    oturum burada, handler döndüğü anda kapatılır.
+    """
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _release_sessions_after(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        route_name = f"{_route_methods(self)} {self.path}"
+
+        async def route_handler(request):
+            token = _request_sessions.set([])
+            route_token = _current_route.set(route_name)
+            try:
+                return await handler(request)
+            finally:
+                _current_route.reset(route_token)
+                _request_sessions.reset(token)
+
+        return route_handler
+
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from app.db.database import Base
+
+class AuditLog(Base):
+    """Menü değişikliklerinin append-only denetim kaydı (kim, neyi, hangi alanları, ne zaman)"""
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        # /api/v1/audit keyset sayfalaması: filtre + id < imleç ORDER BY id DESC
+        Index("ix_audit_log_entity", "entity", "entity_id", "id"),
+        Index("ix_audit_log_actor", "actor_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # Değişikliğin uygulamada gerçekleştiği an (UTC); yazıcı bunu sonradan toplu ekler
+    occurred_at = Column(DateTime, nullable=False)
+
+    # FK yok: kullanıcı silinse de kayıt olduğu gibi kalır
+    actor_id = Column(Integer)
+    actor_email = Column(String(255))
+
+    entity = Column(String(50), nullable=False)   # menu_items | categories
+    entity_id = Column(Integer)
+    action = Column(String(20), nullable=False)   # create | update | delete | feature | unfeature
+    # JSON: {"alan": [eski, yeni], ...}
+    changes = Column(Text, nullable=False)
@@ -0,0 +1,45 @@
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import backref, relationship
+from app.db.database import Base
+
+WEEK_DAYS = 7
+DAY_MINUTES = 24 * 60
+
+class AvailabilitySchedule(Base):
+    """
+    Zaman penceresi bazlı satış takvimi (Örnek: kahvaltı 07:00-11:30, happy hour Cuma 17:00-19:00).
+    Bir pencere ya bir menü öğesine ya da bir kategoriye aittir; takvimi olan konu
+    sadece pencerelerinden biri açıkken satıştadır.
+    """
+    __tablename__ = "availability_schedules"
+    __table_args__ = (
+        # Tam olarak bir konu: menü öğesi veya kategori
+        CheckConstraint(
+            "(menu_item_id IS NOT NULL AND category_id IS NULL) OR (menu_item_id IS NULL AND category_id IS NOT NULL)",
+            name="ck_availability_schedules_subject",
+        ),
+        CheckConstraint(
+            f"start_minute >= 0 AND start_minute < {DAY_MINUTES} AND end_minute > 0 AND end_minute <= {DAY_MINUTES}",
+            name="ck_availability_schedules_minutes",
+        ),
+        Index("ix_availability_schedules_menu_item_id", "menu_item_id"),
+        Index("ix_availability_schedules_category_id", "category_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
+    category_id = Column(Integer, ForeignKey("categories.id"))
+
+    # bit 0 = Pazartesi ... bit 6 = Pazar (pencerenin başladığı gün)
+    weekday_mask = Column(Integer, nullable=False)
+    # Gün içi dakika; end_minute <= start_minute → pencere gece yarısını geçer
+    start_minute = Column(Integer, nullable=False)
+    end_minute = Column(Integer, nullable=False)
+    # IANA saat dilimi (Örnek: Europe/Istanbul); pencereler yerel duvar saatine göredir
+    timezone = Column(String(64), nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now())
+
+    # Öğe / kategori silinince pencereleri de silinir
+    menu_item = relationship("MenuItem", backref=backref("schedules", cascade="all, delete-orphan"))
+    category = relationship("Category", backref=backref("schedules", cascade="all, delete-orphan"))
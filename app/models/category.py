@@ -12,9 +12,9 @@ class Category(Base):
     is_active = Column(Boolean, default=True)
     display_order = Column(Integer, default=0)
     
-    # SQL Server için DateTime düzenlemesi
-    created_at = Column(DateTime, server_default=func.getdate())
-    updated_at = Column(DateTime, onupdate=func.getdate())
+    # Dialect bağımsız zaman damgası (SQL Server: CURRENT_TIMESTAMP = GETDATE())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
     
     # İlişkiler
     menu_items = relationship("MenuItem", back_populates="category", cascade="all, delete-orphan")
\ No newline at end of file
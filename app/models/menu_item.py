@@ -1,10 +1,36 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, func
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, Text, func, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
 class MenuItem(Base):
     """Menüdeki yemekler/içecekler"""
     __tablename__ = "menu_items"
+    __table_args__ = (
+        # Aynı kategoride aynı isimde iki CANLI ürün olamaz (yazma yolu ön-sorgu yerine buna güvenir);
+        # silinmiş (deleted_at dolu) satırlar sezonluk ürünün yeniden eklenmesini engellemez.
+        # Filtreli indeks aynı zamanda canlı satırların kategori listelemesini karşılar.
+        Index(
+            "uq_menu_items_live_category_name", "category_id", "name",
+            unique=True,
+            sqlite_where=text("deleted_at IS NULL"),
+            postgresql_where=text("deleted_at IS NULL"),
+            mssql_where=text("deleted_at IS NULL"),
+        ),
+        # Arşivleyici: sadece silinmiş satırları tutan küçük indeks
+        Index(
+            "ix_menu_items_deleted_at", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"),
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            mssql_where=text("deleted_at IS NOT NULL"),
+        ),
+        # Kalori / hazırlık süresi aralık filtreleri ve sıralamaları
+        # ("500 kcal altı, 10 dakikada hazır" → preparation_time aralığı + calories)
+        Index("ix_menu_items_calories", "calories"),
+        Index("ix_menu_items_preparation_time_calories", "preparation_time", "calories"),
+        # SQLite'ta silinen en büyük id yeniden verilmesin (arşivde aynı id eski siparişlere ait).
+        # Sadece yeni tablolarda etkili; mevcut tablolar açılışta rebuild_sqlite_tables ile yeniden kurulur
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -25,9 +51,12 @@ class MenuItem(Base):
     is_available = Column(Boolean, default=True)
     is_featured = Column(Boolean, default=False)
     
-    # SQL Server için DateTime düzenlemesi
-    created_at = Column(DateTime, server_default=func.getdate())
-    updated_at = Column(DateTime, onupdate=func.getdate())
+    # Dialect bağımsız zaman damgası (SQL Server: CURRENT_TIMESTAMP = GETDATE())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
+    # Soft delete: dolu satırlar okuma yollarında görünmez (app.core.soft_delete),
+    # MENU_ARCHIVE_AFTER_DAYS sonra menu_items_archive tablosuna taşınır
+    deleted_at = Column(DateTime)
     
     # Ekleyen kullanıcı
     created_by = Column(Integer, ForeignKey("users.id"))
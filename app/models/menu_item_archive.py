@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Index, Text
+from app.db.database import Base
+
+class MenuItemArchive(Base):
+    """
+    Silinip MENU_ARCHIVE_AFTER_DAYS'i dolduran menü öğeleri (soğuk depo).
+    Satırlar orijinal id'leriyle taşınır: eski siparişler ürünü hâlâ bulabilir.
+    FK ve unique kısıt yok; sıcak menu_items tablosu ve indeksleri küçük kalır.
+    """
+    __tablename__ = "menu_items_archive"
+    __table_args__ = (
+        Index("ix_menu_items_archive_category_id", "category_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(200), nullable=False)
+    description = Column(Text)
+    price = Column(Float, nullable=False)
+    category_id = Column(Integer, nullable=False)
+    image_url = Column(String(500))
+    calories = Column(Integer)
+    preparation_time = Column(Integer)
+    is_vegetarian = Column(Boolean)
+    is_vegan = Column(Boolean)
+    is_gluten_free = Column(Boolean)
+    is_available = Column(Boolean)
+    is_featured = Column(Boolean)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    created_by = Column(Integer)
+    deleted_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
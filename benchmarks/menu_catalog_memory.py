@@ -0,0 +1,125 @@
+"""
+Menü kataloğu bellek benchmark'ı: öğe başına bayt.
+
+Sentetik satırlarla (DB gerekmez) karşılaştırır:
+- compact : MenuSnapshot.from_rows (tipli diziler + ortak metin tamponu + bitsetler;
+            kurulumda hazırlanan arama tamponu dahil)
+- dict    : `_to_list` benzeri satır sözlükleri (kategori adı dahil)
+- orm     : MenuItem ORM nesneleri (_sa_instance_state ile)
+
+Ölçüm tracemalloc ile yapılır (kurulumdan sonra tutulan bellek). Sözlük ve
+ORM temsilleri örneklem üzerinde ölçülüp öğe başına değere çevrilir.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.menu_catalog_memory
+    python -m benchmarks.menu_catalog_memory --items 200000 --sample 20000
+"""
+import argparse
+import gc
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; DB'ye bağlanılmaz
+
+from app.core.menu_store import FLAG_COLUMNS, ITEM_FIELDS, MenuSnapshot
+from app.models.menu_item import MenuItem
+from app.models.user import User  # noqa: F401  (MenuItem.user ilişkisi için)
+
+CATEGORY_COUNT = 40
+_WORDS = ("Izgara", "Köfte", "Tavuk", "Salata", "Çorba", "Pilav", "Tatlı", "Acılı", "Ev", "Yapımı", "Sebzeli")
+
+
+def _rows(count: int, seed: int = 42):
+    """ITEM_FIELDS sırasında, id'ye göre artan sentetik satırlar."""
+    rnd = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    for item_id in range(1, count + 1):
+        name = f"{rnd.choice(_WORDS)} {rnd.choice(_WORDS)} {item_id}"
+        description = None if item_id % 4 == 0 else " ".join(rnd.choice(_WORDS) for _ in range(8))
+        created = base + timedelta(minutes=item_id)
+        yield (
+            item_id,
+            name,
+            description,
+            round(rnd.uniform(20, 500), 2),
+            rnd.randint(1, CATEGORY_COUNT),
+            None if item_id % 3 else f"https://cdn.example.com/menu/{item_id}.jpg",
+            None if item_id % 5 == 0 else rnd.randint(50, 1500),
+            rnd.randint(5, 60),
+            *(rnd.random() < 0.3 for _ in FLAG_COLUMNS),
+            created,
+            created,
+            1,
+        )
+
+
+def _categories():
+    return [{"id": c, "name": f"Kategori {c}", "description": None, "is_active": True,
+             "display_order": c, "created_at": None, "updated_at": None} for c in range(1, CATEGORY_COUNT + 1)]
+
+
+def _measure(build):
+    """build() sonucunun tuttuğu bellek (bayt), tepe değer ve süre."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current - baseline, peak - baseline, elapsed
+
+
+def _dict_rows(count: int):
+    names = {c["id"]: c["name"] for c in _categories()}
+    rows = []
+    for row in _rows(count):
+        item = dict(zip(ITEM_FIELDS, row))
+        rows.append({
+            "id": item["id"],
+            "name": item["name"],
+            "description": item["description"],
+            "price": item["price"],
+            "category_name": names[item["category_id"]],
+            "is_available": item["is_available"],
+            "is_featured": item["is_featured"],
+            "image_url": item["image_url"],
+        })
+    return rows
+
+
+def _orm_rows(count: int):
+    return [MenuItem(**dict(zip(ITEM_FIELDS, row))) for row in _rows(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Menü kataloğu öğe başına bellek benchmark'ı")
+    parser.add_argument("--items", type=int, default=1_000_000, help="Compact snapshot öğe sayısı")
+    parser.add_argument("--sample", type=int, default=50_000, help="dict / ORM örneklem büyüklüğü")
+    args = parser.parse_args()
+
+    MenuItem(id=0)  # mapper yapılandırması ölçüme girmesin
+
+    print(f"{'temsil':<10} {'öğe':>10} {'toplam MiB':>11} {'bayt/öğe':>9} {'tepe MiB':>9} {'süre s':>7}")
+
+    def report(label, count, retained, peak, elapsed):
+        print(f"{label:<10} {count:>10} {retained / 2**20:>11.1f} {retained / count:>9.0f} "
+              f"{peak / 2**20:>9.1f} {elapsed:>7.2f}")
+
+    snapshot, retained, peak, elapsed = _measure(lambda: MenuSnapshot.from_rows(_rows(args.items), _categories()))
+    report("compact", snapshot.size, retained, peak, elapsed)
+    del snapshot
+
+    for label, build in (("dict", _dict_rows), ("orm", _orm_rows)):
+        rows, retained, peak, elapsed = _measure(lambda: build(args.sample))
+        report(label, len(rows), retained, peak, elapsed)
+        del rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Parola hash benchmark'ı: her şema/maliyet ayarı için çekirdek başına saniyede
+hash sayısını ve tüm çekirdeklerle tahmini giriş kapasitesini raporlar.
+
+Kullanım (proje kökünden):
+    python -m benchmarks.password_hash
+    python -m benchmarks.password_hash --seconds 3 --parallel
+    python -m benchmarks.password_hash --scheme bcrypt --cost 10 --cost 12
+
+--parallel: tahmin yerine her çekirdekte bir süreçle gerçek verimi ölçer.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.hash import argon2
+
+DEFAULT_GRID = {
+    "bcrypt": [10, 11, 12, 13],
+    "scrypt": [14, 15, 16, 17],   # log2(N), r=8, p=1
+    "argon2": [2, 3, 4],          # time_cost, memory=64 MiB, p=2
+}
+COST_NAMES = {"bcrypt": "rounds", "scrypt": "ln", "argon2": "t"}
+
+
+def _context(scheme: str, cost: int):
+    from app.core.security import build_password_context
+    costs = {"bcrypt": "bcrypt_rounds", "scrypt": "scrypt_rounds", "argon2": "argon2_time_cost"}
+    return build_password_context(scheme, **{costs[scheme]: cost})
+
+
+def _measure(scheme: str, cost: int, seconds: float) -> float:
+    """Tek çekirdekte saniyede hash sayısı."""
+    ctx = _context(scheme, cost)
+    ctx.hash("warmup-password")
+    count = 0
+    start = time.perf_counter()
+    while True:
+        ctx.hash("benchmark-password")
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+def _measure_parallel(scheme: str, cost: int, seconds: float, workers: int) -> float:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rates = pool.map(_measure, [scheme] * workers, [cost] * workers, [seconds] * workers)
+        return sum(rates)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parola hash şeması / maliyet benchmark'ı")
+    parser.add_argument("--scheme", action="append", choices=sorted(DEFAULT_GRID), help="Sadece bu şema(lar)")
+    parser.add_argument("--cost", action="append", type=int, help="Maliyet değerleri (varsayılan: şema ızgarası)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Ayar başına ölçüm süresi")
+    parser.add_argument("--parallel", action="store_true", help="Tüm çekirdeklerde gerçek verimi ölç")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    schemes = args.scheme or list(DEFAULT_GRID)
+    print(f"CPU çekirdeği: {cores}")
+    print(f"{'şema':<8} {'maliyet':<10} {'ms/hash':>9} {'hash/s/çekirdek':>16} {'giriş/s (tüm çekirdek)':>24}")
+    for scheme in schemes:
+        if scheme == "argon2" and not argon2.has_backend():
+            print(f"{scheme:<8} atlandı: 'argon2-cffi' kurulu değil")
+            continue
+        for cost in args.cost or DEFAULT_GRID[scheme]:
+            per_core = _measure(scheme, cost, args.seconds)
+            if args.parallel:
+                total = _measure_parallel(scheme, cost, args.seconds, cores)
+                total_label = f"{total:.1f}"
+            else:
+                total_label = f"~{per_core * cores:.1f}"
+            print(
+                f"{scheme:<8} {COST_NAMES[scheme]}={cost:<7} {1000 / per_core:>9.1f} "
+                f"{per_core:>16.1f} {total_label:>24}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,15 @@ Tüm endpoint'leri ve CRUD işlemlerini test eder
 
 import requests
 import json
+import os
+import socket
+import subprocess
 import sys
+import tempfile
+import time
 from datetime import datetime
 from typing import Optional, Dict, Any
+from zoneinfo import ZoneInfo
 
 # API base URL
 BASE_URL = "http://localhost:8000"
@@ -22,6 +28,14 @@ TEST_USER = {
 # Global token değişkeni
 ACCESS_TOKEN: Optional[str] = None
 
+# Admin gerektiren testler (menü yazmaları, denetim kaydı, arşiv...) için mevcut bir
+# admin hesabı; tanımlı değilse bu testler atlanır
+ADMIN_USER = {
+    "email": os.getenv("ADMIN_EMAIL", ""),
+    "password": os.getenv("ADMIN_PASSWORD", "")
+}
+ADMIN_TOKEN: Optional[str] = None
+
 def print_section(title: str):
     """Bölüm başlığı yazdır"""
     print("\n" + "="*60)
@@ -124,6 +138,45 @@ def test_login():
         print_result(False, f"Login hatası: {e}")
         return False
 
+def test_admin_login():
+    """Admin giriş testi (ADMIN_EMAIL / ADMIN_PASSWORD)"""
+    global ADMIN_TOKEN
+    print_subsection("Admin Login")
+    if not ADMIN_USER["email"]:
+        print_result(False, "ADMIN_EMAIL tanımlı değil, admin testleri atlanacak")
+        return False
+    try:
+        response = requests.post(f"{BASE_URL}/auth/login", json=ADMIN_USER)
+        if response.status_code != 200:
+            print_result(False, f"Admin login başarısız: {response.text}")
+            return False
+        ADMIN_TOKEN = response.json().get('access_token')
+        me = requests.get(f"{BASE_URL}/api/v1/me", headers=admin_headers()).json()
+        success = bool(me.get('is_admin'))
+        print_result(success, "Admin login")
+        return success
+    except Exception as e:
+        print_result(False, f"Admin login hatası: {e}")
+        return False
+
+def admin_headers() -> Dict[str, str]:
+    return {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+def create_test_item(category_id: int, **fields) -> Optional[Dict[str, Any]]:
+    """Admin ile benzersiz isimli bir test ürünü oluşturur"""
+    item = {
+        "name": f"Test Ürün {datetime.now().timestamp()}",
+        "price": 50.0,
+        "category_id": category_id,
+        **fields
+    }
+    response = requests.post(f"{BASE_URL}/api/v1/menu-items", json=item, headers=admin_headers())
+    return response.json() if response.status_code == 201 else None
+
+def first_category_id() -> Optional[int]:
+    categories = requests.get(f"{BASE_URL}/api/v1/categories").json()
+    return categories[0]['id'] if categories else None
+
 def test_me_endpoint():
     """Kullanıcı profil endpoint testi"""
     print_subsection("Me Endpoint")
@@ -399,6 +452,1144 @@ def test_menu_items_crud():
     
     return True
 
+def test_menu_item_integrity_errors():
+    """Kısıt ihlallerinin HTTP koduna çevrilmesi: unique → 409, FK → 400"""
+    print_subsection("Menu Item Constraint Errors")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    category_id = first_category_id()
+    missing_category = 999999999
+    try:
+        item = create_test_item(category_id)
+        other = create_test_item(category_id)
+        if not item or not other:
+            print_result(False, "Test ürünleri oluşturulamadı")
+            return False
+        url = f"{BASE_URL}/api/v1/menu-items"
+        checks = {
+            "POST aynı kategori + aynı isim → 409": requests.post(
+                url, json={"name": item['name'], "price": 10, "category_id": category_id}, headers=headers
+            ).status_code == 409,
+            "POST olmayan kategori → 400": requests.post(
+                url, json={"name": f"FK {item['name']}", "price": 10, "category_id": missing_category}, headers=headers
+            ).status_code == 400,
+            "PUT başka ürünün ismi → 409": requests.put(
+                f"{url}/{other['id']}", json={"name": item['name']}, headers=headers
+            ).status_code == 409,
+            "PUT olmayan kategori → 400": requests.put(
+                f"{url}/{other['id']}", json={"category_id": missing_category}, headers=headers
+            ).status_code == 400,
+            "PATCH başka ürünün ismi → 409": requests.patch(
+                f"{url}/{other['id']}", json={"name": item['name']}, headers=headers
+            ).status_code == 409,
+            "Başarısız yazma ürünü değiştirmedi": requests.get(
+                f"{url}/{other['id']}"
+            ).json().get('name') == other['name'],
+        }
+        for name, ok in checks.items():
+            print_result(ok, name)
+        for created in (item, other):
+            requests.delete(f"{url}/{created['id']}", headers=headers)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Kısıt hatası testi hatası: {e}")
+        return False
+
+# ============== SPARSE FIELDSET TESTS ==============
+
+def test_sparse_fieldsets():
+    """fields= ile daraltılmış liste / detay yanıtları"""
+    print_subsection("Sparse Fieldsets (fields=)")
+    url = f"{BASE_URL}/api/v1/menu-items"
+    created = None
+    try:
+        items = requests.get(url, params={"limit": 5}).json()
+        if not items and ADMIN_TOKEN:
+            created = create_test_item(first_category_id())
+            items = requests.get(url, params={"limit": 5}).json()
+        checks = {}
+
+        listed = requests.get(url, params={"fields": "price,id", "limit": 5})
+        checks["Liste: sadece istenen alanlar"] = listed.status_code == 200 and all(
+            set(item) == {"id", "price"} for item in listed.json()
+        )
+        full = requests.get(url, params={"limit": 5}).json()
+        checks["Liste: fields yoksa tüm alanlar"] = all(
+            {"id", "name", "description", "price", "category_name", "is_available", "is_featured", "image_url"} == set(item)
+            for item in full
+        )
+        searched = requests.get(f"{url}/search", params={"q": "te", "fields": "id,name"})
+        checks["Arama: sadece istenen alanlar"] = searched.status_code == 200 and all(
+            set(item) == {"id", "name"} for item in searched.json()
+        )
+        featured = requests.get(f"{url}/featured", params={"fields": "id"})
+        checks["Featured: sadece istenen alanlar"] = featured.status_code == 200 and all(
+            set(item) == {"id"} for item in featured.json()
+        )
+        checks["Liste: bilinmeyen alan → 400"] = requests.get(
+            url, params={"fields": "id,secret"}
+        ).status_code == 400
+        checks["Detay: bilinmeyen alan → 400"] = requests.get(
+            f"{url}/1", params={"fields": "category_name"}
+        ).status_code == 400
+
+        if items:
+            item_id = items[0]['id']
+            detail = requests.get(f"{url}/{item_id}", params={"fields": "id,category,price"})
+            body = detail.json()
+            checks["Detay: sadece istenen alanlar"] = detail.status_code == 200 and set(body) == {"id", "category", "price"}
+            checks["Detay: category iç içe"] = set(body.get("category", {})) == {"id", "name"}
+            checks["Detay: fields yoksa tam yanıt"] = "created_at" in requests.get(f"{url}/{item_id}").json()
+        else:
+            print("  Menüde ürün yok, detay kontrolleri atlandı")
+
+        schemas = requests.get(f"{BASE_URL}/openapi.json").json().get("components", {}).get("schemas", {})
+        checks["OpenAPI: daraltılmış yanıt şeması"] = "MenuItemListFields" in schemas and "MenuItemResponseFields" in schemas
+
+        for name, ok in checks.items():
+            print_result(ok, name)
+        if created:
+            requests.delete(f"{url}/{created['id']}", headers=admin_headers())
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Sparse fieldset testi hatası: {e}")
+        return False
+
+# ============== FACET TESTS ==============
+
+def test_menu_facets():
+    """Facet sayıları endpoint testi"""
+    print_subsection("Menu Item Facets")
+    try:
+        response = requests.get(f"{BASE_URL}/api/v1/menu-items/facets")
+        if response.status_code != 200:
+            print_result(False, f"GET /menu-items/facets: {response.status_code}")
+            return False
+        data = response.json()
+        print(f"  Toplam: {data.get('total')}")
+        print(f"  Vejeteryan: {data.get('is_vegetarian')}")
+        print(f"  Kategori sayısı: {len(data.get('categories', []))}")
+        category_total = sum(c["count"] for c in data.get("categories", []))
+        success = category_total == data.get("total")
+        print_result(success, "GET /menu-items/facets")
+        return success
+    except Exception as e:
+        print_result(False, f"GET /menu-items/facets hatası: {e}")
+        return False
+
+# ============== FEATURED TESTS ==============
+
+def test_featured_index():
+    """Öne çıkanlar indeksi yazma uçlarıyla yerinde güncellenir; her adımda liste filtresiyle aynı"""
+    print_subsection("Featured Index")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    url = f"{BASE_URL}/api/v1/menu-items"
+    category = requests.post(
+        f"{BASE_URL}/api/v1/categories",
+        json={"name": f"Featured Test {datetime.now().timestamp()}", "is_active": True},
+        headers=headers
+    ).json()
+    created = []
+    try:
+        stamp = int(datetime.now().timestamp())
+        for label, price, featured in (("A", 30.0, False), ("B", 60.0, False), ("C", 90.0, True)):
+            item = create_test_item(category['id'], name=f"Vitrin {label} {stamp}", price=price, is_featured=featured)
+            if not item:
+                print_result(False, "Test ürünü oluşturulamadı")
+                return False
+            created.append(item)
+        a, b, c = (item['id'] for item in created)
+
+        def featured_ids(**params):
+            rows = requests.get(f"{url}/featured", params={"category_id": category['id'], "limit": 50, **params}).json()
+            return [row['id'] for row in rows]
+
+        def listed_ids(**params):
+            rows = requests.get(f"{url}/", params={
+                "category_id": category['id'], "is_featured": "true", "is_available": "true", **params
+            }).json()
+            return [row['id'] for row in rows]
+
+        checks = {}
+
+        def step(name, expected):
+            by_price = {"sort_by": "price"}
+            featured, listed = featured_ids(**by_price), listed_ids(**by_price)
+            checks[f"{name}: featured {expected}"] = featured == expected
+            checks[f"{name}: liste filtresiyle aynı"] = featured == listed
+
+        step("Başlangıç", [c])
+        requests.post(f"{url}/{a}/featured", headers=headers)
+        step("POST featured", [a, c])
+        requests.patch(f"{url}/{b}/featured", json={"is_featured": True}, headers=headers)
+        step("PATCH featured", [a, b, c])
+        checks["Fiyat filtresi dilimden uygulanır"] = featured_ids(min_price=50, max_price=80) == [b]
+        checks["desc sıralama"] = featured_ids(sort_by="price", sort_dir="desc") == [c, b, a]
+        requests.delete(f"{url}/{a}/featured", headers=headers)
+        step("DELETE featured", [b, c])
+        requests.put(f"{url}/{b}", json={"price": 120.0}, headers=headers)
+        step("Fiyat güncellemesi yeri değiştirir", [c, b])
+        requests.put(f"{url}/{c}", json={"is_available": False}, headers=headers)
+        step("Stokta olmayan listeden çıkar", [b])
+        requests.delete(f"{url}/{b}", headers=headers)
+        step("Silinen ürün çıkar", [])
+
+        for check_name, ok in checks.items():
+            print_result(ok, check_name)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Featured testi hatası: {e}")
+        return False
+    finally:
+        for row in created:
+            requests.delete(f"{url}/{row['id']}", headers=headers)
+        requests.delete(f"{BASE_URL}/api/v1/categories/{category.get('id')}", headers=headers)
+
+# ============== QUOTE TESTS ==============
+
+def test_menu_quote():
+    """Sepet teklifi: Decimal toplam, not_found / unavailable satırları, satır ve adet sınırları"""
+    print_subsection("Menu Quote")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    url = f"{BASE_URL}/api/v1/menu/quote"
+    category = requests.post(
+        f"{BASE_URL}/api/v1/categories",
+        json={"name": f"Teklif Test {datetime.now().timestamp()}", "is_active": True},
+        headers=headers
+    ).json()
+    created = []
+    try:
+        for price, available in ((19.99, True), (0.1, True), (45.0, False)):
+            item = create_test_item(category['id'], price=price, is_available=available)
+            if not item:
+                print_result(False, "Test ürünü oluşturulamadı")
+                return False
+            created.append(item)
+        a, b, closed = (item['id'] for item in created)
+        missing = 999999999
+
+        response = requests.post(url, json={"lines": [
+            {"item_id": a, "quantity": 3},
+            {"item_id": b, "quantity": 3},
+            {"item_id": a, "quantity": 1},
+        ]})
+        quote = response.json()
+        mixed = requests.post(url, json={"lines": [
+            {"item_id": a, "quantity": 1},
+            {"item_id": closed, "quantity": 2},
+            {"item_id": missing, "quantity": 1},
+        ]}).json()
+        statuses = {line['item_id']: line['status'] for line in mixed.get('lines', [])}
+
+        def status_of(body):
+            return requests.post(url, json=body).status_code
+
+        max_lines = [{"item_id": a, "quantity": 1}] * 100
+        checks = {
+            "POST /menu/quote → 200": response.status_code == 200,
+            # float ile toplam 80.25999999999999 çıkar; Decimal kuruşa yuvarlar
+            "Decimal toplam: 4 × 19.99 + 3 × 0.10 = 80.26": quote.get('total') == 80.26,
+            "Satır tutarları": [line['line_total'] for line in quote.get('lines', [])] == [59.97, 0.3, 19.99],
+            "Tüm satırlar geçerli": quote.get('valid') is True and quote.get('unavailable') == []
+                and quote.get('stale') is False,
+            "Stokta olmayan → unavailable, tutar 0": statuses.get(closed) == "unavailable"
+                and mixed['lines'][1]['line_total'] == 0.0,
+            "Olmayan ürün → not_found": statuses.get(missing) == "not_found",
+            "Geçersiz satırlar toplama katılmaz": mixed.get('total') == 19.99
+                and mixed.get('valid') is False and mixed.get('unavailable') == [closed, missing],
+            "100 satır kabul edilir": status_of({"lines": max_lines}) == 200,
+            "101 satır → 422": status_of({"lines": max_lines + [{"item_id": a, "quantity": 1}]}) == 422,
+            "Boş sepet → 422": status_of({"lines": []}) == 422,
+            "Adet 0 → 422": status_of({"lines": [{"item_id": a, "quantity": 0}]}) == 422,
+            "Adet 100 → 422": status_of({"lines": [{"item_id": a, "quantity": 100}]}) == 422,
+            "Adet 99 kabul edilir": status_of({"lines": [{"item_id": a, "quantity": 99}]}) == 200,
+        }
+        for check_name, ok in checks.items():
+            print_result(ok, check_name)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Quote testi hatası: {e}")
+        return False
+    finally:
+        for row in created:
+            requests.delete(f"{BASE_URL}/api/v1/menu-items/{row['id']}", headers=headers)
+        requests.delete(f"{BASE_URL}/api/v1/categories/{category.get('id')}", headers=headers)
+
+# ============== SCHEDULE TESTS ==============
+
+def schedule_window(tz: str, start_offset: int, end_offset: int) -> Dict[str, Any]:
+    """tz'deki şimdiki saate göre dakika ofsetli, her gün geçerli bir pencere"""
+    now = datetime.now(ZoneInfo(tz))
+    minute = now.hour * 60 + now.minute
+    clock = lambda m: f"{(m % 1440) // 60:02d}:{m % 60:02d}"
+    return {
+        "weekdays": list(range(7)),
+        "start": clock(minute + start_offset),
+        "end": clock(minute + end_offset),
+        "timezone": tz,
+    }
+
+def test_availability_schedules():
+    """Satış takvimi: saat dilimleri, gece yarısını geçen pencereler, kategori takvimi, available_now"""
+    print_subsection("Availability Schedules")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    url = f"{BASE_URL}/api/v1"
+    category = requests.post(
+        f"{url}/categories",
+        json={"name": f"Takvim Test {datetime.now().timestamp()}", "is_active": True},
+        headers=headers
+    ).json()
+    items = []
+    try:
+        items = [create_test_item(category['id']) for _ in range(2)]
+        if not all(items):
+            print_result(False, "Test ürünleri oluşturulamadı")
+            return False
+        item, other = items
+
+        def put_item(*windows):
+            return requests.put(f"{url}/menu-items/{item['id']}/schedule", json={"windows": list(windows)}, headers=headers)
+
+        def available_now(flag: bool):
+            response = requests.get(f"{url}/menu-items/", params={"available_now": flag, "category_id": category['id']})
+            return {row['id'] for row in response.json()}
+
+        checks = {}
+        # Tokyo'da DST yok: yerel saatin etrafındaki pencere açık, aynı saatler UTC'de kapalı
+        checks["Saat dilimi: Asia/Tokyo yerel penceresi açık"] = put_item(
+            schedule_window("Asia/Tokyo", -30, 30)
+        ).json().get('open_now') is True
+        tokyo_as_utc = {**schedule_window("Asia/Tokyo", -30, 30), "timezone": "UTC"}
+        checks["Saat dilimi: aynı saatler UTC'de kapalı"] = put_item(tokyo_as_utc).json().get('open_now') is False
+        # Bitiş < başlangıç: gece yarısını geçer (şimdi-60 → ertesi gün şimdi-120, yani 22 saat açık)
+        checks["Gece yarısını geçen pencere: şimdi açık"] = put_item(
+            schedule_window("UTC", -60, -120)
+        ).json().get('open_now') is True
+        checks["Gece yarısını geçen pencere: dışında kapalı"] = put_item(
+            schedule_window("UTC", 60, -60)
+        ).json().get('open_now') is False
+        checks["available_now=true kapalı ürünü dışlar"] = available_now(True) == {other['id']}
+        checks["available_now=false kapalı ürünü getirir"] = available_now(False) == {item['id']}
+        checks["Quote kapalı ürünü unavailable sayar"] = requests.post(
+            f"{url}/menu/quote", json={"lines": [{"item_id": item['id'], "quantity": 1}]}
+        ).json().get('unavailable') == [item['id']]
+        # Kategori takvimi kapalıyken ürünün kendi takvimi açık olsa da open_now false
+        put_item(schedule_window("UTC", -60, 60))
+        category_closed = requests.put(
+            f"{url}/categories/{category['id']}/schedule",
+            json={"windows": [schedule_window("UTC", 60, 120)]}, headers=headers
+        ).json()
+        checks["Kategori takvimi kapalı → kategori open_now false"] = category_closed.get('open_now') is False
+        item_schedule = requests.get(f"{url}/menu-items/{item['id']}/schedule").json()
+        checks["Kategori takvimi kapalı → ürün open_now false"] = item_schedule.get('open_now') is False
+        checks["Ürün takvimi sadece kendi pencerelerini döner"] = len(item_schedule.get('windows', [])) == 1
+        checks["Takvimsiz ürün de kategori takvimine uyar"] = requests.get(
+            f"{url}/menu-items/{other['id']}/schedule"
+        ).json().get('open_now') is False
+        checks["available_now=true kategori kapalıyken boş"] = available_now(True) == set()
+        requests.put(f"{url}/categories/{category['id']}/schedule", json={"windows": []}, headers=headers)
+        checks["Takvimler kaldırılınca ürün açık"] = put_item().json() == {"windows": [], "open_now": True}
+        checks["Bilinmeyen saat dilimi → 422"] = put_item(
+            {**schedule_window("UTC", 0, 60), "timezone": "Mars/Base"}
+        ).status_code == 422
+        for name, ok in checks.items():
+            print_result(ok, name)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Takvim testi hatası: {e}")
+        return False
+    finally:
+        for created in items:
+            if created:
+                requests.delete(f"{url}/menu-items/{created['id']}", headers=headers)
+        requests.delete(f"{url}/categories/{category.get('id')}", headers=headers)
+
+# ============== AUDIT TESTS ==============
+
+def test_audit_log():
+    """Denetim kaydı: yazma → changes farkı, keyset sayfalama, sadece admin, /health sayaçları"""
+    print_subsection("Audit Log")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    url = f"{BASE_URL}/api/v1/audit"
+    try:
+        item = create_test_item(first_category_id(), price=50.0)
+        if not item:
+            print_result(False, "Test ürünü oluşturulamadı")
+            return False
+        item_url = f"{BASE_URL}/api/v1/menu-items/{item['id']}"
+        requests.put(item_url, json={"price": 75.0}, headers=headers)
+        requests.patch(item_url, json={"is_available": False}, headers=headers)
+        requests.patch(item_url, json={"description": "Denetim testi"}, headers=headers)
+        filters = {"entity": "menu_items", "entity_id": item['id']}
+
+        entries = requests.get(url, params=filters, headers=headers).json().get('entries', [])
+        actions = [entry['action'] for entry in entries]
+        latest_update = next((entry for entry in entries if entry['action'] == 'update'), {})
+        price_update = entries[-2] if len(entries) >= 2 else {}
+
+        # limit=1 ile next_cursor takip edilerek aynı kayıtlar aynı sırada gelmeli
+        paged, cursor = [], None
+        for _ in range(len(entries) + 1):
+            params = {**filters, "limit": 1, **({"before_id": cursor} if cursor else {})}
+            page = requests.get(url, params=params, headers=headers).json()
+            paged.extend(entry['id'] for entry in page.get('entries', []))
+            cursor = page.get('next_cursor')
+            if cursor is None:
+                break
+
+        user_headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
+        health = requests.get(f"{BASE_URL}/health").json()
+        checks = {
+            "Oluşturma + 3 güncelleme kaydı (yeniden eskiye)": actions == ["update", "update", "update", "create"],
+            "PUT changes farkı: price [50, 75]": price_update.get('changes') == {"price": [50.0, 75.0]},
+            "PATCH changes farkı: description [None, yeni]": latest_update.get('changes') == {
+                "description": [None, "Denetim testi"]
+            },
+            "Aktör admin": latest_update.get('actor_email') == ADMIN_USER['email'],
+            "Keyset sayfalama (before_id / next_cursor) tüm kayıtları dolaşır": paged == [entry['id'] for entry in entries],
+            "Son sayfada next_cursor yok": cursor is None,
+            "Token yok → 401/403": requests.get(url).status_code in (401, 403),
+            "Admin olmayan kullanıcı → 403": requests.get(url, headers=user_headers).status_code == 403,
+            "/health denetim sayaçları (dropped)": "dropped" in health.get('audit', {}),
+        }
+        for name, ok in checks.items():
+            print_result(ok, name)
+        requests.delete(item_url, headers=headers)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Denetim kaydı testi hatası: {e}")
+        return False
+
+def test_audit_flush_retry():
+    """Yazılamayan parti tampona geri konur, sıra korunur, sınır aşılırsa en eskiler düşürülür (süreç içi)"""
+    print_subsection("Audit Flush Retry")
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; sunucunun DB'sine dokunulmaz
+    from types import SimpleNamespace
+    from sqlalchemy import create_engine, select
+    from app.core.audit import AuditWriter
+    from app.models.audit_log import AuditLog
+
+    class UnreachableEngine:
+        def begin(self):
+            raise ConnectionError("veritabanına ulaşılamıyor")
+
+    actor = SimpleNamespace(id=1, email="admin@example.com")
+    writer = AuditWriter(UnreachableEngine(), batch_size=2, max_buffer=3)
+    for entity_id in (1, 2, 3):
+        writer.record(actor, "menu_items", entity_id, "update", {"price": [entity_id, entity_id + 1]})
+    # Tampon sınırda: record flush'ı kendisi dener, başarısız olur, 4 kayıttan en eskisi düşer
+    writer.record(actor, "menu_items", 4, "update", {"price": [4, 5]})
+    after_failure = writer.stats()
+
+    engine = create_engine("sqlite://")
+    AuditLog.__table__.create(engine)
+    writer._engine = engine
+    written = writer.flush()
+    with engine.connect() as conn:
+        stored = [row.entity_id for row in conn.execute(select(AuditLog.entity_id).order_by(AuditLog.id))]
+
+    checks = {
+        "Başarısız flush partiyi tamponda tutar": after_failure["buffered"] == 3
+            and after_failure["failed_flushes"] >= 1,
+        "Tampon sınırı aşılınca en eski kayıt düşürülür (dropped)": after_failure["dropped"] == 1,
+        "DB dönünce kalan kayıtlar sırayla yazılır": written == 3 and stored == [2, 3, 4],
+        "Tampon boşaldı": writer.stats()["buffered"] == 0,
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+# ============== TASK QUEUE TESTS ==============
+
+def test_task_queue_spool():
+    """Hata → yeniden deneme → dead/; yeniden başlatmada pending/ ve running/ işleri geri yüklenir (süreç içi)"""
+    print_subsection("Task Queue Spool")
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; sunucunun DB'sine dokunulmaz
+    from app.core.tasks import TaskQueue, task
+
+    calls: Dict[str, list] = {"flaky": [], "broken": [], "record": []}
+
+    @task("test.flaky")
+    def flaky(payload):
+        calls["flaky"].append(payload)
+        if len(calls["flaky"]) < 3:
+            raise RuntimeError("geçici hata")
+
+    @task("test.broken")
+    def broken(payload):
+        calls["broken"].append(payload)
+        raise ValueError("kalıcı hata")
+
+    @task("test.record")
+    def record(payload):
+        calls["record"].append(payload["n"])
+
+    def spooled(spool_dir, state):
+        directory = os.path.join(spool_dir, state)
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def wait_until(condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not condition():
+            time.sleep(0.02)
+        return condition()
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        options = dict(workers=1, max_retries=2, retry_base=0.01, retry_max=0.02)
+        queue = TaskQueue(spool_dir, **options)
+        queue.start()
+        queue.enqueue("test.flaky", {"order": 1})
+        broken_id = queue.enqueue("test.broken", {"order": 2})
+        settled = wait_until(lambda: queue.completed == 1 and queue.failed == 1)
+        queue.stop()
+        with open(os.path.join(spool_dir, "dead", f"{broken_id}.json"), encoding="utf-8") as f:
+            dead_job = json.load(f)
+        after_first_run = {state: spooled(spool_dir, state) for state in ("pending", "running", "dead")}
+
+        # Çalışmayan kuyruk: iş pending/'de kalır; birini çalışırken çökmüş gibi running/'e taşı
+        offline = TaskQueue(spool_dir, **options)
+        offline.enqueue("test.record", {"n": 1})
+        crashed_id = offline.enqueue("test.record", {"n": 2})
+        os.replace(
+            os.path.join(spool_dir, "pending", f"{crashed_id}.json"),
+            os.path.join(spool_dir, "running", f"{crashed_id}.json"),
+        )
+        restarted = TaskQueue(spool_dir, **options)
+        restarted.start()
+        recovered = wait_until(lambda: restarted.completed == 2)
+        restarted.stop()
+        after_restart = {state: spooled(spool_dir, state) for state in ("pending", "running", "dead")}
+
+    checks = {
+        "Kuyruk işleri bitirdi": settled,
+        "Geçici hata yeniden denenip başarılı oldu (3 deneme)": len(calls["flaky"]) == 3,
+        "Kalıcı hata max_retries + 1 kez denendi": len(calls["broken"]) == 3,
+        "Yeniden deneme sayacı": queue.retried == 4,
+        "Kalıcı hata dead/'e taşındı": after_first_run["dead"] == [f"{broken_id}.json"],
+        "dead/ kaydı deneme sayısı ve son hatayı tutar": dead_job["attempts"] == 3
+            and dead_job["last_error"] == "ValueError: kalıcı hata",
+        "Başarılı işler spool'dan silindi": not after_first_run["pending"] and not after_first_run["running"],
+        "Açılışta pending/ ve running/ işleri birer kez geri yüklendi": recovered
+            and sorted(calls["record"]) == [1, 2] and restarted.completed == 2,
+        "dead/ işleri yeniden çalıştırılmaz": len(calls["broken"]) == 3
+            and after_restart["dead"] == [f"{broken_id}.json"],
+        "Geri yüklenen işler bitince spool boş": not after_restart["pending"] and not after_restart["running"],
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+# ============== SESSION TESTS ==============
+
+def asgi_get(app, path: str) -> int:
+    """Uygulamaya tek bir GET isteği gönderir (süreç içi, HTTP istemcisi olmadan) → durum kodu"""
+    import asyncio
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "server": ("test", 80), "client": ("test", 1),
+    }
+    asyncio.run(app(scope, receive, send))
+    return messages[0]["status"]
+
+def test_request_session_release():
+    """get_db oturumu tembel açılır, bağımlılıklar arasında paylaşılır ve serileştirmeden önce bırakılır (süreç içi)"""
+    print_subsection("Request Session Release")
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; sunucunun DB'sine dokunulmaz
+    from fastapi import APIRouter, Depends, FastAPI, HTTPException
+    from pydantic import BaseModel, field_serializer
+    from sqlalchemy import text
+    from app.core.routing import InstrumentedRoute
+    from app.db.database import get_db
+
+    seen: Dict[str, Any] = {}
+
+    def current_user(db=Depends(get_db)):
+        seen["dependency"] = db
+        seen["lazy"] = not db.in_transaction()  # henüz SQL yok → bağlantı alınmadı
+        return db.execute(text("SELECT 1")).scalar()
+
+    class Probe(BaseModel):
+        value: int
+
+        @field_serializer("value")
+        def _during_serialization(self, value):
+            seen["held_while_serializing"] = seen["handler"].in_transaction()
+            return value
+
+    router = APIRouter(route_class=InstrumentedRoute)
+
+    @router.get("/probe", response_model=Probe)
+    def probe(user=Depends(current_user), db=Depends(get_db)):
+        seen["handler"] = db
+        db.execute(text("SELECT 1"))
+        seen["held_in_handler"] = db.in_transaction()
+        return {"value": user}
+
+    @router.get("/fails")
+    def fails(db=Depends(get_db)):
+        seen["failed"] = db
+        db.execute(text("SELECT 1"))
+        raise HTTPException(status_code=404, detail="yok")
+
+    app = FastAPI()
+    app.include_router(router)
+    probe_status = asgi_get(app, "/probe")
+    fails_status = asgi_get(app, "/fails")
+
+    checks = {
+        "İstek başarılı": probe_status == 200,
+        "Oturum ilk SQL'e kadar bağlantı almaz": seen.get("lazy") is True,
+        "Bağımlılık ve handler aynı oturumu paylaşır": seen.get("dependency") is seen.get("handler"),
+        "Handler içinde bağlantı tutulur": seen.get("held_in_handler") is True,
+        "Yanıt serileştirilirken bağlantı bırakılmış": seen.get("held_while_serializing") is False,
+        "Handler hata fırlatınca da bağlantı bırakılır": fails_status == 404
+            and not seen["failed"].in_transaction(),
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+# ============== SOFT DELETE TESTS ==============
+
+def test_soft_delete():
+    """Silinen ürün 404 döner ve liste / arama / facet / featured'dan kalkar; aynı isim yeniden eklenebilir"""
+    print_subsection("Soft Delete")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    url = f"{BASE_URL}/api/v1/menu-items"
+    category = requests.post(
+        f"{BASE_URL}/api/v1/categories",
+        json={"name": f"Silme Test {datetime.now().timestamp()}", "is_active": True},
+        headers=headers
+    ).json()
+    name = f"Silinecek {int(datetime.now().timestamp())}"
+    created = []
+    try:
+        item = create_test_item(category['id'], name=name, is_featured=True)
+        if not item:
+            print_result(False, "Test ürünü oluşturulamadı")
+            return False
+        created.append(item)
+        scope = {"category_id": category['id']}
+
+        def visible():
+            return {
+                "liste": item['id'] in {row['id'] for row in requests.get(f"{url}/", params=scope).json()},
+                "arama": item['id'] in {row['id'] for row in requests.get(f"{url}/search", params={"q": "Silinecek", "limit": 100}).json()},
+                "facet": requests.get(f"{url}/facets", params=scope).json().get('total') == 1,
+                "featured": item['id'] in {row['id'] for row in requests.get(f"{url}/featured", params=scope).json()},
+            }
+
+        before = visible()
+        delete_status = requests.delete(f"{url}/{item['id']}", headers=headers).status_code
+        after = visible()
+        recreated = create_test_item(category['id'], name=name)
+        if recreated:
+            created.append(recreated)
+        checks = {
+            "Silmeden önce her yerde görünür": all(before.values()),
+            "DELETE → 204": delete_status == 204,
+            "Silinen ürün detayı → 404": requests.get(f"{url}/{item['id']}").status_code == 404,
+            "Tekrar DELETE → 404": requests.delete(f"{url}/{item['id']}", headers=headers).status_code == 404,
+            "Silinen ürün güncellenemez → 404": requests.put(
+                f"{url}/{item['id']}", json={"price": 1}, headers=headers
+            ).status_code == 404,
+            **{f"Silinen ürün görünmez: {place}": not shown for place, shown in after.items()},
+            "Aynı kategori + isim silindikten sonra yeniden eklenebilir": recreated is not None
+                and recreated['id'] != item['id'],
+            "Yeni ürünün id'si silinenden büyük": recreated is not None and recreated['id'] > item['id'],
+        }
+        for row in created:
+            requests.delete(f"{url}/{row['id']}", headers=headers)
+        # Sadece silinmiş ürünleri kalan kategori silinebilir (onlar eşiği beklemeden arşive taşınır)
+        checks["Silinmiş ürünleri olan kategori silinebilir"] = requests.delete(
+            f"{BASE_URL}/api/v1/categories/{category['id']}", headers=headers
+        ).status_code == 204
+        for check_name, ok in checks.items():
+            print_result(ok, check_name)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Soft delete testi hatası: {e}")
+        return False
+    finally:
+        for row in created:
+            requests.delete(f"{url}/{row['id']}", headers=headers)
+        requests.delete(f"{BASE_URL}/api/v1/categories/{category.get('id')}", headers=headers)
+
+def test_menu_archive():
+    """archive_chunk satırları ve takvimleri taşır; MenuArchiver MENU_ARCHIVE_AFTER_DAYS'e uyar (süreç içi)"""
+    print_subsection("Menu Archive")
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; sunucunun DB'sine dokunulmaz
+    from datetime import timedelta
+    from sqlalchemy import create_engine, func, insert, select
+    from sqlalchemy.pool import StaticPool
+    from app.core.soft_delete import MenuArchiver, archive_chunk, utcnow
+    from app.db.database import Base
+    from app.models import audit_log, user  # noqa: F401  (tüm tablolar metadata'da olsun)
+    from app.models.availability_schedule import AvailabilitySchedule
+    from app.models.category import Category
+    from app.models.menu_item import MenuItem
+    from app.models.menu_item_archive import MenuItemArchive
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    now = utcnow()
+    deleted_days_ago = {1: 40, 2: 35, 3: 31, 4: 1, 5: None}  # id → kaç gün önce silindi (None: canlı)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": 1, "name": "Arşiv"}])
+        conn.execute(insert(MenuItem), [
+            {"id": item_id, "name": f"Ürün {item_id}", "price": 10.0, "category_id": 1,
+             "deleted_at": now - timedelta(days=days) if days is not None else None}
+            for item_id, days in deleted_days_ago.items()
+        ])
+        conn.execute(insert(AvailabilitySchedule), [
+            {"menu_item_id": item_id, "weekday_mask": 127, "start_minute": 0, "end_minute": 60, "timezone": "UTC"}
+            for item_id in (1, 5)
+        ])
+
+    def state():
+        with engine.connect() as conn:
+            return {
+                "hot": set(conn.execute(select(MenuItem.id).execution_options(include_deleted=True)).scalars()),
+                "archive": set(conn.execute(select(MenuItemArchive.id)).scalars()),
+                "schedules": set(conn.execute(select(AvailabilitySchedule.menu_item_id)).scalars()),
+            }
+
+    with engine.begin() as conn:
+        moved = archive_chunk(conn, MenuItem.deleted_at.is_not(None), 1)
+    after_chunk = state()
+    with engine.connect() as conn:
+        archived_name = conn.execute(select(MenuItemArchive.name).where(MenuItemArchive.id == 1)).scalar()
+        archived_at = conn.execute(select(func.count()).where(MenuItemArchive.archived_at.is_not(None))).scalar()
+
+    archiver = MenuArchiver(engine, after_days=30, interval=0, batch_size=1)
+    archived = archiver.archive_once()
+    after_archiver = state()
+
+    checks = {
+        "archive_chunk limit kadar (en küçük id) taşır": moved == 1 and after_chunk["archive"] == {1},
+        "archive_chunk satırı alanlarıyla arşive kopyalar": archived_name == "Ürün 1" and archived_at == 1,
+        "archive_chunk satırı sıcak tablodan siler": 1 not in after_chunk["hot"],
+        "archive_chunk takvimlerini siler, canlı ürününkine dokunmaz": after_chunk["schedules"] == {5},
+        "Eşiği geçen tüm satırlar parça parça taşındı": archived == 2 and after_archiver["archive"] == {1, 2, 3},
+        "MENU_ARCHIVE_AFTER_DAYS dolmayan silinmiş ürün kalır": 4 in after_archiver["hot"],
+        "Canlı ürün taşınmaz": 5 in after_archiver["hot"],
+        "Arşivleyici sayaçları": archiver.stats()["archived"] == 2 and archiver.stats()["after_days"] == 30,
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+# ============== BATCH TESTS ==============
+
+def test_menu_item_batch():
+    """Çoklu getirme: istek sırası, bulunamayan/tekrarlanan ID'ler, ID sınırı (GET ve POST)"""
+    print_subsection("Menu Item Batch")
+    if not ADMIN_TOKEN:
+        print_result(False, "Admin token yok, test atlanıyor")
+        return False
+    headers = admin_headers()
+    category_id = first_category_id()
+    url = f"{BASE_URL}/api/v1/menu-items/batch"
+    missing_id = 999999999
+    try:
+        first = create_test_item(category_id)
+        second = create_test_item(category_id)
+        if not first or not second:
+            print_result(False, "Test ürünleri oluşturulamadı")
+            return False
+        ids = [second['id'], missing_id, first['id'], second['id']]
+        expected = {
+            "items": [
+                (second['id'], True, second['name']),
+                (missing_id, False, None),
+                (first['id'], True, first['name']),
+                (second['id'], True, second['name']),
+            ],
+            "missing": [missing_id],
+        }
+
+        def shape(body):
+            return {
+                "items": [
+                    (entry['id'], entry['found'], (entry.get('item') or {}).get('name'))
+                    for entry in body.get('items', [])
+                ],
+                "missing": body.get('missing'),
+            }
+
+        get_response = requests.get(url, params={"ids": ",".join(map(str, ids))})
+        post_response = requests.post(url, json={"ids": ids})
+        too_many = list(range(1, 202))
+        checks = {
+            "GET istek sırası + bulunamayan + tekrar": get_response.status_code == 200
+                and shape(get_response.json()) == expected,
+            "POST istek sırası + bulunamayan + tekrar": post_response.status_code == 200
+                and shape(post_response.json()) == expected,
+            "GET 200'den fazla farklı ID → 400": requests.get(
+                url, params={"ids": ",".join(map(str, too_many))}
+            ).status_code == 400,
+            "POST 200'den fazla farklı ID → 400": requests.post(
+                url, json={"ids": too_many}
+            ).status_code == 400,
+            "Tekrarlanan ID'ler sınıra sayılmaz": requests.post(
+                url, json={"ids": [first['id']] * 500}
+            ).status_code == 200,
+            "GET geçersiz ID → 400": requests.get(url, params={"ids": "1,abc"}).status_code == 400,
+            "POST boş liste → 422": requests.post(url, json={"ids": []}).status_code == 422,
+            # /batch, /{item_id} tarafından yakalanmamalı (yakalansaydı 422 dönerdi)
+            "/batch, /{item_id} ile çakışmıyor": requests.get(
+                url, params={"ids": str(first['id'])}
+            ).json().get('items', [{}])[0].get('found') is True,
+        }
+        for name, ok in checks.items():
+            print_result(ok, name)
+        for created in (first, second):
+            requests.delete(f"{BASE_URL}/api/v1/menu-items/{created['id']}", headers=headers)
+        return all(checks.values())
+    except Exception as e:
+        print_result(False, f"Batch testi hatası: {e}")
+        return False
+
+# ============== YEREL SUNUCU TESTLERİ ==============
+# Farklı ayarlarla (snapshot kapalı/açık, kopuk DB...) davranış karşılaştıran testler
+# geçici bir SQLite dosyası üzerinde kendi uvicorn süreçlerini başlatır.
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class LocalServer:
+    """Geçici çalışma dizininde, verilen ortam değişkenleriyle ayrı bir API süreci"""
+
+    def __init__(self, workdir: str, database_url: Optional[str] = None, **settings):
+        self.workdir = workdir
+        self.env = {
+            **os.environ,
+            "DATABASE_URL": database_url or f"sqlite:///{os.path.join(workdir, 'menu.db')}",
+            **{key: str(value) for key, value in settings.items()},
+        }
+        self.url = ""
+        self._process = None
+        self._log = None
+
+    def __enter__(self) -> "LocalServer":
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self._log = open(os.path.join(self.workdir, f"server_{port}.log"), "w")
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", PROJECT_DIR, "--port", str(port)],
+            cwd=self.workdir, env=self.env, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                break
+            try:
+                requests.get(f"{self.url}/health", timeout=1)
+                return self
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"Yerel sunucu açılmadı (log: {self._log.name})")
+
+    def __exit__(self, *exc):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        if self._log is not None:
+            self._log.close()
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return requests.get(f"{self.url}{path}", **kwargs)
+
+    def wait_for_source(self, path: str, sources: set, timeout: float = 15) -> bool:
+        """Arka plan snapshot kurulumu bitene kadar bekler (X-Menu-Source ∈ sources)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.get(path).headers.get("X-Menu-Source") in sources:
+                return True
+            time.sleep(0.2)
+        return False
+
+def seed_menu_db(path: str, items: list) -> None:
+    """Sunucuları başlatmadan önce geçici SQLite dosyasına tabloları ve ürünleri yazar"""
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; sunucunun DB'sine dokunulmaz
+    from sqlalchemy import create_engine, insert
+    from app.db.database import Base
+    from app.models import audit_log, availability_schedule, menu_item_archive, user  # noqa: F401
+    from app.models.category import Category
+    from app.models.menu_item import MenuItem
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": 1, "name": "Ana Yemek"}, {"id": 2, "name": "İçecek"}])
+        conn.execute(insert(MenuItem), items)
+    engine.dispose()
+
+# Türkçe / büyük-küçük harf karışık adlar: DB harmanlaması ile casefold farklı sıralar,
+# bütün yollar kod noktası sırasını kullanmalı
+PARITY_ITEMS = [
+    {"name": name, "price": price, "category_id": category_id, "calories": calories,
+     "preparation_time": prep, "is_vegetarian": vegetarian, "is_featured": featured,
+     "description": f"{name} açıklaması"}
+    for name, price, category_id, calories, prep, vegetarian, featured in [
+        ("çorba", 45.0, 1, 180, 10, True, False),
+        ("Çorba Mercimek", 45.0, 1, None, 10, True, True),
+        ("Zeytin", 20.0, 1, 90, None, True, False),
+        ("adana", 180.0, 1, 650, 25, False, True),
+        ("İskender", 210.0, 1, 820, 20, False, True),
+        ("ıspanak", 70.0, 1, None, 15, True, False),
+        ("Ayran", 15.0, 2, 60, 1, True, False),
+        ("şalgam", 18.0, 2, 25, 1, True, False),
+        ("Şiş", 180.0, 1, 540, 25, False, False),
+        ("Öz", 99.5, 1, 300, 12, False, False),
+        ("ekmek", 5.0, 1, 250, 0, True, False),
+        ("Adana Dürüm", 150.0, 1, 700, 18, False, False),
+    ]
+]
+
+def list_matrix() -> list:
+    """Snapshot / vektör / SQL yollarının aynı cevabı vermesi gereken liste sorguları"""
+    queries = [{}, {"skip": 3, "limit": 4}]
+    for sort_by in ("name", "price", "calories", "preparation_time"):
+        for sort_dir in ("asc", "desc"):
+            queries.append({"sort_by": sort_by, "sort_dir": sort_dir})
+            queries.append({"sort_by": sort_by, "sort_dir": sort_dir, "skip": 2, "limit": 5})
+    queries += [
+        {"category_id": 2, "sort_by": "name"},
+        {"is_vegetarian": "true", "sort_by": "price", "sort_dir": "desc"},
+        {"is_featured": "true", "sort_by": "name"},
+        {"min_price": 40, "max_price": 180, "sort_by": "calories"},
+        {"max_calories": 300, "sort_by": "name", "sort_dir": "desc"},
+        {"max_prep_time": 15, "sort_by": "preparation_time"},
+        {"search": "ada", "sort_by": "name"},  # SQLite LIKE sadece ASCII'de harf duyarsız
+        {"fields": "id,name,price", "sort_by": "name", "skip": 1, "limit": 6},
+    ]
+    return queries
+
+def list_mismatches(expected: LocalServer, actual: LocalServer, path: str):
+    """list_matrix sorgularını iki sunucuda çalıştırır → (farklı sorgular, (beklenen, gerçek) kaynak çiftleri)"""
+    mismatches, sources = [], set()
+    for params in list_matrix():
+        expected_response = expected.get(path, params=params)
+        actual_response = actual.get(path, params=params)
+        sources.add((expected_response.headers.get("X-Menu-Source"), actual_response.headers.get("X-Menu-Source")))
+        if expected_response.json() != actual_response.json():
+            mismatches.append(params)
+    return mismatches, sources
+
+def test_snapshot_sql_parity():
+    """Aynı filtre + sıralama + sayfa için snapshot (bitset) yolu SQL yolu ile aynı listeyi döner"""
+    print_subsection("Snapshot / SQL Parity")
+    path = "/api/v1/menu-items/"
+    with tempfile.TemporaryDirectory() as workdir:
+        seed_menu_db(os.path.join(workdir, "menu.db"), PARITY_ITEMS)
+        with LocalServer(workdir, MENU_STORE_ENABLED="false", MENU_SNAPSHOT_PATH="sql.bin") as sql_server, \
+                LocalServer(workdir, VECTOR_ENGINE_ENABLED="false", MENU_SNAPSHOT_PATH="bitset.bin") as snapshot_server:
+            snapshot_ready = snapshot_server.wait_for_source(f"{path}?sort_by=name", {"snapshot"})
+            mismatches, sources = list_mismatches(sql_server, snapshot_server, path)
+            name_order = [row["name"] for row in sql_server.get(path, params={"sort_by": "name"}).json()]
+
+    checks = {
+        "Snapshot arka planda kuruldu": snapshot_ready,
+        "Yollar: SQL sunucusu sql, diğeri snapshot": sources == {("sql", "snapshot")},
+        "Ad sırası kod noktası sırası (DB harmanlaması değil)": name_order == sorted(item["name"] for item in PARITY_ITEMS),
+        f"{len(list_matrix())} sorgunun hepsi aynı": not mismatches,
+    }
+    for params in mismatches:
+        print(f"   Farklı: {params}")
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+def test_vector_sql_parity():
+    """Vektör indeksi snapshot ile arka planda kurulur; sıralı sayfalar SQL yolu ile aynı"""
+    print_subsection("Vector / SQL Parity")
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print_result(True, "NumPy kurulu değil, vektör motoru kapalı (test atlandı)")
+        return True
+    path = "/api/v1/menu-items/"
+    with tempfile.TemporaryDirectory() as workdir:
+        seed_menu_db(os.path.join(workdir, "menu.db"), PARITY_ITEMS)
+        with LocalServer(workdir, MENU_STORE_ENABLED="false", MENU_SNAPSHOT_PATH="sql.bin") as sql_server, \
+                LocalServer(workdir, VECTOR_ENGINE_ENABLED="true", MENU_SNAPSHOT_PATH="vector.bin") as vector_server:
+            vector_ready = vector_server.wait_for_source(f"{path}?sort_by=name", {"vector"})
+            mismatches, sources = list_mismatches(sql_server, vector_server, path)
+
+    checks = {
+        "İndeks snapshot ile birlikte kuruldu": vector_ready,
+        # sort_by yoksa id sırası bitset yolundan gelir
+        "Yollar: sıralı sorgular vector, sıralamasızlar snapshot": sources == {("sql", "vector"), ("sql", "snapshot")},
+        f"{len(list_matrix())} sorgunun hepsi aynı": not mismatches,
+    }
+    for params in mismatches:
+        print(f"   Farklı: {params}")
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+def wait_for_file(path: str, timeout: float = 15) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(0.2)
+    return False
+
+def test_stale_while_revalidate():
+    """DB'ye ulaşılamayan sunucu diskteki snapshot'tan bayat işaretli cevap verir"""
+    print_subsection("Stale While Revalidate")
+    path = "/api/v1/menu-items/"
+    with tempfile.TemporaryDirectory() as workdir:
+        seed_menu_db(os.path.join(workdir, "menu.db"), PARITY_ITEMS)
+        settings = {"MENU_SNAPSHOT_PATH": "persisted.bin", "MENU_SNAPSHOT_PERSIST_SECONDS": 1}
+        with LocalServer(workdir, **settings) as healthy:
+            persisted = wait_for_file(os.path.join(workdir, "persisted.bin"))
+            fresh_list = healthy.get(path, params={"sort_by": "price"})
+            fresh_detail = healthy.get(f"{path}1")
+        # Aynı snapshot, olmayan bir dizindeki DB: her bağlantı OperationalError verir
+        broken_url = f"sqlite:///{os.path.join(workdir, 'yok', 'menu.db')}"
+        with LocalServer(workdir, database_url=broken_url, **settings) as broken:
+            stale_list = broken.get(path, params={"sort_by": "price"})
+            stale_detail = broken.get(f"{path}1")
+            stale_categories = broken.get("/api/v1/categories/")
+            missing = broken.get(f"{path}999999")
+
+    checks = {
+        "Sağlam sunucu snapshot'ı diske yazdı": persisted,
+        "Sağlam sunucu bayat işaretlemez": "X-Menu-Stale" not in fresh_list.headers,
+        "Kopuk DB: liste 200 + X-Menu-Stale": stale_list.status_code == 200
+            and stale_list.headers.get("X-Menu-Stale") == "true",
+        "Bayat liste son sağlam liste ile aynı": stale_list.json() == fresh_list.json(),
+        "X-Menu-Snapshot-Age ve Warning başlıkları": stale_list.headers.get("X-Menu-Snapshot-Age", "").isdigit()
+            and stale_list.headers.get("Warning", "").startswith("110"),
+        "Kopuk DB: detay snapshot'tan": stale_detail.status_code == 200
+            and stale_detail.headers.get("X-Menu-Stale") == "true"
+            and stale_detail.json().get("name") == fresh_detail.json().get("name"),
+        "Kopuk DB: kategoriler snapshot'tan": stale_categories.status_code == 200
+            and len(stale_categories.json()) == 2,
+        "Snapshot'ta olmayan ürün → 404": missing.status_code == 404,
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+def test_statement_timeout_scope():
+    """statement_timeout sadece bloktaki okumaları sınırlar, bağlantıyı tembel alır (süreç içi)"""
+    print_subsection("Statement Timeout Scope")
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # ayarlar yüklenebilsin; sunucunun DB'sine dokunulmaz
+    from sqlalchemy import text
+    from app.db.database import SessionLocal, StatementTimeout, statement_timeout
+
+    # ~1 milyon satırlık özyinelemeli sayım: progress handler'ı bolca tetikler
+    slow = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000) SELECT count(*) FROM n")
+    db = SessionLocal()
+    try:
+        with statement_timeout(db, 0.01):
+            pass
+        lazy = not db.in_transaction()
+
+        started = time.monotonic()
+        try:
+            with statement_timeout(db, 0.05):
+                db.execute(slow)
+            interrupted = False
+        except StatementTimeout:
+            interrupted = True
+        elapsed = time.monotonic() - started
+        db.rollback()
+
+        unlimited = db.execute(slow).scalar() == 1000000  # blok dışı: sınır yok
+
+        # Bağlantı zaten alınmışsa (aynı istekte önceki sorgu) sınır ona uygulanır
+        try:
+            with statement_timeout(db, 0.05):
+                db.execute(slow)
+            open_connection_limited = False
+        except StatementTimeout:
+            open_connection_limited = True
+    finally:
+        db.close()
+
+    checks = {
+        "SQL çalışmayan blok bağlantı almaz": lazy,
+        "Bütçeyi aşan okuma StatementTimeout ile kesilir": interrupted and elapsed < 1,
+        "Blok dışında aynı oturumda sınır uygulanmaz": unlimited,
+        "Açık bağlantıdaki okuma da sınırlanır": open_connection_limited,
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
+def test_quote_over_budget():
+    """Gecikme bütçesi aşılınca teklif diskteki snapshot'tan bayat işaretli döner; çok eski snapshot → 503"""
+    print_subsection("Quote Over Budget")
+    lines = [{"item_id": item_id, "quantity": 1} for item_id in range(1, 101)]
+    items = [
+        {"name": f"Ürün {i}", "price": 10.0, "category_id": 1, "description": "bütçe testi"}
+        for i in range(1, 201)
+    ]
+    with tempfile.TemporaryDirectory() as workdir:
+        seed_menu_db(os.path.join(workdir, "menu.db"), items)
+        snapshot = {"MENU_SNAPSHOT_PATH": "persisted.bin"}
+        with LocalServer(workdir, MENU_SNAPSHOT_PERSIST_SECONDS=1, **snapshot) as healthy:
+            persisted = wait_for_file(os.path.join(workdir, "persisted.bin"))
+            in_budget = requests.post(f"{healthy.url}/api/v1/menu/quote", json={"lines": lines})
+        # Geçerli snapshot yok (store kapalı) → DB yolu; 0 ms bütçe ilk sorguyu keser
+        over_budget = {"MENU_STORE_ENABLED": "false", "QUOTE_LATENCY_BUDGET_MS": 0, **snapshot}
+        with LocalServer(workdir, **over_budget) as slow:
+            stale = requests.post(f"{slow.url}/api/v1/menu/quote", json={"lines": lines})
+            after = slow.get("/api/v1/menu-items/", params={"limit": 1})
+        with LocalServer(workdir, QUOTE_MAX_SNAPSHOT_AGE_SECONDS=0, **over_budget) as strict:
+            too_old = requests.post(f"{strict.url}/api/v1/menu/quote", json={"lines": lines})
+
+    body = stale.json()
+    checks = {
+        "Snapshot diske yazıldı": persisted,
+        "Bütçe içinde: stale false": in_budget.status_code == 200 and in_budget.json().get('stale') is False,
+        "Bütçe aşımı: 200 + stale true": stale.status_code == 200 and body.get('stale') is True,
+        "X-Menu-Stale başlığı": stale.headers.get("X-Menu-Stale") == "true",
+        "Bayat teklif aynı toplamı verir": body.get('total') == in_budget.json().get('total') == 1000.0,
+        "Bütçe aşımı kesinti sayılmaz (liste DB'den)": after.status_code == 200
+            and "X-Menu-Stale" not in after.headers,
+        "QUOTE_MAX_SNAPSHOT_AGE_SECONDS aşılınca 503": too_old.status_code == 503,
+    }
+    for name, ok in checks.items():
+        print_result(ok, name)
+    return all(checks.values())
+
 # ============== ZORUNLULUK KONTROLLERİ ==============
 
 def check_requirements():
@@ -448,6 +1639,7 @@ def main():
     results.append(("Register", test_register()))
     results.append(("Login", test_login()))
     results.append(("Me Endpoint", test_me_endpoint()))
+    results.append(("Admin Login", test_admin_login()))
     
     # Category Tests
     print_section("3. CATEGORY TESTS (CRUD)")
@@ -456,6 +1648,24 @@ def main():
     # Menu Item Tests
     print_section("4. MENU ITEM TESTS (CRUD)")
     results.append(("Menu Items CRUD", test_menu_items_crud()))
+    results.append(("Menu Item Facets", test_menu_facets()))
+    results.append(("Featured Index", test_featured_index()))
+    results.append(("Menu Item Batch", test_menu_item_batch()))
+    results.append(("Menu Quote", test_menu_quote()))
+    results.append(("Availability Schedules", test_availability_schedules()))
+    results.append(("Audit Log", test_audit_log()))
+    results.append(("Audit Flush Retry", test_audit_flush_retry()))
+    results.append(("Session Release", test_request_session_release()))
+    results.append(("Task Queue Spool", test_task_queue_spool()))
+    results.append(("Soft Delete", test_soft_delete()))
+    results.append(("Menu Archive", test_menu_archive()))
+    results.append(("Sparse Fieldsets", test_sparse_fieldsets()))
+    results.append(("Menu Item Constraints", test_menu_item_integrity_errors()))
+    results.append(("Snapshot/SQL Parity", test_snapshot_sql_parity()))
+    results.append(("Vector/SQL Parity", test_vector_sql_parity()))
+    results.append(("Stale While Revalidate", test_stale_while_revalidate()))
+    results.append(("Statement Timeout Scope", test_statement_timeout_scope()))
+    results.append(("Quote Over Budget", test_quote_over_budget()))
     
     # Requirements Check
     check_requirements()
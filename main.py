@@ -1,10 +1,11 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import ping_db, Base, engine
+from app.db.database import ping_db, list_tables, ensure_columns, ensure_indexes, drop_legacy_constraints, rebuild_sqlite_tables, Base, engine, SessionLocal, DATABASE_TYPE
+from app.core.routing import InstrumentedRoute
 from app.core.config import settings
 from app.core.deps import get_db
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.api.search import router as search_router
 from app.api.suggest import router as suggest_router
 
@@ -14,17 +15,60 @@ from app.api.me import router as me_router
 from app.api.categories import router as categories_router
 from app.api.menu_items import router as menu_items_router
 from app.api.featured import router as featured_router
+from app.api.admin import router as admin_router
+from app.api.quote import router as quote_router
+from app.api.schedules import router as schedules_router
+from app.api.audit import router as audit_router
+
+from app.core.menu_store import menu_store
+from app.core.snapshot_file import SnapshotPersister, load_snapshot
+from app.core import shared_cache
+from app.core import menu_vector
+from app.core import invalidation
+from app.core import soft_delete
+from app.core.slow_queries import slow_query_log
+from app.core.compression import CompressionMiddleware, compressed_body_cache
+from app.core.singleflight import SingleFlightMiddleware
+from app.core.profiler import ProfilerMiddleware, continuous_profiler
+from app.core import tracing
+from app.core.tracing import TracingMiddleware
+from app.core.tasks import task_queue
+from app.core.audit import audit_writer
+from app.core import menu_tasks  # noqa: F401  (arka plan işlerini kaydeder)
 
 # Model'leri import et
 from app.models.user import User
 from app.models.category import Category
 from app.models.menu_item import MenuItem
+from app.models.availability_schedule import AvailabilitySchedule
+from app.models.audit_log import AuditLog
+from app.models.menu_item_archive import MenuItemArchive
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Uygulama yaşam döngüsü (eski @app.on_event startup/shutdown yerine)"""
+    on_startup()
+    try:
+        yield
+    finally:
+        on_shutdown()
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Restaurant Menu Management API with JWT Authentication"
+    description="Restaurant Menu Management API with JWT Authentication",
+    lifespan=lifespan,
 )
+# Uygulama seviyesindeki route'lar da (health vb.) bağlantıyı handler bitince bıraksın
+app.router.route_class = InstrumentedRoute
+
+# Admin isteğe bağlı örneklemeli profil (en içte: yan event loop'ta çalışır)
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware, interval=settings.PROFILER_SAMPLE_INTERVAL_MS / 1000)
+
+# Özdeş eşzamanlı menü okumaları tek çalıştırmayı paylaşır (en içte: CORS/sıkıştırma istemciye özel kalır)
+if settings.SINGLEFLIGHT_ENABLED:
+    app.add_middleware(SingleFlightMiddleware, wait_timeout=settings.SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS)
 
 # CORS ayarları
 app.add_middleware(
@@ -35,6 +79,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Yanıt sıkıştırma; menü okumalarının sıkıştırılmış gövdeleri menü nesline göre önbelleklenir
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        cache=compressed_body_cache,
+    )
+
+# Tracing en dışta: kök span sıkıştırma dahil tüm isteği kapsar
+app.add_middleware(TracingMiddleware, sample_ratio=settings.TRACING_SAMPLE_RATIO)
+
 # Router'ları ekle
 app.include_router(auth_router)
 app.include_router(me_router, prefix="/api/v1")
@@ -45,17 +100,50 @@ app.include_router(search_router)
 app.include_router(suggest_router)
 
 app.include_router(menu_items_router)
+app.include_router(quote_router)
+app.include_router(schedules_router)
+app.include_router(admin_router)
+app.include_router(audit_router)
+
+# DB span'leri (tracing açıksa ve istek örneklendiyse)
+if tracing.span_processor is not None:
+    tracing.install_db_tracing(engine)
+
+# Eşiği aşan SQL ifadeleri (ve istenirse planları) halka tampona yazılır
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine)
+
+# Menü tablolarına dokunan commit'ler önbellekleri geçersiz kılar ve diğer düğümlere yayınlanır
+invalidation.install_hooks(SessionLocal)
+# Silinmiş (deleted_at dolu) menü öğeleri tüm ORM okumalarından otomatik düşer
+soft_delete.install_hooks(SessionLocal)
+
+# Vektör indeksi snapshot ile birlikte arka planda kurulur; istek yolu hazır indeksi kullanır
+menu_store.add_index_builder(menu_vector.attach_index)
+
+# Son sağlam menü snapshot'ını periyodik olarak diske yazar
+snapshot_persister = SnapshotPersister(
+    menu_store, SessionLocal, settings.MENU_SNAPSHOT_PATH, settings.MENU_SNAPSHOT_PERSIST_SECONDS
+)
+# Çok worker'lı modda snapshot'ı tek yenileyici yayınlar, worker'lar mmap ile okur
+shared_menu_cache = None
 
 # Uygulama başlangıcında tabloları oluştur
-@app.on_event("startup")
 def on_startup():
     """Uygulama başladığında çalışır"""
+    global shared_menu_cache
+    invalidation.set_bus(invalidation.create_bus(settings.INVALIDATION_BUS_URL))
+    invalidation.bus.start()
+
     try:
         Base.metadata.create_all(bind=engine)
-        print("✅ Veritabanı tabloları kontrol edildi/oluşturuldu")
+        rebuild_sqlite_tables()
+        ensure_columns()
+        drop_legacy_constraints()
+        ensure_indexes()
+        print("✅ Veritabanı tabloları ve indeksleri kontrol edildi/oluşturuldu")
         
         # İlk kategori ekle
-        from app.db.database import SessionLocal
         db = SessionLocal()
         try:
             if db.query(Category).count() == 0:
@@ -75,6 +163,45 @@ def on_startup():
     except Exception as e:
         print(f"⚠️ Startup hatası: {e}")
 
+    # DB kesintisinde servis edilebilmesi için diskteki snapshot'ı eşle (mmap)
+    try:
+        menu_store.set_fallback(load_snapshot(settings.MENU_SNAPSHOT_PATH))
+    except Exception as e:
+        print(f"⚠️ Menü snapshot dosyası okunamadı: {e}")
+
+    if settings.MENU_SHARED_CACHE_ENABLED and shared_cache.supported():
+        # Yayınlanan dosya aynı zamanda kesinti snapshot'ıdır; ayrı persister gerekmez
+        shared_menu_cache = shared_cache.SharedMenuCache(settings.MENU_SNAPSHOT_PATH, SessionLocal)
+        menu_store.attach_shared(shared_menu_cache)
+        shared_menu_cache.start()
+    else:
+        if settings.MENU_SHARED_CACHE_ENABLED:
+            print("⚠️ Paylaşımlı menü önbelleği bu platformda desteklenmiyor (fcntl yok)")
+        snapshot_persister.start()
+
+    # Commit sonrası yan işler; spool'da kalan işler burada geri yüklenir
+    task_queue.start()
+    # Denetim kayıtları tampondan toplu INSERT ile yazılır
+    audit_writer.start()
+    # Uzun süredir silinmiş menü öğeleri parça parça arşiv tablosuna taşınır
+    soft_delete.menu_archiver.start()
+    # PROFILER_CONTINUOUS_HZ > 0 ise route bazında düşük frekanslı örnekleme
+    continuous_profiler.start()
+    if tracing.span_processor is not None:
+        tracing.span_processor.start()
+
+def on_shutdown():
+    continuous_profiler.stop()
+    if tracing.span_processor is not None:
+        tracing.span_processor.stop()
+    task_queue.stop()
+    audit_writer.stop()  # tamponda kalan denetim kayıtlarını yazar
+    soft_delete.menu_archiver.stop()
+    invalidation.bus.stop()
+    snapshot_persister.stop()
+    if shared_menu_cache is not None:
+        shared_menu_cache.stop()
+
 # Health Check Endpoint
 @app.get("/health", tags=["System"])
 def health_check(db: Session = Depends(get_db)):
@@ -84,11 +211,13 @@ def health_check(db: Session = Depends(get_db)):
     health_status = {
         "api": "ok",
         "database": "down",
-        "database_type": "SQL Server",
+        "database_type": DATABASE_TYPE,
         "database_tables": [],
         "total_users": 0,
         "total_categories": 0,
-        "total_menu_items": 0
+        "total_menu_items": 0,
+        # Denetim tamponu DB'den bağımsız raporlanır: kesintide düşürülen kayıtlar burada görünür
+        "audit": audit_writer.stats()
     }
     
     try:
@@ -97,14 +226,8 @@ def health_check(db: Session = Depends(get_db)):
         health_status["database"] = "ok" if db_ok else "down"
         
         if db_ok:
-            # SQL Server için tablo listesi
-            result = db.execute(text("""
-                SELECT TABLE_NAME 
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_TYPE = 'BASE TABLE'
-                AND TABLE_CATALOG = DB_NAME()
-            """))
-            health_status["database_tables"] = [row[0] for row in result]
+            # Dialect bağımsız tablo listesi (SQLAlchemy inspector)
+            health_status["database_tables"] = list_tables()
             
             # İstatistikler
             health_status["total_users"] = db.query(User).count()
@@ -124,7 +247,7 @@ def root():
     return {
         "message": "🍴 Restaurant Menu API",
         "version": settings.APP_VERSION,
-        "database": "SQL Server",
+        "database": DATABASE_TYPE,
         "documentation": "/docs",
         "health": "/health"
     }
@@ -137,7 +260,7 @@ def api_info():
         "name": settings.APP_NAME,
         "version": settings.APP_VERSION,
         "environment": settings.APP_ENV,
-        "database": "Microsoft SQL Server",
+        "database": DATABASE_TYPE,
         "endpoints": {
             "auth": {
                 "register": "POST /auth/register",
@@ -151,15 +274,32 @@ def api_info():
                 "get": "GET /api/v1/categories/{id}",
                 "create": "POST /api/v1/categories",
                 "update": "PUT /api/v1/categories/{id}",
-                "delete": "DELETE /api/v1/categories/{id}"
+                "delete": "DELETE /api/v1/categories/{id}",
+                "schedule": "GET|PUT /api/v1/categories/{id}/schedule"
             },
             "menu_items": {
                 "list": "GET /api/v1/menu-items",
+                "facets": "GET /api/v1/menu-items/facets",
                 "get": "GET /api/v1/menu-items/{id}",
+                "batch": "GET|POST /api/v1/menu-items/batch",
                 "create": "POST /api/v1/menu-items",
                 "update": "PUT /api/v1/menu-items/{id}",
                 "patch": "PATCH /api/v1/menu-items/{id}",
-                "delete": "DELETE /api/v1/menu-items/{id}"
+                "delete": "DELETE /api/v1/menu-items/{id}",
+                "schedule": "GET|PUT /api/v1/menu-items/{id}/schedule"
+            },
+            "menu": {
+                "quote": "POST /api/v1/menu/quote"
+            },
+            "audit": {
+                "list": "GET /api/v1/audit"
+            },
+            "admin": {
+                "metrics": "GET /api/v1/admin/metrics",
+                "slow_queries": "GET /api/v1/admin/slow-queries",
+                "profiles": "GET /api/v1/admin/profiles",
+                "continuous_profile": "GET /api/v1/admin/profiles/continuous",
+                "menu_archive": "POST /api/v1/admin/menu-archive"
             },
             "system": {
                 "health": "GET /health",